@@ -2,14 +2,23 @@ import requests
 from bs4 import BeautifulSoup
 import re
 from urllib.parse import urlparse
+from src.net.resilience import TRANSIENT_STATUSES, CircuitOpenError, Resilience, TransientStatusError
+
+# Retries transient failures with backoff and stops hammering dead hosts
+resilience = Resilience.shared()
+
+def _get_once(url):
+    response = requests.get(url, timeout=30)
+    if response.status_code in TRANSIENT_STATUSES:
+        raise TransientStatusError(url, response.status_code)
+    response.raise_for_status()
+    return response.text
 
 # Function to get HTML content from a URL
 def get_html(url):
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        return response.text
-    except requests.exceptions.RequestException as e:
+        return resilience.call_sync(url, _get_once, url)
+    except (requests.exceptions.RequestException, TransientStatusError, CircuitOpenError) as e:
         print('Error fetching the URL:', e)
         return None
 
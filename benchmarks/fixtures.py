@@ -0,0 +1,311 @@
+from aiohttp import web
+from collections import Counter
+from dataclasses import dataclass
+from html import escape
+from typing import Dict, List, Optional
+from urllib.parse import quote, urlencode
+import argparse
+import asyncio
+import logging
+import random
+
+# Word lists for deterministic synthetic businesses
+SURNAMES = [
+    "Schmied", "Huber", "Gruber", "Bauer", "Wagner", "Pichler", "Steiner", "Moser",
+    "Mayer", "Hofer", "Leitner", "Berger", "Fuchs", "Eder", "Fischer", "Weber"
+]
+STREETS = ["Hauptstraße", "Kirchgasse", "Bahnhofstraße", "Am Platz", "Lindenweg", "Schulgasse"]
+CITIES = [("8010", "Graz"), ("1010", "Wien"), ("5020", "Salzburg"), ("6020", "Innsbruck"), ("4020", "Linz")]
+CATEGORIES = ["Friseur", "Kosmetik", "Nagelstudio", "Massage", "Barbershop"]
+
+# Shared page chrome, so pages carry the navigation, scripts and footer
+# weight of the real sites rather than just the data
+BOILERPLATE_HEAD = """
+<meta charset="utf-8">
+<meta name="description" content="{description}">
+<script>window.dataLayer = window.dataLayer || []; function gtag(){{dataLayer.push(arguments);}}</script>
+"""
+BOILERPLATE_NAV = "".join(
+    f'<li><a href="/{section.lower()}">{section}</a></li>'
+    for section in ["Start", "Suche", "Branchen", "Regionen", "Über uns", "Kontakt", "Hilfe", "Login"]
+)
+BOILERPLATE_FOOTER = """
+<footer>
+  <p>Impressum | Datenschutz | AGB | Cookie-Einstellungen</p>
+  <a href="https://www.facebook.com/example">Facebook</a>
+  <a href="https://www.instagram.com/example">Instagram</a>
+  <a href="https://www.linkedin.com/company/example">LinkedIn</a>
+</footer>
+"""
+
+@dataclass
+class FaultProfile:
+    """Latency and failures injected into every fixture page"""
+    latency: float = 0.05
+    jitter: float = 0.02
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: int = 0
+
+@dataclass
+class FixtureBusiness:
+    id: int
+    name: str
+    street: str
+    postal: str
+    city: str
+    phone: str
+    email: str
+    website: str
+    category: str
+    description: str
+
+def make_businesses(count: int, kind: str, seed: int = 0) -> List[FixtureBusiness]:
+    """The same `count` businesses for the same kind and seed on every run"""
+    rng = random.Random(f"{kind}-{seed}")
+    businesses = []
+    for index in range(count):
+        surname = SURNAMES[index % len(SURNAMES)]
+        postal, city = CITIES[rng.randrange(len(CITIES))]
+        slug = f"{surname.lower()}{index}"
+        category = rng.choice(CATEGORIES) if kind == "salon" else kind.title()
+        businesses.append(FixtureBusiness(
+            id=index + 1,
+            name=f"{kind.title()} {surname} {index + 1}",
+            street=f"{rng.choice(STREETS)} {rng.randint(1, 250)}",
+            postal=postal,
+            city=city,
+            phone=f"+43 {rng.randint(100, 999)} {rng.randint(100000, 999999)}",
+            email=f"office@{slug}.at",
+            website=f"https://www.{slug}.at/",
+            category=category,
+            description=f"{surname} is a family business in {city} since {rng.randint(1950, 2020)}. " * 3
+        ))
+    return businesses
+
+def page(title: str, body: str, description: str = "") -> str:
+    return (
+        f"<!DOCTYPE html><html><head><title>{escape(title)}</title>"
+        f"{BOILERPLATE_HEAD.format(description=escape(description or title))}</head>"
+        f"<body><header><nav><ul>{BOILERPLATE_NAV}</ul></nav></header>"
+        f"<main>{body}</main>{BOILERPLATE_FOOTER}</body></html>"
+    )
+
+class FixtureSite:
+    """Local stand-in for the WKO, Treatwell and YellowPages sites.
+
+    Pages are generated from deterministic synthetic businesses and use the
+    markup the scrapers select on: the WKO search form, result list with a
+    numbered pager and detail pages; the Treatwell start page with cookie
+    banner and search box and its result cards; and numbered YellowPages
+    listing pages ending in "No Results Found". Every site page is delayed
+    by ``latency`` plus up to ``jitter`` seconds and fails with
+    ``error_status`` at ``error_rate``. ``/_stats`` reports served pages and
+    injected errors per site.
+    """
+
+    def __init__(
+        self,
+        faults: Optional[FaultProfile] = None,
+        wko_businesses: int = 60,
+        wko_per_page: int = 20,
+        treatwell_salons: int = 30,
+        yellowpages_pages: int = 10,
+        yellowpages_per_page: int = 15
+    ):
+        self.faults = faults or FaultProfile()
+        self.wko = make_businesses(wko_businesses, "gasthaus", self.faults.seed)
+        self.wko_per_page = max(1, wko_per_page)
+        self.salons = make_businesses(treatwell_salons, "salon", self.faults.seed)
+        self.listings = make_businesses(yellowpages_pages * yellowpages_per_page, "consultant", self.faults.seed)
+        self.yellowpages_pages = yellowpages_pages
+        self.yellowpages_per_page = max(1, yellowpages_per_page)
+        self.stats: Dict[str, Counter] = {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._rng = random.Random(self.faults.seed)
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._faults])
+        app.router.add_get("/_health", self._health)
+        app.router.add_get("/_stats", self._stats)
+        app.router.add_get("/wko/SearchSimple.aspx", self.wko_search)
+        app.router.add_get("/wko/Results.aspx", self.wko_results)
+        app.router.add_get("/wko/firma/{id}", self.wko_detail)
+        app.router.add_get("/treatwell/", self.treatwell_start)
+        app.router.add_get("/treatwell/results", self.treatwell_results)
+        app.router.add_get("/yellowpages/search/si/{page}/{what}/{where}", self.yellowpages_listing)
+        return app
+
+    @web.middleware
+    async def _faults(self, request: web.Request, handler):
+        site = request.path.strip("/").split("/")[0]
+        if site.startswith("_"):
+            return await handler(request)
+        stats = self.stats.setdefault(site, Counter())
+        delay = self.faults.latency + self._rng.uniform(0, self.faults.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self._rng.random() < self.faults.error_rate:
+            stats["errors"] += 1
+            return web.Response(status=self.faults.error_status, headers={"Retry-After": "0"}, text="Injected failure")
+        response = await handler(request)
+        if response.status == 200:
+            stats["pages"] += 1
+            stats["bytes"] += len(response.body or b"")
+        return response
+
+    async def _health(self, request: web.Request) -> web.Response:
+        return web.Response(text="ok")
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response({site: dict(counts) for site, counts in self.stats.items()})
+
+    @staticmethod
+    def _html(html: str) -> web.Response:
+        return web.Response(text=html, content_type="text/html")
+
+    # WKO Firmen A-Z
+
+    @staticmethod
+    def _wko_form() -> str:
+        prefix = "ctl00_ContentPlaceHolder1_searchBoxLoaderControl_ctl00"
+        return f"""
+            <form id="aspnetForm" method="get" action="/wko/Results.aspx">
+              <input id="{prefix}_txtSuchbegriff" name="what" type="text">
+              <input id="{prefix}_txtStandort" name="where" type="text">
+              <button id="{prefix}_btnSearch" type="submit">Suchen</button>
+            </form>
+        """
+
+    async def wko_search(self, request: web.Request) -> web.Response:
+        return self._html(page("Firmen A-Z", self._wko_form()))
+
+    async def wko_results(self, request: web.Request) -> web.Response:
+        what = request.query.get("what", "")
+        where = request.query.get("where", "")
+        total_pages = max(1, -(-len(self.wko) // self.wko_per_page))
+        number = min(max(1, int(request.query.get("page", "1"))), total_pages)
+        start = (number - 1) * self.wko_per_page
+        items = "".join(f"""
+            <div class="firmenlisting-item">
+              <h3 class="firmenlisting-title"><a href="/wko/firma/{business.id}">{escape(business.name)}</a></h3>
+              <div class="firmenlisting-category">{escape(business.category)}</div>
+              <div class="firmenlisting-address">{escape(business.street)}, {business.postal} {escape(business.city)}</div>
+              <div class="firmenlisting-phone">{business.phone}</div>
+              <a class="firmenlisting-email" href="mailto:{business.email}">{business.email}</a>
+            </div>
+        """ for business in self.wko[start:start + self.wko_per_page])
+        pager = "".join(
+            f'<a href="/wko/Results.aspx?{urlencode({"what": what, "where": where, "page": n})}">{n}</a>'
+            for n in range(1, total_pages + 1)
+        )
+        # The result page keeps the search form, like the real one
+        return self._html(page(f"Suchergebnisse {what} {where}", f"""
+            {self._wko_form()}
+            <div class="search-results">{items}</div>
+            <div class="pagination">{pager}</div>
+        """))
+
+    async def wko_detail(self, request: web.Request) -> web.Response:
+        business = self._lookup(self.wko, request.match_info["id"])
+        return self._html(page(business.name, f"""
+            <h1 class="company-name">{escape(business.name)}</h1>
+            <div class="category">{escape(business.category)}</div>
+            <div class="address">{escape(business.street)}</div>
+            <span class="postal-code">{business.postal}</span> <span class="city">{escape(business.city)}</span>
+            <div class="phone">{business.phone}</div>
+            <a href="mailto:{business.email}">{business.email}</a>
+            <div class="website"><a href="{business.website}">{business.website}</a></div>
+            <div class="description">{escape(business.description)}</div>
+        """, description=business.description))
+
+    # Treatwell
+
+    async def treatwell_start(self, request: web.Request) -> web.Response:
+        return self._html(page("Treatwell", """
+            <div class="cookie-banner">
+              <button data-testid="cookie-banner-accept-button"
+                      onclick="this.parentElement.remove()">Akzeptieren</button>
+            </div>
+            <form method="get" action="/treatwell/results">
+              <input id="search-input" name="q" type="text" placeholder="Suche nach Behandlungen">
+              <button type="submit" data-testid="search-submit">Suchen</button>
+            </form>
+        """))
+
+    async def treatwell_results(self, request: web.Request) -> web.Response:
+        query = request.query.get("q", "")
+        cards = "".join(f"""
+            <div class="salon-search-result">
+              <h2 class="salon-name">{escape(salon.name)}</h2>
+              <div class="salon-address">{escape(salon.street)}, {salon.postal} {escape(salon.city)}</div>
+              <span class="rating-score">{4 + (salon.id % 10) / 10:.1f}</span>
+              <span class="review-count">{salon.id * 7} Bewertungen</span>
+              <span class="salon-category">{escape(salon.category)}</span>
+              <a class="salon-link" href="/treatwell/salon/{salon.id}">Ansehen</a>
+            </div>
+        """ for salon in self.salons)
+        return self._html(page(f"{query} - Treatwell", f'<div class="results">{cards}</div>'))
+
+    # YellowPages
+
+    async def yellowpages_listing(self, request: web.Request) -> web.Response:
+        number = int(request.match_info["page"])
+        if not 1 <= number <= self.yellowpages_pages:
+            return self._html(page("YellowPages", "<h2>No Results Found</h2>"))
+        start = (number - 1) * self.yellowpages_per_page
+        listings = "".join(f"""
+            <div class="listing_right_section">
+              <h3 class="listing__name"><a class="listing__name--link" href="/bus/{listing.id}">{escape(listing.name)}</a></h3>
+              <span class="listing__address--full">{escape(listing.street)}, {escape(listing.city)}</span>
+              <ul class="mlr">
+                <li class="mlr__item--phone"><a href="tel:{listing.phone}"><span class="mlr__sub-text">{listing.phone}</span></a></li>
+                <li class="mlr__item--website"><a href="/gourl/{listing.id}?redirect={quote(listing.website)}&amp;ypid=1">Website</a></li>
+              </ul>
+              <div class="listing__details__teaser">{escape(listing.description)}</div>
+              <a href="mailto:{listing.email}">{listing.email}</a>
+            </div>
+        """ for listing in self.listings[start:start + self.yellowpages_per_page])
+        what = request.match_info["what"]
+        return self._html(page(f"{what} - YellowPages", listings, description=f"{what} near you"))
+
+    @staticmethod
+    def _lookup(businesses: List[FixtureBusiness], key: str) -> FixtureBusiness:
+        try:
+            return businesses[int(key) - 1]
+        except (ValueError, IndexError):
+            raise web.HTTPNotFound()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Serve the benchmark fixture sites")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=50, help="Base latency per page in milliseconds")
+    parser.add_argument("--jitter", type=float, default=20, help="Extra random latency up to this many milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of pages answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--wko-businesses", type=int, default=60)
+    parser.add_argument("--treatwell-salons", type=int, default=30)
+    parser.add_argument("--yellowpages-pages", type=int, default=10)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.WARNING)
+    site = FixtureSite(
+        FaultProfile(
+            latency=args.latency / 1000,
+            jitter=args.jitter / 1000,
+            error_rate=args.error_rate,
+            error_status=args.error_status,
+            seed=args.seed
+        ),
+        wko_businesses=args.wko_businesses,
+        treatwell_salons=args.treatwell_salons,
+        yellowpages_pages=args.yellowpages_pages
+    )
+    web.run_app(site.app(), host=args.host, port=args.port, print=None)
+
+if __name__ == "__main__":
+    main()
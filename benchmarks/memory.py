@@ -0,0 +1,124 @@
+from typing import Dict, Iterable, Optional, Set
+import asyncio
+import logging
+import os
+
+try:
+    import psutil
+except ImportError:  # Linux fallback reads /proc directly
+    psutil = None
+
+def _proc_rss(pid: int) -> int:
+    """Resident set size of `pid` in bytes from /proc; 0 if it is gone"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+def _proc_parents() -> Dict[int, int]:
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat", encoding="ascii", errors="replace") as f:
+                # The command name may contain spaces; fields resume after ")"
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    return parents
+
+def descendants(pid: int) -> Set[int]:
+    """Every process started (directly or not) by `pid`"""
+    if psutil is not None:
+        try:
+            return {child.pid for child in psutil.Process(pid).children(recursive=True)}
+        except psutil.Error:
+            return set()
+    if not os.path.isdir("/proc"):
+        return set()
+    children: Dict[int, list] = {}
+    for child, parent in _proc_parents().items():
+        children.setdefault(parent, []).append(child)
+    found: Set[int] = set()
+    stack = list(children.get(pid, []))
+    while stack:
+        child = stack.pop()
+        if child not in found:
+            found.add(child)
+            stack.extend(children.get(child, []))
+    return found
+
+def rss(pids: Iterable[int]) -> int:
+    """Summed resident memory of `pids` in bytes"""
+    total = 0
+    for pid in pids:
+        if psutil is not None:
+            try:
+                total += psutil.Process(pid).memory_info().rss
+            except psutil.Error:
+                pass
+        else:
+            total += _proc_rss(pid)
+    return total
+
+class MemorySampler:
+    """Samples peak resident memory of this process and of its child processes.
+
+    Child processes are the Playwright driver and the browser it launches.
+    Only children started inside the ``async with`` block count: ones that
+    already ran when it was entered, such as a browser left behind by an
+    earlier target, are left out, as are processes in ``exclude`` (and
+    their children), such as the fixture server. Peaks are in bytes.
+    """
+
+    def __init__(self, interval: float = 0.2, exclude: Iterable[int] = ()):
+        self.interval = interval
+        self.exclude = set(exclude)
+        self.preexisting: Set[int] = set()
+        self.peak_rss = 0
+        self.peak_browser_rss = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def supported(self) -> bool:
+        return psutil is not None or os.path.isdir("/proc")
+
+    def sample(self) -> None:
+        pid = os.getpid()
+        excluded = self.exclude | self.preexisting
+        for excluded_pid in self.exclude:
+            excluded |= descendants(excluded_pid)
+        self.peak_rss = max(self.peak_rss, rss([pid]))
+        self.peak_browser_rss = max(self.peak_browser_rss, rss(descendants(pid) - excluded))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.sample)
+            except Exception as e:
+                self.logger.warning(f"Memory sample failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    async def __aenter__(self) -> "MemorySampler":
+        if self.supported:
+            self.preexisting = descendants(os.getpid())
+            self._task = asyncio.create_task(self._run())
+        else:
+            self.logger.warning("Memory sampling needs psutil or /proc; reporting 0")
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self.sample()
@@ -0,0 +1,362 @@
+from benchmarks.memory import MemorySampler
+from src.metrics.tracing import Tracer
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+import aiohttp
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+logger = logging.getLogger("benchmark")
+
+TARGETS = ("wko", "wko_browser", "treatwell", "app", "anywebsite")
+
+# Fixture site each target reads from, as counted by the server's /_stats
+TARGET_SITES = {
+    "wko": "wko",
+    "wko_browser": "wko",
+    "treatwell": "treatwell",
+    "app": "yellowpages",
+    "anywebsite": "yellowpages"
+}
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+# Compared by --compare; higher is better only for throughput
+COMPARED = ("pages_per_second", "p50_ms", "p99_ms", "peak_rss_mb", "browser_rss_mb")
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile; 0 for no values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q * len(ordered)) - 1))]
+
+def git_revision() -> Tuple[str, bool]:
+    """Short commit hash of the tree being measured and whether it has local changes"""
+    try:
+        sha = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], capture_output=True, text=True, check=True
+        ).stdout
+        return sha, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+class FixtureServer:
+    """Runs benchmarks.fixtures in a child process, so its CPU and memory stay
+    out of the measurements"""
+
+    def __init__(self, port: int, options: List[str]):
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self.options = options
+        self.process: Optional[subprocess.Popen] = None
+
+    async def __aenter__(self) -> "FixtureServer":
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.fixtures", "--port", str(self.port), *self.options]
+        )
+        deadline = time.monotonic() + 15
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    async with session.get(f"{self.url}/_health") as response:
+                        if response.status == 200:
+                            return self
+                except aiohttp.ClientError:
+                    pass
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    await self.__aexit__()
+                    raise RuntimeError(f"Fixture server did not start on port {self.port}")
+                await asyncio.sleep(0.1)
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+    async def stats(self) -> Dict[str, Dict[str, int]]:
+        async with aiohttp.ClientSession() as session:
+            async with session.get(f"{self.url}/_stats") as response:
+                return await response.json()
+
+class BenchmarkRunner:
+    """Runs each target against the fixture server and collects its numbers.
+
+    Throughput counts the pages the server answered with 200 for the
+    target's site. Per-page latency is the scraper's own navigation and
+    static fetch time (trace spans, including retries) for the Playwright
+    scrapers, and fetch plus extraction time for the requests-based
+    extractors. Memory is the peak RSS of this process and, separately, of
+    the Playwright driver and browser processes.
+    """
+
+    def __init__(self, args: argparse.Namespace, server: FixtureServer):
+        self.args = args
+        self.server = server
+
+    async def run(self, targets: List[str]) -> Dict[str, dict]:
+        results = {}
+        # Selector memory lives here, not in the production data directory
+        with tempfile.TemporaryDirectory(prefix="benchmark_") as self.scratch_dir:
+            for name in targets:
+                logger.info(f"Running {name}")
+                results[name] = await self.run_target(name)
+                logger.info(f"{name}: {self.describe(results[name])}")
+        return results
+
+    async def run_target(self, name: str) -> dict:
+        bench: Callable[[Tracer], Awaitable[Tuple[List[float], int]]] = getattr(self, f"bench_{name}")
+        tracer = Tracer(enabled=True)
+        site = TARGET_SITES[name]
+        before = (await self.server.stats()).get(site, {})
+        started = time.perf_counter()
+        try:
+            async with MemorySampler(exclude=[self.server.process.pid]) as memory:
+                latencies, records = await bench(tracer)
+        except ImportError as e:
+            # Targets whose dependencies are not installed are reported, not fatal
+            logger.warning(f"Skipping {name}: {e}")
+            return {"skipped": str(e)}
+        except Exception as e:
+            # No throughput or memory numbers: a target that stopped part-way
+            # (e.g. right after launching its browser) would look cheap
+            logger.error(f"{name} failed: {e}", exc_info=True)
+            return {"failed": str(e).splitlines()[0]}
+        elapsed = time.perf_counter() - started
+        after = (await self.server.stats()).get(site, {})
+        pages = after.get("pages", 0) - before.get("pages", 0)
+        if self.args.trace_dir:
+            tracer.export(os.path.join(self.args.trace_dir, f"{name}.json"))
+        return {
+            "pages": pages,
+            "injected_errors": after.get("errors", 0) - before.get("errors", 0),
+            "records": records,
+            "seconds": round(elapsed, 3),
+            "pages_per_second": round(pages / elapsed, 3) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "peak_rss_mb": round(memory.peak_rss / 2**20, 1),
+            "browser_rss_mb": round(memory.peak_browser_rss / 2**20, 1)
+        }
+
+    @staticmethod
+    def describe(result: dict) -> str:
+        if "pages" not in result:
+            return f"skipped ({result['skipped']})" if "skipped" in result else f"failed ({result['failed']})"
+        return (
+            f"{result['pages']} pages in {result['seconds']:.1f}s = {result['pages_per_second']:.2f} pages/s, "
+            f"p50 {result['p50_ms']:.0f} ms, p99 {result['p99_ms']:.0f} ms, "
+            f"RSS {result['peak_rss_mb']:.0f} MB, browser {result['browser_rss_mb']:.0f} MB, "
+            f"{result['records']} records, {result['injected_errors']} injected errors"
+        )
+
+    def site_services(self, tracer: Tracer) -> dict:
+        """Fresh pacing, retry, selector and metrics state per target, so
+        targets do not inherit each other's backoff, open circuits or
+        remembered selectors"""
+        from src.browser.selectors import SelectorResolver
+        from src.metrics.registry import MetricsRegistry
+        from src.net.rate_limiter import AdaptiveRateLimiter
+        from src.net.resilience import Resilience
+        from src.storage.artifacts import ArtifactWriter
+        return {
+            "rate_limiter": AdaptiveRateLimiter(initial_rate=self.args.rate, max_rate=self.args.rate),
+            "resilience": Resilience(),
+            "artifacts": ArtifactWriter(mode="off"),
+            "selector_resolver": SelectorResolver(
+                memory_path=os.path.join(tempfile.mkdtemp(dir=self.scratch_dir), "selector_memory.json")
+            ),
+            "metrics": MetricsRegistry(),
+            "tracer": tracer
+        }
+
+    async def bench_wko(self, tracer: Tracer, static: bool = True) -> Tuple[List[float], int]:
+        from src.browser.pool import BrowserPool
+        from src.net.http_client import StaticFetcher
+        from src.scrapers.wko_scraper import WKOScraper
+        services = self.site_services(tracer)
+        concurrency = self.args.concurrency
+        async with BrowserPool(size=concurrency) as pool, StaticFetcher(
+            limit_per_host=concurrency,
+            rate_limiter=services["rate_limiter"],
+            resilience=services["resilience"]
+        ) as fetcher:
+            scraper = WKOScraper(concurrency=concurrency, pool=pool, fetcher=fetcher if static else None, **services)
+            scraper.BASE_URL = f"{self.server.url}/wko/SearchSimple.aspx"
+            async with pool.page() as page:
+                businesses = await scraper.scrape(page, {
+                    "keyword": "Gasthaus",
+                    "location": "Graz",
+                    "limit": self.args.wko_businesses
+                })
+        return tracer.durations("navigation", "static_fetch"), len(businesses)
+
+    async def bench_wko_browser(self, tracer: Tracer) -> Tuple[List[float], int]:
+        return await self.bench_wko(tracer, static=False)
+
+    async def bench_treatwell(self, tracer: Tracer) -> Tuple[List[float], int]:
+        from src.browser.pool import BrowserPool
+        from src.scrapers.treatwell_scraper import TreatwellScraper
+        services = self.site_services(tracer)
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+
+        async def query(number: int) -> int:
+            async with semaphore, pool.page() as page:
+                scraper = TreatwellScraper(pool=pool, **services)
+                scraper.BASE_URL = f"{self.server.url}/treatwell/"
+                return len(await scraper.scrape(page, {"keyword": f"Friseur {number}", "limit": 100}))
+
+        async with BrowserPool(size=self.args.concurrency) as pool:
+            counts = await asyncio.gather(*(query(number) for number in range(self.args.treatwell_queries)))
+        return tracer.durations("navigation"), sum(counts)
+
+    def yellowpages_urls(self) -> List[str]:
+        return [
+            f"{self.server.url}/yellowpages/search/si/{number}/{quote('Educational Consultant')}/Toronto+ON"
+            for number in range(1, self.args.yellowpages_pages + 1)
+        ]
+
+    async def bench_app(self, tracer: Tracer) -> Tuple[List[float], int]:
+        import app
+
+        def extract(url: str) -> int:
+            html = app.get_html(url)
+            return len(app.find_external_links(html, url)) if html else 0
+
+        return await self._run_sync(extract)
+
+    async def bench_anywebsite(self, tracer: Tracer) -> Tuple[List[float], int]:
+        import anywebsite
+        import requests
+
+        def extract(url: str) -> int:
+            response = requests.get(url, timeout=30)
+            if response.status_code != 200:
+                return 0
+            data = anywebsite.extract_page_data(response.text)
+            return len(data["Phone_Numbers"]) + len(data["Emails"])
+
+        return await self._run_sync(extract)
+
+    async def _run_sync(self, extract: Callable[[str], int]) -> Tuple[List[float], int]:
+        """Run a blocking extractor over the YellowPages fixture pages in worker threads"""
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        latencies: List[float] = []
+
+        async def timed(url: str) -> int:
+            async with semaphore:
+                started = time.perf_counter()
+                records = await asyncio.to_thread(extract, url)
+                latencies.append(time.perf_counter() - started)
+                return records
+
+        counts = await asyncio.gather(*(timed(url) for url in self.yellowpages_urls()))
+        return latencies, sum(counts)
+
+def save_results(report: dict, output: str) -> str:
+    name = report["commit"] + ("-dirty" if report["dirty"] else "")
+    path = os.path.join(output, f"{name}.json")
+    os.makedirs(output, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return path
+
+def load_baseline(ref: str, output: str) -> Optional[dict]:
+    """An earlier result, by commit (result file name) or path"""
+    path = ref if os.path.isfile(ref) else os.path.join(output, f"{ref}.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.error(f"Cannot read baseline {path}: {e}")
+        return None
+
+def compare(report: dict, baseline: dict) -> None:
+    """Log the change of every compared number against an earlier result"""
+    logger.info(f"Compared with {baseline.get('commit')} ({baseline.get('created_at')}):")
+    for name, result in report["targets"].items():
+        previous = baseline.get("targets", {}).get(name)
+        if "pages" not in result or "pages" not in (previous or {}):
+            continue
+        changes = []
+        for key in COMPARED:
+            before, after = previous.get(key), result.get(key)
+            if before:
+                changes.append(f"{key} {before:g} -> {after:g} ({(after - before) / before:+.1%})")
+        logger.info(f"  {name}: " + ", ".join(changes))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers against the local fixture sites")
+    parser.add_argument("--targets", nargs="+", choices=TARGETS, default=list(TARGETS))
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=50, help="Base latency per page in milliseconds")
+    parser.add_argument("--jitter", type=float, default=20, help="Extra random latency up to this many milliseconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of pages answered with an error")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=4, help="Pages or requests in flight per target")
+    parser.add_argument("--rate", type=float, default=50, help="Requests per second allowed by the rate limiter")
+    parser.add_argument("--wko-businesses", type=int, default=60)
+    parser.add_argument("--treatwell-queries", type=int, default=10)
+    parser.add_argument("--yellowpages-pages", type=int, default=50)
+    parser.add_argument("--output", default=RESULTS_DIR, help="Directory for <commit>.json result files")
+    parser.add_argument("--compare", help="Commit (result file name) or path of a result to compare against")
+    parser.add_argument("--trace-dir", help="Also write a Chrome trace per target to this directory")
+    return parser.parse_args()
+
+async def main():
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    # Per-page scraper logging would dominate the benchmark output
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    server_options = [
+        "--latency", str(args.latency),
+        "--jitter", str(args.jitter),
+        "--error-rate", str(args.error_rate),
+        "--error-status", str(args.error_status),
+        "--seed", str(args.seed),
+        "--wko-businesses", str(args.wko_businesses),
+        "--yellowpages-pages", str(args.yellowpages_pages)
+    ]
+    # Read before this run's result can overwrite it
+    baseline = load_baseline(args.compare, args.output) if args.compare else None
+    async with FixtureServer(args.port, server_options) as server:
+        targets = await BenchmarkRunner(args, server).run(args.targets)
+
+    commit, dirty = git_revision()
+    report = {
+        "commit": commit,
+        "dirty": dirty,
+        "created_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            key: value for key, value in vars(args).items()
+            if key not in ("targets", "output", "compare", "trace_dir")
+        },
+        "targets": targets
+    }
+    path = save_results(report, args.output)
+    logger.info(f"Results written to {path}")
+    if baseline:
+        compare(report, baseline)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -26,6 +26,38 @@ CSS_SELECTOR = "[class^='listing_right_section']"
 # Maximum number of pages to crawl. Adjust this value based on how much data you want to scrape.
 MAX_PAGES = 5  # Example: Set to 5 to scrape 5 pages.
 
+# Pages loading in the browser and pages being extracted by the LLM at the
+# same time. The next pages are fetched while earlier ones are extracted.
+FETCH_CONCURRENCY = 2
+LLM_CONCURRENCY = 2
+
+# Read name, address, phone and website straight from the listing markup and
+# only ask the LLM about listings that fail validation. With
+# GENERATE_DESCRIPTIONS, listings without a description in the markup are
+# also sent to the LLM for the one-sentence description.
+HYBRID_EXTRACTION = True
+GENERATE_DESCRIPTIONS = True
+
+# Send the LLM a compact text rendering of the selected HTML (links and phone
+# numbers kept, scripts, attributes and repeated boilerplate removed)
+# instead of the full markup. Input tokens before/after are logged per page.
+COMPACT_LLM_INPUT = True
+
+# Token budget of a multi-listing LLM prompt. Each page's listings are
+# packed in listing order into prompts up to this size, and a page's prompts
+# are sent concurrently. Pages are packed separately, so the same page always
+# produces the same prompts and hits the extraction cache. Keep it below the
+# extraction strategy's chunk threshold. None sends one request per page.
+LLM_BATCH_TOKENS = 1500
+
+# A JSON run report with per-stage timings is written after every crawl. Set
+# a path to also export the metrics as a Prometheus text file.
+PROMETHEUS_FILE = None
+
+# Set a path to record trace spans (navigation, parsing, LLM calls per page)
+# as a Chrome trace; open it in ui.perfetto.dev or chrome://tracing.
+TRACE_FILE = None
+
 # Instructions for the LLM on what information to extract from the scraped content.
 # The LLM will extract the following details for each business:
 # - Name
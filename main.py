@@ -1,17 +1,42 @@
 import asyncio
+import logging
 from crawl4ai import AsyncWebCrawler
 from dotenv import load_dotenv
-from config import BASE_URL, CSS_SELECTOR, MAX_PAGES, SCRAPER_INSTRUCTIONS
+from config import (
+    BASE_URL,
+    COMPACT_LLM_INPUT,
+    CSS_SELECTOR,
+    FETCH_CONCURRENCY,
+    GENERATE_DESCRIPTIONS,
+    HYBRID_EXTRACTION,
+    LLM_BATCH_TOKENS,
+    LLM_CONCURRENCY,
+    LLM_MODEL,
+    MAX_PAGES,
+    PROMETHEUS_FILE,
+    SCRAPER_INSTRUCTIONS,
+    TRACE_FILE
+)
 from src.utils import save_data_to_csv
 from src.scraper import (
     get_browser_config,
-    get_llm_strategy,
-    fetch_and_process_page
+    get_llm_strategy
 )
 from models.business import BusinessData
+from src.net.rate_limiter import AdaptiveRateLimiter
+from src.extraction.llm_cache import CachedExtractionStrategy, ExtractionCache
+from src.scrapers.yellowpages_crawler import YellowPagesCrawler
+from src.metrics.registry import MetricsRegistry
+from src.metrics.tracing import Tracer
+from datetime import datetime
 
 load_dotenv()
 
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
 
 async def crawl_yellowpages():
     """
@@ -19,49 +44,40 @@ async def crawl_yellowpages():
     """
     # Initialize configurations
     browser_config = get_browser_config()
-    llm_strategy = get_llm_strategy(
-        llm_instructions=SCRAPER_INSTRUCTIONS,  # Instructions for the LLM
-        output_format=BusinessData # Data output format
+    Tracer.shared().enabled = bool(TRACE_FILE)
+    # Pages whose selected content was already extracted with the same model
+    # and instructions are answered from disk without calling the LLM
+    extraction_cache = ExtractionCache(model=LLM_MODEL, instructions=SCRAPER_INSTRUCTIONS)
+    llm_strategy = CachedExtractionStrategy(
+        get_llm_strategy(
+            llm_instructions=SCRAPER_INSTRUCTIONS,  # Instructions for the LLM
+            output_format=BusinessData # Data output format
+        ),
+        extraction_cache
     )
-    session_id = "crawler_session"
-
-    # Initialize state variables
-    page_number = 1
-    all_records = []
-    seen_names = set()
+    # Starts at the old fixed pace (one page every 2 s) and adapts from there
+    rate_limiter = AdaptiveRateLimiter(initial_rate=0.5, burst=1)
 
     # Start the web crawler context
     # https://docs.crawl4ai.com/api/async-webcrawler/#asyncwebcrawler
     async with AsyncWebCrawler(config=browser_config) as crawler:
-        while True:
-            # Fetch and process data from the current page
-            records, no_results_found = await fetch_and_process_page(
-                crawler,
-                page_number,
-                BASE_URL,
-                CSS_SELECTOR,
-                llm_strategy,
-                session_id,
-                seen_names,
-            )
-
-            if no_results_found:
-                print("No more records found. Ending crawl.")
-                break  # Stop crawling when "No Results Found" message appears
-
-            if not records:
-                print(f"No records extracted from page {page_number}.")
-                break  # Stop if no records are extracted
-
-            # Add the records from this page to the total list
-            all_records.extend(records)
-            page_number += 1  # Move to the next 
-            
-            if page_number > MAX_PAGES:
-                break
-
-            # Pause between requests to avoid rate limits
-            await asyncio.sleep(2)  # Adjust sleep time as needed
+        # Page N+1 is fetched while page N is with the LLM; the crawl stops at
+        # the first page showing "No Results Found" or yielding no records
+        yellowpages = YellowPagesCrawler(
+            crawler,
+            llm_strategy,
+            BASE_URL,
+            CSS_SELECTOR,
+            MAX_PAGES,
+            fetch_concurrency=FETCH_CONCURRENCY,
+            llm_concurrency=LLM_CONCURRENCY,
+            rate_limiter=rate_limiter,
+            hybrid=HYBRID_EXTRACTION,
+            generate_descriptions=GENERATE_DESCRIPTIONS,
+            compact=COMPACT_LLM_INPUT,
+            batch_tokens=LLM_BATCH_TOKENS
+        )
+        all_records = await yellowpages.crawl()
 
     # Save the collected records to a CSV file
     if all_records:
@@ -73,8 +89,28 @@ async def crawl_yellowpages():
     else:
         print("No records were found during the crawl.")
 
-    # Display usage statistics for the LLM strategy
+    # Display usage statistics for the LLM strategy and the extraction cache
     llm_strategy.show_usage()
+    yellowpages.log_summary()
+    metrics = MetricsRegistry.shared()
+    usage = getattr(llm_strategy, "total_usage", None)
+    metrics.write_report(
+        f"data/yellowpages_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        records=len(all_records),
+        crawler=dict(yellowpages.stats),
+        llm_tokens={
+            "prompt": getattr(usage, "prompt_tokens", 0),
+            "completion": getattr(usage, "completion_tokens", 0),
+            "total": getattr(usage, "total_tokens", 0)
+        },
+        cache={"hits": extraction_cache.hits, "misses": extraction_cache.misses}
+    )
+    if PROMETHEUS_FILE:
+        metrics.write_prometheus(PROMETHEUS_FILE)
+    if TRACE_FILE:
+        Tracer.shared().export(TRACE_FILE)
+    extraction_cache.close()
+    rate_limiter.log_rates()
 
 
 async def main():
@@ -0,0 +1,2 @@
+# Empty file
+
@@ -0,0 +1,176 @@
+from playwright.async_api import async_playwright, Browser, BrowserContext, Page, Playwright
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Optional, Set
+import asyncio
+import logging
+
+class BrowserPool:
+    """Shared Chromium instance with a pool of pre-warmed, recyclable contexts.
+
+    Scrapers lease a context (or a page in a leased context) and hand it back
+    when done. A context is closed and replaced once it has served
+    ``max_navigations`` main-frame navigations, so long runs do not
+    accumulate cache and memory in a single context. Waiting for a free
+    context gives up after ``acquire_timeout`` seconds, so callers that
+    lease more contexts than the pool can ever free fail instead of hanging.
+    """
+
+    LAUNCH_ARGS = [
+        '--disable-dev-shm-usage',
+        '--no-sandbox',
+        '--disable-setuid-sandbox',
+        '--disable-web-security'
+    ]
+
+    CONTEXT_SETTINGS = {
+        "viewport": {'width': 1920, 'height': 1080},
+        "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+        "locale": 'de-AT',
+        "ignore_https_errors": True,
+        "bypass_csp": True
+    }
+
+    DEFAULT_TIMEOUT = 60000  # 1 minute
+
+    def __init__(
+        self,
+        size: int = 2,
+        max_navigations: int = 100,
+        headless: bool = True,
+        context_settings: Optional[dict] = None,
+        acquire_timeout: Optional[float] = 300
+    ):
+        self.size = max(1, size)
+        self.acquire_timeout = acquire_timeout
+        self.max_navigations = max_navigations
+        self.headless = headless
+        self.context_settings = {**self.CONTEXT_SETTINGS, **(context_settings or {})}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._navigations: Dict[BrowserContext, int] = {}
+        self._background: Set[asyncio.Task] = set()
+
+    async def __aenter__(self) -> "BrowserPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def browser(self) -> Browser:
+        if not self._browser:
+            raise RuntimeError("BrowserPool has not been started")
+        return self._browser
+
+    async def start(self) -> None:
+        """Launch the browser and pre-warm the context pool"""
+        if self._browser:
+            return
+        try:
+            self._playwright = await async_playwright().start()
+            self._browser = await self._playwright.chromium.launch(
+                headless=self.headless,
+                args=self.LAUNCH_ARGS
+            )
+            contexts = await asyncio.gather(*(self._new_context() for _ in range(self.size)))
+        except BaseException:
+            # __aexit__ does not run when __aenter__ fails; stop the driver here
+            await self.close()
+            raise
+        for context in contexts:
+            self._idle.put_nowait(context)
+        self.logger.info(f"Browser pool started with {self.size} contexts")
+
+    async def close(self) -> None:
+        """Close every context, the browser and Playwright"""
+        for task in list(self._background):
+            task.cancel()
+        for context in list(self._navigations):
+            await self._close_context(context)
+        self._idle = asyncio.Queue()
+        if self._browser:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                self.logger.error(f"Error closing browser: {e}")
+            self._browser = None
+        if self._playwright:
+            await self._playwright.stop()
+            self._playwright = None
+
+    @asynccontextmanager
+    async def context(self) -> AsyncIterator[BrowserContext]:
+        """Lease a context exclusively for the duration of the block"""
+        try:
+            context = await asyncio.wait_for(self._idle.get(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"No browser context became free within {self.acquire_timeout}s (pool size {self.size})"
+            ) from None
+        try:
+            yield context
+        finally:
+            await self._release(context)
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Lease a fresh page in a pooled context; the page is closed afterwards"""
+        async with self.context() as context:
+            page = await context.new_page()
+            page.set_default_timeout(self.DEFAULT_TIMEOUT)
+            try:
+                yield page
+            finally:
+                await page.close()
+
+    async def _new_context(self) -> BrowserContext:
+        context = await self.browser.new_context(**self.context_settings)
+        context.set_default_timeout(self.DEFAULT_TIMEOUT)
+        context.on("page", lambda page: self._track_navigations(context, page))
+        self._navigations[context] = 0
+        return context
+
+    def _track_navigations(self, context: BrowserContext, page: Page) -> None:
+        def on_navigated(frame) -> None:
+            if frame == page.main_frame and context in self._navigations:
+                self._navigations[context] += 1
+
+        page.on("framenavigated", on_navigated)
+
+    async def _release(self, context: BrowserContext) -> None:
+        if self._navigations.get(context, 0) < self.max_navigations:
+            self._idle.put_nowait(context)
+            return
+
+        self.logger.info(f"Recycling context after {self._navigations[context]} navigations")
+        await self._close_context(context)
+        await self._replace_context()
+
+    async def _replace_context(self, attempts: int = 3) -> None:
+        """Add a new context in place of a recycled one, so the pool keeps its size"""
+        for attempt in range(1, attempts + 1):
+            try:
+                self._idle.put_nowait(await self._new_context())
+                return
+            except Exception as e:
+                self.logger.warning(f"Could not create a replacement context (attempt {attempt}): {e}")
+                if not self._browser:
+                    return
+                await asyncio.sleep(attempt)
+        # Retry in the background; leases wait for it instead of finding the
+        # pool permanently smaller
+        self.logger.error(f"Replacement context failed {attempts} times; retrying in the background")
+        task = asyncio.create_task(self._replace_context(attempts))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _close_context(self, context: BrowserContext) -> None:
+        self._navigations.pop(context, None)
+        try:
+            await context.close()
+        except Exception as e:
+            self.logger.error(f"Error closing browser context: {e}")
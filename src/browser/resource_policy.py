@@ -0,0 +1,91 @@
+from playwright.async_api import Page, Route
+from collections import Counter
+from typing import Iterable, Optional
+import logging
+import re
+import weakref
+
+# Common analytics, tag manager and ad hosts that never carry business data
+TRACKER_PATTERNS = [
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"googlesyndication\.com",
+    r"adservice\.google\.",
+    r"connect\.facebook\.net",
+    r"hotjar\.com",
+    r"matomo",
+    r"piwik",
+    r"cookiebot\.com",
+    r"newrelic\.com",
+    r"nr-data\.net",
+]
+
+class ResourcePolicy:
+    """Playwright routing rules that abort requests a scraper does not need.
+
+    Requests are blocked by resource type (``image``, ``font``, ...) or by
+    URL regex; ``allowed_url_patterns`` always win over both. Blocked
+    requests never produce a response, so saved bytes are estimated from
+    typical sizes per resource type.
+    """
+
+    ESTIMATED_BYTES = {
+        "image": 60_000,
+        "media": 500_000,
+        "font": 40_000,
+        "stylesheet": 30_000,
+        "script": 50_000,
+        "xhr": 5_000,
+        "fetch": 5_000,
+    }
+    DEFAULT_ESTIMATED_BYTES = 10_000
+
+    def __init__(
+        self,
+        blocked_resource_types: Iterable[str] = (),
+        blocked_url_patterns: Iterable[str] = (),
+        allowed_url_patterns: Iterable[str] = (),
+        stats: Optional[Counter] = None
+    ):
+        self.blocked_resource_types = frozenset(blocked_resource_types)
+        self.blocked_url_pattern = self._compile(blocked_url_patterns)
+        self.allowed_url_pattern = self._compile(allowed_url_patterns)
+        self.stats = stats if stats is not None else Counter()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._routed_pages = weakref.WeakSet()
+
+    @staticmethod
+    def _compile(patterns: Iterable[str]) -> Optional[re.Pattern]:
+        patterns = list(patterns)
+        return re.compile("|".join(f"(?:{p})" for p in patterns)) if patterns else None
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if self.allowed_url_pattern and self.allowed_url_pattern.search(url):
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        return bool(self.blocked_url_pattern and self.blocked_url_pattern.search(url))
+
+    async def apply(self, page: Page) -> None:
+        """Install the routing handler on a page (once per page)"""
+        if page in self._routed_pages:
+            return
+        self._routed_pages.add(page)
+        await page.route("**/*", self._handle_route)
+
+    async def _handle_route(self, route: Route) -> None:
+        request = route.request
+        try:
+            if self.should_block(request.resource_type, request.url):
+                self.stats["blocked_requests"] += 1
+                self.stats["bytes_saved"] += self.ESTIMATED_BYTES.get(
+                    request.resource_type, self.DEFAULT_ESTIMATED_BYTES
+                )
+                await route.abort("blockedbyclient")
+            else:
+                self.stats["allowed_requests"] += 1
+                await route.continue_()
+        except Exception as e:
+            # The page may have been closed while the request was in flight
+            self.logger.debug(f"Error routing {request.url}: {e}")
@@ -0,0 +1,143 @@
+from playwright.async_api import ElementHandle, Page
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+import asyncio
+import json
+import logging
+import os
+import time
+
+class SelectorResolver:
+    """Wait on several candidate selectors at once and remember the winner.
+
+    All candidates are awaited concurrently and the first one to match wins.
+    The winning selector is persisted per site and step; on later runs it is
+    started first and the remaining candidates only join the race after
+    ``head_start`` seconds, so a stable layout costs a single wait.
+    """
+
+    DEFAULT_MEMORY_PATH = "data/selector_memory.json"
+
+    _shared: Optional["SelectorResolver"] = None
+
+    def __init__(self, memory_path: str = DEFAULT_MEMORY_PATH, head_start: float = 0.5):
+        self.memory_path = memory_path
+        self.head_start = head_start
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._memory: Dict[str, Dict[str, str]] = self._load()
+        # Serializes memory writes so the newest state is written last
+        self._save_lock = asyncio.Lock()
+
+    @classmethod
+    def shared(cls) -> "SelectorResolver":
+        """Process-wide resolver backed by the default memory file"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        try:
+            with open(self.memory_path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable selector memory {self.memory_path}: {e}")
+            return {}
+
+    async def _save(self) -> None:
+        """Write the memory in a worker thread, off the event loop"""
+        async with self._save_lock:
+            memory = {site: dict(steps) for site, steps in self._memory.items()}
+            await asyncio.to_thread(self._write, memory)
+
+    def _write(self, memory: Dict[str, Dict[str, str]]) -> None:
+        directory = os.path.dirname(self.memory_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.memory_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(memory, f, indent=2)
+        os.replace(tmp_path, self.memory_path)
+
+    def learned(self, site: str, step: str) -> Optional[str]:
+        return self._memory.get(site, {}).get(step)
+
+    def order(self, site: str, step: str, candidates: Sequence[str]) -> List[str]:
+        """Candidates with the remembered winner first"""
+        winner = self.learned(site, step)
+        if winner in candidates:
+            return [winner, *(c for c in candidates if c != winner)]
+        return list(candidates)
+
+    async def resolve(
+        self,
+        page: Page,
+        site: str,
+        step: str,
+        candidates: Sequence[str],
+        timeout: int = 10000,
+        state: str = "visible",
+        stats: Optional[Counter] = None
+    ) -> Tuple[Optional[str], Optional[ElementHandle]]:
+        """Return the first candidate to match and its element, or (None, None)"""
+        ordered = self.order(site, step, candidates)
+        has_winner = self.learned(site, step) in candidates
+        started = time.perf_counter()
+        start_times: Dict[str, float] = {}
+
+        async def wait(selector: str, delay: float) -> ElementHandle:
+            if delay:
+                await asyncio.sleep(delay)
+            start_times[selector] = time.perf_counter()
+            remaining = max(1, timeout - int((start_times[selector] - started) * 1000))
+            element = await page.wait_for_selector(selector, timeout=remaining, state=state)
+            if element is None:
+                raise LookupError(selector)
+            return element
+
+        tasks = {
+            asyncio.ensure_future(wait(selector, self.head_start if has_winner and i else 0)): selector
+            for i, selector in enumerate(ordered)
+        }
+        winner: Optional[str] = None
+        element: Optional[ElementHandle] = None
+        try:
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                # Several candidates may match in the same tick; keep the preferred order
+                for task in sorted(done, key=lambda t: ordered.index(tasks[t])):
+                    if not task.cancelled() and task.exception() is None:
+                        winner, element = tasks[task], task.result()
+                        break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        finished = time.perf_counter()
+        # Wall time of the race the winner did not need: waits on other
+        # candidates run concurrently and cost nothing extra, only the time
+        # before the winner joined (a stale remembered selector's head
+        # start) does, or the whole race when nothing matched
+        wasted = finished - started if winner is None else start_times[winner] - started
+        if stats is not None:
+            stats["selector_wait_seconds"] += finished - started
+            stats["selector_wasted_seconds"] += wasted
+
+        if winner is None:
+            self.logger.warning(
+                f"[{site}/{step}] no selector matched after {finished - started:.1f}s "
+                f"(waited on {len(ordered)} candidates)"
+            )
+            return None, None
+
+        self.logger.info(
+            f"[{site}/{step}] matched {winner} after {finished - started:.2f}s "
+            f"({wasted:.2f}s before it was tried)"
+        )
+        if self.learned(site, step) != winner:
+            self._memory.setdefault(site, {})[step] = winner
+            await self._save()
+        return winner, element
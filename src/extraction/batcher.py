@@ -0,0 +1,168 @@
+from src.extraction.compact import estimate_tokens
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+import asyncio
+import logging
+import re
+
+_NON_WORD = re.compile(r"\W+")
+_NON_DIGIT = re.compile(r"\D+")
+# Target of a compact "[text](url)" link
+_LINK_TARGET = re.compile(r"\]\([^)]*\)")
+
+@dataclass
+class ListingChunk:
+    listing_id: str
+    url: str
+    text: str
+    tokens: int
+    future: asyncio.Future
+
+def _normalize(text: str) -> str:
+    """Lower-case words separated by single spaces, padded so `in` matches whole words"""
+    return f" {_NON_WORD.sub(' ', text.casefold()).strip()} "
+
+def _lines(text: str) -> Set[str]:
+    """Normalized non-empty lines of a listing, link targets removed"""
+    lines = (_normalize(_LINK_TARGET.sub("", line)) for line in text.splitlines())
+    return {line for line in lines if line.strip()}
+
+class ListingBatcher:
+    """Packs listing chunks into shared LLM prompts up to a token budget.
+
+    Each page's chunks are packed in listing order: a prompt is closed as
+    soon as the next chunk would exceed ``token_budget``, and a page's
+    prompts are sent at the same time. Packing depends only on the page
+    content, never on timing, so the same page always produces the same
+    prompts and the extraction cache keeps hitting. Returned items are
+    mapped back to their listing by name (or phone number) occurring in the
+    listing text. When listings of a batch get no item, typically because
+    the response was cut off, those listings are sent again in smaller
+    batches until each one has been tried on its own.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, List[str]], Awaitable[List[dict]]],
+        token_budget: int = 1500,
+        stats: Optional[Counter] = None
+    ):
+        self.send = send
+        self.token_budget = token_budget
+        self.stats = stats if stats is not None else Counter()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def extract(self, url: str, chunks: List[str]) -> List[List[dict]]:
+        """Items extracted from each chunk, in chunk order"""
+        loop = asyncio.get_running_loop()
+        listings = [
+            ListingChunk(f"{url}#{index}", url, text, estimate_tokens(text), loop.create_future())
+            for index, text in enumerate(chunks)
+        ]
+        await asyncio.gather(*(self._send_batch(batch) for batch in self.pack(listings)))
+        # Retrieve every failure so none is reported as never retrieved
+        errors = [listing.future.exception() for listing in listings]
+        error = next((e for e in errors if e is not None), None)
+        if error is not None:
+            raise error
+        return [listing.future.result() for listing in listings]
+
+    def pack(self, chunks: List[ListingChunk]) -> List[List[ListingChunk]]:
+        """Split chunks, in order, into batches of at most ``token_budget`` tokens"""
+        batches: List[List[ListingChunk]] = []
+        tokens = 0
+        for chunk in chunks:
+            if batches and tokens + chunk.tokens <= self.token_budget:
+                batches[-1].append(chunk)
+                tokens += chunk.tokens
+            else:
+                # A chunk over the budget still gets a batch of its own
+                batches.append([chunk])
+                tokens = chunk.tokens
+        return batches
+
+    async def _send_batch(self, batch: List[ListingChunk]) -> None:
+        batch = [chunk for chunk in batch if not chunk.future.done()]
+        if not batch:
+            return
+        prompt = "\n\n".join(
+            f"--- Listing {number} ---\n{chunk.text}" for number, chunk in enumerate(batch, 1)
+        )
+        self.stats["llm_batches"] += 1
+        self.stats["batched_listings"] += len(batch)
+        try:
+            items = await self.send(batch[0].url, [prompt])
+        except Exception as e:
+            for chunk in batch:
+                if not chunk.future.done():
+                    chunk.future.set_exception(e)
+            return
+
+        assigned = self._assign(batch, items)
+        missing = [chunk for chunk in batch if not assigned[chunk.listing_id]]
+        for chunk in batch:
+            if assigned[chunk.listing_id] and not chunk.future.done():
+                chunk.future.set_result(assigned[chunk.listing_id])
+        if not missing:
+            return
+
+        if len(batch) == 1:
+            self.stats["listings_without_items"] += 1
+            if not batch[0].future.done():
+                batch[0].future.set_result([])
+            return
+
+        # Probably truncated: retry the listings without items in smaller batches
+        self.stats["split_batches"] += 1
+        if len(missing) == len(batch):
+            middle = len(missing) // 2
+            parts = [missing[:middle], missing[middle:]]
+        else:
+            parts = [missing]
+        self.logger.info(f"{len(missing)} of {len(batch)} listings got no items; resending in {len(parts)} batches")
+        await asyncio.gather(*(self._send_batch(part) for part in parts))
+
+    def _assign(self, batch: List[ListingChunk], items: List[dict]) -> Dict[str, List[dict]]:
+        """Map each returned item to the listing it was extracted from.
+
+        A listing with a line equal to the item name wins, then the listing
+        with the longest line contained in the item name (so "Pizza Roma"
+        beats "Pizza"), then any listing whose text mentions the name, and
+        finally the listing containing the item's phone number.
+        """
+        assigned: Dict[str, List[dict]] = {chunk.listing_id: [] for chunk in batch}
+        texts = [
+            (
+                chunk,
+                _normalize(chunk.text),
+                _NON_DIGIT.sub("", chunk.text),
+                _lines(chunk.text)
+            )
+            for chunk in batch
+        ]
+        for item in items:
+            if not isinstance(item, dict) or item.get("error"):
+                continue
+            name = _normalize(str(item.get("name") or ""))
+            phone = _NON_DIGIT.sub("", str(item.get("phone_number") or item.get("phone") or ""))
+            owner = None
+            if name.strip():
+                owner = next((chunk for chunk, _, _, lines in texts if name in lines), None)
+                if owner is None:
+                    contained = [
+                        (len(line), chunk) for chunk, _, _, lines in texts for line in lines if line in name
+                    ]
+                    if contained:
+                        owner = max(contained, key=lambda match: match[0])[1]
+                if owner is None:
+                    owner = next((chunk for chunk, text, _, _ in texts if name in text), None)
+            if owner is None and len(phone) >= 7:
+                owner = next((chunk for chunk, _, digits, _ in texts if phone in digits), None)
+            if owner is None and len(batch) == 1:
+                owner = batch[0]
+            if owner is None:
+                self.stats["unmapped_items"] += 1
+                continue
+            assigned[owner.listing_id].append(item)
+        return assigned
@@ -0,0 +1,153 @@
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from src.extraction.schema import HTML_PARSER
+from typing import List, Optional
+from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
+from urllib.request import urlopen
+import argparse
+import logging
+import re
+
+# Elements that never carry listing content
+DROP_TAGS = {
+    "script", "style", "noscript", "svg", "iframe", "template", "head",
+    "link", "meta", "button", "form", "input", "select", "img", "picture", "video"
+}
+
+# Elements that start a new line in the compact text
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt",
+    "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "li", "main",
+    "nav", "ol", "p", "section", "table", "tr", "ul", "br"
+}
+
+# Query parameters that only identify the click, not the target
+TRACKING_PARAMS = re.compile(r"^(utm_\w+|gclid|fbclid|mc_\w+|ref|trk|ypid|adid)$", re.IGNORECASE)
+
+REDIRECT_PARAMS = {"redirect", "url", "target"}
+
+_SPACES = re.compile(r"[ \t\r\f\v\xa0]+")
+_DATA = re.compile(r"\d|\]\(")
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count (about four characters per token)"""
+    return (len(text) + 3) // 4
+
+def clean_url(href: str, base_url: Optional[str] = None) -> Optional[str]:
+    """Absolute target URL without tracking parameters; None for script/anchor links"""
+    href = href.strip()
+    if not href or href.startswith(("#", "javascript:")):
+        return None
+    if href.startswith(("tel:", "mailto:")):
+        return href
+    parsed = urlparse(urljoin(base_url, href) if base_url else href)
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+    for key, value in params:
+        # Click-through redirects (e.g. YellowPages /gourl/...?redirect=)
+        if key.lower() in REDIRECT_PARAMS and value.startswith(("http://", "https://")):
+            return clean_url(value)
+    query = [(k, v) for k, v in params if not TRACKING_PARAMS.match(k)]
+    return urlunparse(parsed._replace(query=urlencode(query), fragment=""))
+
+def compact_html(html: str, base_url: Optional[str] = None) -> str:
+    """Structure-preserving plain text of an HTML fragment for LLM input.
+
+    Scripts, styles, forms, media and comments are dropped along with every
+    attribute except link targets. Headings become ``#`` lines, list items
+    ``-`` lines and links ``[text](url)``; phone links keep their number.
+    Whitespace is collapsed, and repeated lines without digits or links
+    (per-listing boilerplate such as "Get directions") are kept only once;
+    lines that could be listing data, like shared addresses, always stay.
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    lines: List[str] = []
+    current: List[str] = []
+
+    def flush() -> None:
+        line = _SPACES.sub(" ", "".join(current)).strip()
+        current.clear()
+        if line:
+            lines.append(line)
+
+    def walk(node: Tag) -> None:
+        for child in node.children:
+            if isinstance(child, Comment):
+                continue
+            if isinstance(child, NavigableString):
+                current.append(str(child).replace("\n", " "))
+                continue
+            if not isinstance(child, Tag) or child.name in DROP_TAGS:
+                continue
+            if child.get("hidden") is not None or child.get("aria-hidden") == "true":
+                continue
+            if child.name == "a":
+                text = _SPACES.sub(" ", child.get_text(" ")).strip()
+                url = clean_url(child.get("href", ""), base_url)
+                if url and url.startswith("tel:"):
+                    current.append(f" {text or url[4:]} ")
+                elif url and text:
+                    current.append(f" [{text}]({url}) ")
+                elif text:
+                    current.append(f" {text} ")
+                continue
+            block = child.name in BLOCK_TAGS
+            if block:
+                flush()
+                if child.name in ("h1", "h2", "h3", "h4", "h5", "h6"):
+                    current.append("#" * int(child.name[1]) + " ")
+                elif child.name in ("li", "dt"):
+                    current.append("- ")
+            walk(child)
+            if block:
+                flush()
+            elif child.name in ("td", "th"):
+                current.append(" | ")
+
+    walk(soup)
+    flush()
+
+    seen = set()
+    unique = []
+    for line in lines:
+        if line in seen and not _DATA.search(line):
+            continue
+        seen.add(line)
+        unique.append(line)
+    return "\n".join(unique)
+
+def selected_html(html: str, selector: Optional[str] = None) -> str:
+    """Markup of the elements matching `selector` (the whole page without one),
+    like the crawler's css_selector content"""
+    if not selector:
+        return html
+    soup = BeautifulSoup(html, HTML_PARSER)
+    return "".join(str(element) for element in soup.select(selector))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report LLM input tokens before and after compaction")
+    parser.add_argument("sources", nargs="+", help="Saved HTML files or page URLs")
+    parser.add_argument("--selector", help="CSS selector of the content sent to the LLM, e.g. config.CSS_SELECTOR")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    logger = logging.getLogger("compact")
+
+    total_before = total_after = 0
+    for source in args.sources:
+        if source.startswith(("http://", "https://")):
+            with urlopen(source, timeout=30) as response:
+                html = response.read().decode("utf-8", errors="replace")
+        else:
+            with open(source, encoding="utf-8") as f:
+                html = f.read()
+        # Both sides are measured on the same selected markup
+        content = selected_html(html, args.selector)
+        before = estimate_tokens(content)
+        after = estimate_tokens(compact_html(content, source if "://" in source else None))
+        total_before += before
+        total_after += after
+        logger.info(f"{source}: ~{before:,} -> ~{after:,} tokens")
+    if total_before:
+        logger.info(f"Total: ~{total_before:,} -> ~{total_after:,} tokens ({1 - total_after / total_before:.1%} fewer)")
+
+if __name__ == "__main__":
+    # python -m src.extraction.compact [--selector CSS] page.html|URL ...
+    main()
@@ -0,0 +1,161 @@
+from typing import Any, List, Optional, Sequence
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Markup differences that do not change what the LLM would extract
+_COMMENTS = re.compile(r"<!--.*?-->", re.DOTALL)
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_section(section: str) -> str:
+    """Section text with comments removed and whitespace collapsed"""
+    return _WHITESPACE.sub(" ", _COMMENTS.sub("", section)).strip()
+
+class ExtractionCache:
+    """On-disk cache of LLM extraction results keyed by content hash.
+
+    The key covers the normalized selected content plus the model and the
+    instructions, so changing either invalidates earlier results. Entries
+    older than ``max_age`` seconds are ignored and purged; when the stored
+    results exceed ``max_bytes`` the least recently used ones are evicted.
+    """
+
+    DEFAULT_PATH = "data/llm_cache.sqlite3"
+
+    def __init__(
+        self,
+        model: str,
+        instructions: str,
+        path: str = DEFAULT_PATH,
+        max_age: float = 30 * 24 * 3600,
+        max_bytes: int = 100 * 1024 * 1024
+    ):
+        self.path = path
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.hits = 0
+        self.misses = 0
+        self.tokens_saved = 0
+        self._namespace = hashlib.sha256(f"{model}\0{instructions}".encode("utf-8")).hexdigest()
+        # crawl4ai runs extraction strategies in worker threads
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS results (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                tokens INTEGER NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS results_used ON results (used_at);
+        """)
+        self._db.commit()
+        self.evict()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def key(self, sections: Sequence[str]) -> str:
+        digest = hashlib.sha256(self._namespace.encode("ascii"))
+        for section in sections:
+            digest.update(b"\0")
+            digest.update(normalize_section(section).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value, tokens, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or time.time() - row[2] > self.max_age:
+                self.misses += 1
+                return None
+            with self._db:
+                self._db.execute("UPDATE results SET used_at = ? WHERE key = ?", (time.time(), key))
+            self.hits += 1
+            self.tokens_saved += row[1]
+            return json.loads(row[0])
+
+    def put(self, key: str, value: Any, tokens: int = 0) -> None:
+        encoded = json.dumps(value, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value, size, tokens, created_at, used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, encoded, len(encoded), tokens, now, now)
+                )
+        self.evict()
+
+    def evict(self) -> None:
+        """Drop expired entries, then least recently used ones beyond max_bytes"""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM results WHERE created_at < ?", (time.time() - self.max_age,))
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            evicted = 0
+            for key, size in self._db.execute("SELECT key, size FROM results ORDER BY used_at").fetchall():
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                total -= size
+                evicted += 1
+            self.logger.info(f"Evicted {evicted} cached extraction results")
+
+class CachedExtractionStrategy:
+    """Wraps a crawl4ai extraction strategy and answers repeated content from the cache.
+
+    Everything except ``run`` and ``show_usage`` is delegated to the wrapped
+    strategy, so the wrapper can be passed wherever the strategy was.
+    """
+
+    def __init__(self, strategy: Any, cache: ExtractionCache):
+        self.strategy = strategy
+        self.cache = cache
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "strategy":
+            # Not set yet, e.g. while copying
+            raise AttributeError(name)
+        return getattr(self.strategy, name)
+
+    def run(self, url: str, sections: List[str], *args, **kwargs) -> List[dict]:
+        key = self.cache.key(sections)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        tokens_before = self._total_tokens()
+        result = self.strategy.run(url, sections, *args, **kwargs)
+        # Failed chunks come back as error blocks; those are retried next run
+        if result and not any(isinstance(block, dict) and block.get("error") for block in result):
+            self.cache.put(key, result, tokens=self._total_tokens() - tokens_before)
+        return result
+
+    def show_usage(self) -> None:
+        self.strategy.show_usage()
+        lookups = self.cache.hits + self.cache.misses
+        hit_rate = self.cache.hits / lookups if lookups else 0.0
+        print("\n=== Extraction Cache ===")
+        print(f"{'Hits:':<15} {self.cache.hits:>12,}")
+        print(f"{'Misses:':<15} {self.cache.misses:>12,}")
+        print(f"{'Hit rate:':<15} {hit_rate:>12.1%}")
+        print(f"{'Tokens saved:':<15} {self.cache.tokens_saved:>12,}")
+
+    def _total_tokens(self) -> int:
+        usage = getattr(self.strategy, "total_usage", None)
+        return getattr(usage, "total_tokens", 0) or 0
@@ -0,0 +1,220 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+from playwright.async_api import Page
+from src.models.business import Business
+import soupsieve
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+# Attributes holding URLs, resolved against the document URL like the DOM's
+# `element.href` does
+URL_ATTRIBUTES = {"href", "src", "action"}
+
+# Schema field names that differ from Business attributes
+FIELD_ALIASES = {
+    "business_name": "name",
+    "phone_number": "phone",
+}
+
+# Runs a compiled schema in the page: one evaluate per page, returns one
+# object per base element
+EXTRACT_JS = """
+(schema) => {
+    let roots = [document];
+    for (const selector of schema.baseSelectors) {
+        const found = Array.from(document.querySelectorAll(selector));
+        if (found.length) {
+            roots = found;
+            break;
+        }
+    }
+    if (schema.baseSelectors.length && roots[0] === document) {
+        return [];
+    }
+
+    const readField = (root, field) => {
+        for (const selector of field.selectors) {
+            const element = root.querySelector(selector);
+            if (!element) {
+                continue;
+            }
+            if (field.type === 'attribute') {
+                const value = element.getAttribute(field.attribute);
+                if (value === null) {
+                    continue;
+                }
+                if (schema.urlAttributes.includes(field.attribute)) {
+                    try {
+                        return new URL(value, document.baseURI).href;
+                    } catch (error) {
+                        // Malformed href: keep the raw value, like the static path
+                        return value;
+                    }
+                }
+                return value;
+            }
+            if (field.type === 'html') {
+                return element.innerHTML;
+            }
+            return element.textContent.trim();
+        }
+        return null;
+    };
+
+    return roots.map(root => {
+        const record = {};
+        for (const field of schema.fields) {
+            record[field.name] = readField(root, field);
+        }
+        return record;
+    });
+}
+"""
+
+@dataclass(frozen=True)
+class CompiledField:
+    name: str
+    selectors: Tuple[str, ...]
+    matchers: Tuple[Any, ...]
+    type: str = "text"
+    attribute: Optional[str] = None
+
+class CompiledSchema:
+    """Crawl4AI-style extraction schema compiled once for repeated use.
+
+    ``baseSelector`` (a selector or a list of fallbacks) picks the record
+    containers; when it is missing the whole document is one record. Each
+    field tries its ``selectors`` in order and reads ``text``, ``html`` or
+    an ``attribute``. The same compiled schema runs in the browser (a single
+    ``page.evaluate``) or over raw HTML with pre-compiled soupsieve matchers.
+    """
+
+    def __init__(self, schema: dict):
+        self.name = schema.get("name", "schema")
+        base = schema.get("baseSelector") or []
+        self.base_selectors = (base,) if isinstance(base, str) else tuple(base)
+        self.base_matchers = tuple(soupsieve.compile(s) for s in self.base_selectors)
+        self.fields = tuple(self._compile_field(f) for f in schema["fields"])
+        self._js_schema = {
+            "baseSelectors": list(self.base_selectors),
+            "urlAttributes": sorted(URL_ATTRIBUTES),
+            "fields": [
+                {
+                    "name": f.name,
+                    "selectors": list(f.selectors),
+                    "type": f.type,
+                    "attribute": f.attribute
+                }
+                for f in self.fields
+            ]
+        }
+
+    @staticmethod
+    def _compile_field(field: dict) -> CompiledField:
+        selectors = field.get("selectors") or [field["selector"]]
+        if isinstance(selectors, str):
+            selectors = [selectors]
+        return CompiledField(
+            name=field["name"],
+            selectors=tuple(selectors),
+            matchers=tuple(soupsieve.compile(s) for s in selectors),
+            type=field.get("type", "text"),
+            attribute=field.get("attribute")
+        )
+
+    async def extract_page(self, page: Page) -> List[Dict[str, Optional[str]]]:
+        """Extract every record from a live page in one browser round trip"""
+        return await page.evaluate(EXTRACT_JS, self._js_schema)
+
+    def extract_html(self, html: str, url: Optional[str] = None) -> List[Dict[str, Optional[str]]]:
+        """Extract every record from a raw HTML document"""
+        return [record for record, _ in self.extract_with_markup(html, url)]
+
+    def extract_with_markup(
+        self,
+        html: str,
+        url: Optional[str] = None
+    ) -> List[Tuple[Dict[str, Optional[str]], str]]:
+        """Like extract_html, paired with the markup of each record's container"""
+        soup = BeautifulSoup(html, HTML_PARSER)
+        roots = [soup]
+        for matcher in self.base_matchers:
+            found = matcher.select(soup)
+            if found:
+                roots = found
+                break
+        if self.base_matchers and roots[0] is soup:
+            return []
+        return [
+            ({field.name: self._read_field(root, field, url) for field in self.fields}, str(root))
+            for root in roots
+        ]
+
+    def extract_documents(
+        self,
+        documents: Iterable[Tuple[str, Optional[str]]]
+    ) -> List[Dict[str, Optional[str]]]:
+        """Extract a batch of (html, url) documents, tagging records with `_source`"""
+        records = []
+        for html, url in documents:
+            for record in self.extract_html(html, url):
+                record["_source"] = url
+                records.append(record)
+        return records
+
+    @staticmethod
+    def _read_field(root, field: CompiledField, url: Optional[str]) -> Optional[str]:
+        for matcher in field.matchers:
+            element = matcher.select_one(root)
+            if element is None:
+                continue
+            if field.type == "attribute":
+                value = element.get(field.attribute)
+                if value is None:
+                    continue
+                if isinstance(value, list):
+                    value = " ".join(value)
+                if url and field.attribute in URL_ATTRIBUTES:
+                    try:
+                        return urljoin(url, value)
+                    except ValueError:
+                        # Malformed href: keep the raw value, like EXTRACT_JS
+                        return value
+                return value
+            if field.type == "html":
+                return element.decode_contents()
+            return element.get_text().strip()
+        return None
+
+def record_to_business(
+    record: Dict[str, Optional[str]],
+    source: str,
+    category: str = "Unknown"
+) -> Optional[Business]:
+    """Map an extracted record onto Business; returns None without a name"""
+    values = {FIELD_ALIASES.get(key, key): value for key, value in record.items()}
+    if not values.get("name"):
+        return None
+
+    email = values.get("email")
+    if email and email.startswith("mailto:"):
+        email = email[len("mailto:"):].split("?")[0]
+
+    return Business(
+        name=values["name"],
+        category=values.get("category") or category,
+        description=values.get("description") or "",
+        address=values.get("address") or "",
+        phone=values.get("phone"),
+        email=email,
+        website=values.get("website"),
+        source=values.get("_source") or source,
+        last_updated=datetime.now()
+    )
@@ -0,0 +1,189 @@
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+from src.browser.pool import BrowserPool
+from src.metrics.registry import MetricsRegistry
+from src.models.business import Business
+from src.scrapers.base_scraper import BaseScraper
+import asyncio
+import itertools
+import json
+import logging
+import statistics
+import time
+
+@dataclass(order=True)
+class Job:
+    """One scraper run; lower priority values run first"""
+    priority: int
+    sequence: int
+    search_params: dict = field(compare=False)
+    scraper: str = field(default="wko", compare=False)
+    attempts: int = field(default=0, compare=False)
+
+    @property
+    def label(self) -> str:
+        params = ", ".join(f"{k}={v}" for k, v in self.search_params.items())
+        return f"{self.scraper}({params})"
+
+@dataclass
+class JobReport:
+    completed: int = 0
+    failed: int = 0
+    requeued: int = 0
+    businesses: int = 0
+    elapsed: float = 0.0
+    latencies: List[float] = field(default_factory=list)
+
+    @property
+    def jobs_per_minute(self) -> float:
+        return 60 * self.completed / self.elapsed if self.elapsed else 0.0
+
+    def summary(self) -> str:
+        text = (
+            f"{self.completed} jobs done, {self.failed} failed, {self.requeued} requeued, "
+            f"{self.businesses} businesses in {self.elapsed:.1f}s ({self.jobs_per_minute:.1f} jobs/min)"
+        )
+        if self.latencies:
+            ordered = sorted(self.latencies)
+            p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+            text += f", latency p50 {statistics.median(ordered):.1f}s p95 {p95:.1f}s"
+        return text
+
+def load_jobs(path: str, default_scraper: str = "wko") -> List[Job]:
+    """Read jobs from a JSON list or a JSON-lines file.
+
+    Each entry is either a bare search_params dict or an object with
+    ``search_params`` and optional ``priority`` and ``scraper`` keys.
+    """
+    with open(path, encoding="utf-8") as f:
+        content = f.read().strip()
+    if content.startswith("["):
+        entries = json.loads(content)
+    else:
+        entries = [json.loads(line) for line in content.splitlines() if line.strip()]
+
+    jobs = []
+    for sequence, entry in enumerate(entries):
+        if "search_params" not in entry:
+            entry = {"search_params": entry}
+        jobs.append(Job(
+            priority=entry.get("priority", 0),
+            sequence=sequence,
+            search_params=entry["search_params"],
+            scraper=entry.get("scraper", default_scraper)
+        ))
+    return jobs
+
+class JobScheduler:
+    """Run many scraper jobs over a shared BrowserPool.
+
+    ``workers`` is the global budget of concurrently running jobs; each
+    worker leases a page from the pool per job and drives the scraper's
+    ``scrape_iter`` contract, handing every business to ``on_business`` as
+    it arrives. A job that raises, or yields nothing when
+    ``retry_empty`` is set, is requeued behind same-priority work until it
+    has been tried ``max_attempts`` times.
+    """
+
+    def __init__(
+        self,
+        pool: BrowserPool,
+        scrapers: Dict[str, Callable[[], BaseScraper]],
+        workers: int = 2,
+        max_attempts: int = 3,
+        retry_empty: bool = False,
+        on_business: Optional[Callable[[Business], Awaitable[None]]] = None,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        self.pool = pool
+        self.scrapers = scrapers
+        self.workers = max(1, workers)
+        self.max_attempts = max_attempts
+        self.retry_empty = retry_empty
+        self.on_business = on_business
+        self.report = JobReport()
+        self.metrics = metrics or MetricsRegistry.shared()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._sequence = itertools.count(1_000_000)
+
+    def submit(self, job: Job) -> None:
+        if job.scraper not in self.scrapers:
+            raise ValueError(f"Unknown scraper {job.scraper!r} for job {job.label}")
+        self._queue.put_nowait(job)
+
+    async def run(self) -> JobReport:
+        """Run until the queue is drained"""
+        started = time.perf_counter()
+        workers = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        try:
+            await self._queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        self.report.elapsed = time.perf_counter() - started
+        self.logger.info(self.report.summary())
+        return self.report
+
+    async def _worker(self, worker_id: int) -> None:
+        # One scraper instance per worker and scraper type, since scrapers
+        # keep per-run state
+        scrapers: Dict[str, BaseScraper] = {}
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run_job(worker_id, scrapers, job)
+            finally:
+                self._queue.task_done()
+
+    async def _run_job(self, worker_id: int, scrapers: Dict[str, BaseScraper], job: Job) -> None:
+        job.attempts += 1
+        started = time.perf_counter()
+        scraper = scrapers.get(job.scraper)
+        error = None
+        count = 0
+        try:
+            if scraper is None:
+                # A factory that raises counts as a failed attempt
+                scraper = scrapers[job.scraper] = self.scrapers[job.scraper]()
+            async with self.pool.page() as page, \
+                    aclosing(scraper.scrape_iter(page, job.search_params)) as businesses:
+                async for business in businesses:
+                    count += 1
+                    if self.on_business:
+                        await self.on_business(business)
+        except Exception as e:
+            error = e
+        latency = time.perf_counter() - started
+        self.report.businesses += count
+        if scraper is None:
+            labels = {"site": job.scraper, "scraper": job.scraper}
+        else:
+            labels = {"site": scraper.SITE, "scraper": scraper.__class__.__name__}
+        self.metrics.observe("job_seconds", latency, **labels)
+        self.metrics.inc("businesses", count, **labels)
+        self.metrics.inc("jobs", outcome="ok" if error is None else "error", **labels)
+
+        if error is None and (count or not self.retry_empty):
+            self.report.completed += 1
+            self.report.latencies.append(latency)
+            self.logger.info(f"[worker {worker_id}] {job.label}: {count} businesses in {latency:.1f}s")
+            return
+
+        reason = error or "no results"
+        if job.attempts < self.max_attempts:
+            self.report.requeued += 1
+            # Lower priority so fresh jobs go first
+            self._queue.put_nowait(Job(
+                priority=job.priority + 1,
+                sequence=next(self._sequence),
+                search_params=job.search_params,
+                scraper=job.scraper,
+                attempts=job.attempts
+            ))
+            self.logger.warning(f"[worker {worker_id}] {job.label} requeued after attempt {job.attempts}: {reason}")
+        else:
+            self.report.failed += 1
+            self.logger.error(f"[worker {worker_id}] {job.label} failed after {job.attempts} attempts: {reason}")
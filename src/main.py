@@ -1,13 +1,23 @@
+import argparse
 import asyncio
 import logging
-from playwright.async_api import async_playwright
+from src.browser.pool import BrowserPool
+from src.jobs.scheduler import Job, JobScheduler, load_jobs
+from src.metrics.registry import MetricsRegistry
+from src.metrics.tracing import Tracer
+from src.scrapers.treatwell_scraper import TreatwellScraper
 from src.scrapers.wko_scraper import WKOScraper
 from datetime import datetime
-import json
 import os
-import csv
-import aiohttp
-from bs4 import BeautifulSoup
+from src.net.http_client import StaticFetcher
+from src.net.rate_limiter import AdaptiveRateLimiter
+from src.net.resilience import Resilience
+from src.storage.artifacts import ArtifactWriter
+from src.storage.checkpoint import Checkpoint
+from src.storage.dedup import DedupIndex
+from src.storage.fingerprints import ChangeFeed, FingerprintStore
+from src.storage.journal import CrawlJournal
+from src.storage.sinks import CSVSink, MultiSink, NDJSONSink
 
 # Set up logging
 logging.basicConfig(
@@ -19,123 +29,175 @@ logger = logging.getLogger(__name__)
 # Ensure data directory exists
 os.makedirs("data", exist_ok=True)
 
-async def save_results(businesses, filename):
-    """Save scraped results to JSON file"""
-    output = []
-    for business in businesses:
-        business_dict = business.__dict__
-        # Handle nested dataclass serialization
-        if business_dict.get('social_media'):
-            business_dict['social_media'] = business_dict['social_media'].__dict__
-        if business_dict.get('hours'):
-            business_dict['hours'] = [h.__dict__ for h in business_dict['hours']]
-        business_dict['last_updated'] = business_dict['last_updated'].isoformat()
-        output.append(business_dict)
-        
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(output, f, indent=2, ensure_ascii=False)
-    logger.info(f"Saved JSON results to {filename}")
+# Search parameters used when no job file is given
+DEFAULT_SEARCH_PARAMS = {
+    "keyword": "Gasthaus",
+    "location": "Graz-Stadt (Bezirk)",
+    "limit": 1,
+    "concurrency": 4  # Detail pages processed in parallel
+}
 
-async def save_as_csv(businesses, filename):
-    """Save results as CSV file"""
-    fieldnames = [
-        'name', 'category', 'description', 'address', 'phone', 'email', 
-        'website', 'source', 'last_updated', 'hours', 'social_media'
-    ]
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        
-        for business in businesses:
-            # Format hours as string
-            hours_str = "; ".join([f"{h.day}: {h.hours}" for h in business.hours]) if business.hours else ""
-            
-            # Format social media as string
-            social_media_str = ", ".join([
-                f"{platform}: {url}" 
-                for platform, url in business.social_media.__dict__.items() 
-                if url
-            ])
-            
-            row = {
-                'name': business.name,
-                'category': business.category,
-                'description': business.description,
-                'address': business.address,
-                'phone': business.phone,
-                'email': business.email,
-                'website': business.website,
-                'source': business.source,
-                'last_updated': business.last_updated.isoformat(),
-                'hours': hours_str,
-                'social_media': social_media_str
-            }
-            writer.writerow(row)
-    logger.info(f"Saved CSV results to {filename}")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape business directories")
+    parser.add_argument("--jobs", help="JSON or JSON-lines file of search_params / job entries")
+    parser.add_argument("--workers", type=int, default=1, help="Jobs running at the same time")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Tries per job before giving up")
+    parser.add_argument("--retry-empty", action="store_true",
+                        help="Also retry jobs that finish without any businesses")
+    parser.add_argument("--artifacts", choices=ArtifactWriter.MODES, default="errors",
+                        help="Debug screenshot/HTML capture policy")
+    parser.add_argument("--artifact-sample", type=int, default=50,
+                        help="Capture every Nth page in 'sample' mode")
+    parser.add_argument("--artifact-quota-mb", type=int, default=200,
+                        help="Disk quota for artifacts; oldest files are evicted")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only emit new or changed businesses and write a change feed")
+    parser.add_argument("--refresh-ttl-hours", type=float, default=24,
+                        help="In incremental mode, skip businesses refreshed within this many hours")
+    parser.add_argument("--reset-query", action="store_true",
+                        help="Forget the journaled progress of this run's queries and search them again")
+    parser.add_argument("--report", help="JSON run report path (default data/run_report_<timestamp>.json)")
+    parser.add_argument("--prometheus", help="Also write the metrics to this Prometheus text file")
+    parser.add_argument("--trace", help="Record trace spans and write them as a Chrome trace JSON file")
+    return parser.parse_args()
 
 async def main():
+    args = parse_args()
+    journal = None
+    dedup = None
+    fingerprints = None
+    metrics = MetricsRegistry.shared()
+    tracer = Tracer.shared()
+    tracer.enabled = bool(args.trace)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    run_summary = {}
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(
-                headless=True,
-                args=[
-                    '--disable-dev-shm-usage',
-                    '--no-sandbox',
-                    '--disable-setuid-sandbox',
-                    '--disable-web-security'
-                ]
-            )
+        if args.jobs:
+            jobs = load_jobs(args.jobs)
+        else:
+            jobs = [Job(priority=0, sequence=0, search_params=DEFAULT_SEARCH_PARAMS)]
+        concurrency = max(job.search_params.get("concurrency", 1) for job in jobs)
+        
+        # Crawl progress survives crashes; rerunning the same query resumes it
+        journal = CrawlJournal()
+        if args.reset_query:
+            for job in jobs:
+                journal.forget(CrawlJournal.query_key(job.search_params))
+        # Committed by the result sink, not every N businesses
+        dedup = DedupIndex(commit_every=None)
+        if args.incremental:
+            fingerprints = FingerprintStore()
+        artifacts = ArtifactWriter(
+            mode=args.artifacts,
+            sample_every=args.artifact_sample,
+            quota_bytes=args.artifact_quota_mb * 1024 * 1024
+        )
+        
+        # One browser and a set of pre-warmed contexts shared by every job;
+        # each job leases its search page plus concurrency - 1 detail pages
+        async with BrowserPool(size=args.workers * concurrency, max_navigations=50) as pool, \
+                StaticFetcher(limit_per_host=args.workers * concurrency) as fetcher:
+            # Businesses are confirmed in the dedup index, their URLs marked
+            # done in the journal and their fingerprints stored once their
+            # batch reaches the disk, so after a crash all three match what
+            # was written
+            checkpoint = Checkpoint()
+            
+            def persisted(businesses):
+                dedup.confirm(businesses)
+                checkpoint.persisted(businesses)
             
-            # Create context with specific settings
-            context = await browser.new_context(
-                viewport={'width': 1920, 'height': 1080},
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-                locale='de-AT',
-                ignore_https_errors=True,
-                bypass_csp=True
+            # Results are streamed to disk as they are produced
+            sink = MultiSink(
+                NDJSONSink(f"data/wko_results_{timestamp}.ndjson", on_flush=persisted),
+                CSVSink(f"data/wko_results_{timestamp}.csv")
             )
+            changes = ChangeFeed(f"data/changes_{timestamp}.ndjson") if fingerprints else None
             
-            # Set reasonable timeouts
-            context.set_default_timeout(60000)  # 1 minute
-            page = await context.new_page()
-            page.set_default_timeout(60000)  # 1 minute
+            saved = 0
             
-            # Initialize WKO scraper
-            wko_scraper = WKOScraper()
+            async def write_unique(business):
+                nonlocal saved
+                # Skip businesses already seen in this or any earlier run;
+                # in incremental runs changed records of known businesses
+                # reach the change feed, not the result files
+                if dedup.check_and_add(business, pending=True) is None:
+                    await sink.write(business)
+                    saved += 1
+                else:
+                    # Nothing to write, so nothing to wait for
+                    checkpoint.persisted([business])
             
-            # Search parameters
-            search_params = {
-                "keyword": "Gasthaus",
-                "location": "Graz-Stadt (Bezirk)",
-                "limit": 1
-            }
+            async with sink:
+                scheduler = JobScheduler(
+                    pool,
+                    scrapers={
+                        "wko": lambda: WKOScraper(
+                            pool=pool,
+                            fetcher=fetcher,
+                            journal=journal,
+                            checkpoint=checkpoint,
+                            artifacts=artifacts,
+                            fingerprints=fingerprints,
+                            changes=changes,
+                            refresh_ttl=args.refresh_ttl_hours * 3600
+                        ),
+                        "treatwell": lambda: TreatwellScraper(pool=pool, artifacts=artifacts)
+                    },
+                    workers=args.workers,
+                    max_attempts=args.max_attempts,
+                    retry_empty=args.retry_empty,
+                    on_business=write_unique
+                )
+                for job in jobs:
+                    scheduler.submit(job)
+                report = await scheduler.run()
+            await artifacts.close()
+            if checkpoint.outstanding:
+                logger.warning(f"{checkpoint.outstanding} URLs stay pending: their businesses were never written")
+            if changes:
+                await changes.close()
+                logger.info(f"Changes since the previous run: {changes.counts or 'none'}")
             
-            # Run scraper
-            logger.info("Starting WKO scraper...")
-            businesses = await wko_scraper.scrape(page, search_params)
+            run_summary = {
+                "jobs": {
+                    "completed": report.completed,
+                    "failed": report.failed,
+                    "requeued": report.requeued,
+                    "jobs_per_minute": round(report.jobs_per_minute, 3)
+                },
+                "businesses": report.businesses,
+                "saved": saved,
+                "changes": changes.counts if changes else None,
+                # Shared by every scraper and the static fetcher
+                "hosts": AdaptiveRateLimiter.shared().snapshot(),
+                "resilience": dict(Resilience.shared().stats)
+            }
             
-            if businesses:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                
-                # Save as JSON
-                json_filename = f"data/wko_results_{timestamp}.json"
-                await save_results(businesses, json_filename)
-                
-                # Save as CSV
-                csv_filename = f"data/wko_results_{timestamp}.csv"
-                await save_as_csv(businesses, csv_filename)
-                
-                logger.info(f"Saved {len(businesses)} businesses")
+            if report.businesses:
+                dedup_stats = dedup.stats()
+                logger.info(
+                    f"Saved {saved} businesses "
+                    f"({report.businesses - saved} duplicates skipped, {dedup_stats['records']} known)"
+                )
             else:
                 logger.warning("No businesses found")
             
-            await browser.close()
-            
     except Exception as e:
         logger.error(f"Error in main: {str(e)}", exc_info=True)
         raise
     finally:
+        if journal:
+            journal.close()
+        if dedup:
+            dedup.close()
+        if fingerprints:
+            fingerprints.close()
+        metrics.write_report(args.report or f"data/run_report_{timestamp}.json", **run_summary)
+        if args.prometheus:
+            metrics.write_prometheus(args.prometheus)
+        if args.trace:
+            tracer.export(args.trace)
         logger.info("Scraping completed")
 
 if __name__ == "__main__":
@@ -0,0 +1,205 @@
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import asyncio
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+
+# Upper bounds in seconds, from DOM queries to LLM calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _escape(value: str) -> str:
+    """Prometheus label value escaping"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+class Histogram:
+    """Cumulative-bucket latency histogram with quantile estimates"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Linear interpolation within the bucket holding the q-th observation"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, count in enumerate(self.counts):
+            upper = self.buckets[index] if index < len(self.buckets) else self.max
+            if count and seen + count >= rank:
+                return min(lower + (upper - lower) * (rank - seen) / count, self.max)
+            seen += count
+            lower = upper
+        return self.max
+
+class MetricsRegistry:
+    """Counters and latency histograms labelled by stage, site and scraper.
+
+    Shared by the WKO/Treatwell scrapers, the YellowPages crawl and the
+    sinks. ``timer`` wraps a stage; ``write_report`` dumps everything as
+    JSON and ``write_prometheus`` as a Prometheus text file (e.g. for the
+    node exporter's textfile collector).
+    """
+
+    _shared: Optional["MetricsRegistry"] = None
+
+    def __init__(self, namespace: str = "scraper"):
+        self.namespace = namespace
+        self.started = time.time()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._counters: Dict[Tuple[str, Labels], float] = {}
+        self._histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        # Sink writes and LLM calls report from worker threads
+        self._lock = threading.Lock()
+
+    @classmethod
+    def shared(cls) -> "MetricsRegistry":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @staticmethod
+    def _labels(labels: dict) -> Labels:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, self._labels(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Observe the duration of the block; failures are also counted.
+
+        Cancelled or abandoned blocks are neither: their duration says
+        nothing about the stage and they did not fail.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            raise
+        except BaseException:
+            base = name[:-len("_seconds")] if name.endswith("_seconds") else name
+            self.inc(f"{base}_errors", **labels)
+            self.observe(name, time.perf_counter() - started, **labels)
+            raise
+        self.observe(name, time.perf_counter() - started, **labels)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {
+                    "name": name,
+                    "labels": dict(labels),
+                    "count": h.count,
+                    "sum": round(h.sum, 6),
+                    "mean": round(h.sum / h.count, 6) if h.count else 0.0,
+                    "p50": round(h.quantile(0.5), 6),
+                    "p95": round(h.quantile(0.95), 6),
+                    "p99": round(h.quantile(0.99), 6),
+                    "max": round(h.max, 6)
+                }
+                for (name, labels), h in sorted(self._histograms.items())
+            ]
+        return {"counters": counters, "histograms": histograms}
+
+    def stage_totals(self, name: str = "stage_seconds") -> List[dict]:
+        """Total seconds per stage across sites, largest first"""
+        totals: Dict[str, List[float]] = {}
+        with self._lock:
+            for (metric, labels), h in self._histograms.items():
+                if metric != name:
+                    continue
+                stage = dict(labels).get("stage", "")
+                entry = totals.setdefault(stage, [0, 0.0])
+                entry[0] += h.count
+                entry[1] += h.sum
+        return [
+            {"stage": stage, "count": count, "seconds": round(seconds, 3)}
+            for stage, (count, seconds) in sorted(totals.items(), key=lambda item: -item[1][1])
+        ]
+
+    def write_report(self, path: str, **extra) -> None:
+        """Write a JSON run report with `extra` fields and every metric"""
+        report = {
+            "generated_at": datetime.now().isoformat(),
+            "elapsed_seconds": round(time.time() - self.started, 3),
+            **extra,
+            "stages": self.stage_totals(),
+            **self.snapshot()
+        }
+        self._write(path, json.dumps(report, indent=2, ensure_ascii=False, default=str))
+        self.logger.info(f"Run report written to {path}")
+
+    def to_prometheus(self) -> str:
+        lines: List[str] = []
+        typed = set()
+
+        def label_text(labels: Labels, extra: Labels = ()) -> str:
+            pairs = [f'{key}="{_escape(value)}"' for key, value in labels + extra]
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                metric = f"{self.namespace}_{name}_total"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} counter")
+                    typed.add(metric)
+                lines.append(f"{metric}{label_text(labels)} {value:g}")
+            for (name, labels), h in sorted(self._histograms.items()):
+                metric = f"{self.namespace}_{name}"
+                if metric not in typed:
+                    lines.append(f"# TYPE {metric} histogram")
+                    typed.add(metric)
+                cumulative = 0
+                for bound, count in zip(h.buckets, h.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{label_text(labels, (('le', f'{bound:g}'),))} {cumulative}")
+                lines.append(f"{metric}_bucket{label_text(labels, (('le', '+Inf'),))} {h.count}")
+                lines.append(f"{metric}_sum{label_text(labels)} {h.sum:.6f}")
+                lines.append(f"{metric}_count{label_text(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str) -> None:
+        self._write(path, self.to_prometheus())
+
+    @staticmethod
+    def _write(path: str, content: str) -> None:
+        # Write-then-rename so scrapers of the file never see half a report
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(temporary, path)
@@ -0,0 +1,124 @@
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from src.metrics.registry import MetricsRegistry
+from typing import ContextManager, Iterator, List, Optional, Tuple
+import itertools
+import json
+import logging
+import os
+import time
+
+# (pid, tid) of the innermost open span; tasks inherit it when created
+_track: ContextVar[Tuple[int, int]] = ContextVar("trace_track", default=(1, 0))
+
+# Returned by every span while tracing is off, so disabled hooks cost one
+# attribute check
+_NULL_SPAN = nullcontext()
+
+class Tracer:
+    """Opt-in span recorder exporting Chrome trace / Perfetto JSON.
+
+    Spans are complete ("X") events. ``group`` starts a new process row
+    (used per query) and ``track`` a new thread row inside the current
+    group (used per URL), so concurrent detail pages appear as parallel
+    tracks nested under their query. Child spans inherit the row through
+    a context variable, including in tasks created inside the span.
+    """
+
+    _shared: Optional["Tracer"] = None
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._events: List[dict] = []
+        self._pids = itertools.count(2)
+        self._tids = itertools.count(1)
+        self._origin = time.perf_counter_ns()
+
+    @classmethod
+    def shared(cls) -> "Tracer":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def span(
+        self,
+        name: str,
+        category: str = "scraper",
+        group: Optional[str] = None,
+        track: Optional[str] = None,
+        **args
+    ) -> ContextManager[None]:
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, category, group, track, args)
+
+    @contextmanager
+    def _span(self, name: str, category: str, group: Optional[str], track: Optional[str], args: dict) -> Iterator[None]:
+        pid, tid = _track.get()
+        if group is not None:
+            pid, tid = next(self._pids), 0
+            self._metadata("process_name", pid, tid, group)
+        if track is not None:
+            tid = next(self._tids)
+            self._metadata("thread_name", pid, tid, track)
+        token = _track.set((pid, tid))
+        started = time.perf_counter_ns()
+        error = None
+        try:
+            yield
+        except GeneratorExit:
+            # A consumer closing a generator early is not a failure
+            raise
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            try:
+                _track.reset(token)
+            except ValueError:
+                # Closed from another context, e.g. an async generator
+                # finalized after its consumer went away; that context is done
+                pass
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": (started - self._origin) / 1000,
+                "dur": (time.perf_counter_ns() - started) / 1000,
+                "pid": pid,
+                "tid": tid
+            }
+            if error:
+                args = {**args, "error": error}
+            if args:
+                event["args"] = {key: str(value) for key, value in args.items()}
+            self._events.append(event)
+
+    def _metadata(self, kind: str, pid: int, tid: int, name: str) -> None:
+        self._events.append({"name": kind, "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+
+    def durations(self, *names: str) -> List[float]:
+        """Seconds taken by every recorded span with one of `names`"""
+        return [
+            event["dur"] / 1_000_000
+            for event in self._events
+            if event["ph"] == "X" and event["name"] in names
+        ]
+
+    def export(self, path: str) -> None:
+        """Write the recorded spans; open the file in ui.perfetto.dev or chrome://tracing"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": self._events, "displayTimeUnit": "ms"}, f)
+        spans = sum(1 for event in self._events if event["ph"] == "X")
+        self.logger.info(f"Wrote {spans} trace spans to {path}")
+
+@contextmanager
+def timed(tracer: Tracer, metrics: MetricsRegistry, stage: str, site: str, scraper: str, **args) -> Iterator[None]:
+    """Record a stage both as a trace span and in the ``stage_seconds`` histogram"""
+    with tracer.span(stage, category=site, **args), \
+            metrics.timer("stage_seconds", stage=stage, site=site, scraper=scraper):
+        yield
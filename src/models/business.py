@@ -23,6 +23,7 @@ class Business:
     category: str
     address: str
     source: str = "Unknown"  # Move this before the default arguments
+    description: Optional[str] = None
     phone: Optional[str] = None
     email: Optional[str] = None
     website: Optional[str] = None
@@ -0,0 +1,108 @@
+from src.browser.pool import BrowserPool
+from src.net.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from src.net.resilience import TRANSIENT_STATUSES, Resilience, TransientStatusError
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, Optional
+import aiohttp
+import logging
+
+@dataclass
+class FetchResult:
+    status: int
+    text: Optional[str] = None
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+class StaticFetcher:
+    """Pooled aiohttp session for pages that do not need a browser.
+
+    Requests use the same user agent and language as the browser contexts so
+    the server returns the same markup to both tiers.
+    """
+
+    def __init__(
+        self,
+        limit: int = 10,
+        limit_per_host: int = 4,
+        timeout: int = 30,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        resilience: Optional[Resilience] = None
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter.shared()
+        self.resilience = resilience or Resilience.shared()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "StaticFetcher":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        if self._session:
+            return
+        settings = BrowserPool.CONTEXT_SETTINGS
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host),
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            headers={
+                "User-Agent": settings["user_agent"],
+                "Accept": "text/html,application/xhtml+xml",
+                "Accept-Language": f"{settings['locale']},de;q=0.9"
+            }
+        )
+
+    async def close(self) -> None:
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def fetch(self, url: str, stats: Optional[Counter] = None) -> Optional[str]:
+        """Return the HTML of `url`, or None if the response is not usable HTML.
+
+        Transient failures are retried; `stats` receives the retry and
+        circuit-breaker counters of the calling run.
+        """
+        result = await self.fetch_conditional(url, stats=stats)
+        return result.text if result and result.status == 200 else None
+
+    async def fetch_conditional(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        stats: Optional[Counter] = None
+    ) -> Optional[FetchResult]:
+        """Fetch with extra (e.g. If-None-Match) headers; a 304 comes back with text None"""
+        await self.start()
+        try:
+            return await self.resilience.call(url, self._fetch_once, url, headers, stats=stats)
+        except Exception as e:
+            self.logger.warning(f"Static fetch of {url} failed: {e}")
+            return None
+
+    async def _fetch_once(self, url: str, headers: Optional[Dict[str, str]]) -> Optional[FetchResult]:
+        async with self.rate_limiter.request(url) as slot, self._session.get(url, headers=headers) as response:
+            slot.status = response.status
+            slot.retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if response.status in TRANSIENT_STATUSES:
+                raise TransientStatusError(url, response.status)
+            result = FetchResult(
+                status=response.status,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified")
+            )
+            if response.status == 304:
+                return result
+            if response.status != 200:
+                self.logger.warning(f"Static fetch of {url} returned {response.status}")
+                return None
+            if "html" not in response.headers.get("Content-Type", ""):
+                return None
+            result.text = await response.text()
+            return result
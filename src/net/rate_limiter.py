@@ -0,0 +1,167 @@
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, Optional
+from urllib.parse import urlparse
+import asyncio
+import logging
+import time
+
+# Status codes that mean "slow down"
+THROTTLE_STATUSES = {429, 503}
+
+@dataclass
+class HostState:
+    rate: float
+    tokens: float
+    updated: float = field(default_factory=time.monotonic)
+    paused_until: float = 0.0
+    latency: Optional[float] = None  # fast EWMA
+    baseline: Optional[float] = None  # slow EWMA of healthy responses
+    requests: int = 0
+    backoffs: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+@dataclass
+class RequestSlot:
+    """Handed to the caller of AdaptiveRateLimiter.request to report the outcome"""
+    status: Optional[int] = None
+    retry_after: Optional[float] = None
+
+class AdaptiveRateLimiter:
+    """Per-host token bucket whose rate follows AIMD.
+
+    Every healthy response (no throttling status, latency within
+    ``latency_factor`` times the host's baseline) adds ``increase`` requests
+    per second; a 429/503, an error or a latency spike multiplies the rate by
+    ``decrease``. A ``Retry-After`` value pauses the host entirely.
+    """
+
+    # Latencies below this never count as a spike (avoids noise on fast hosts)
+    MIN_BASELINE = 0.05
+
+    _shared: Optional["AdaptiveRateLimiter"] = None
+
+    def __init__(
+        self,
+        initial_rate: float = 2.0,
+        min_rate: float = 0.2,
+        max_rate: float = 20.0,
+        burst: float = 2.0,
+        increase: float = 0.25,
+        decrease: float = 0.5,
+        latency_factor: float = 2.0
+    ):
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._hosts: Dict[str, HostState] = {}
+
+    @classmethod
+    def shared(cls) -> "AdaptiveRateLimiter":
+        """Process-wide limiter so every fetch path paces the same hosts together"""
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        return urlparse(url).netloc or url
+
+    def _state(self, host: str) -> HostState:
+        if host not in self._hosts:
+            self._hosts[host] = HostState(rate=self.initial_rate, tokens=self.burst)
+        return self._hosts[host]
+
+    async def acquire(self, url: str) -> None:
+        """Wait until the host's bucket has a token"""
+        state = self._state(self.host_of(url))
+        async with state.lock:
+            while True:
+                now = time.monotonic()
+                if now < state.paused_until:
+                    await asyncio.sleep(state.paused_until - now)
+                    continue
+                state.tokens = min(self.burst, state.tokens + (now - state.updated) * state.rate)
+                state.updated = now
+                if state.tokens >= 1:
+                    state.tokens -= 1
+                    state.requests += 1
+                    return
+                await asyncio.sleep((1 - state.tokens) / state.rate)
+
+    def record(
+        self,
+        url: str,
+        latency: float,
+        status: Optional[int] = None,
+        error: bool = False,
+        retry_after: Optional[float] = None
+    ) -> None:
+        """Feed a response back into the host's rate"""
+        host = self.host_of(url)
+        state = self._state(host)
+        state.latency = latency if state.latency is None else 0.7 * state.latency + 0.3 * latency
+
+        slow = (
+            state.baseline is not None
+            and state.latency > self.latency_factor * max(state.baseline, self.MIN_BASELINE)
+        )
+        if error or status in THROTTLE_STATUSES or slow:
+            state.rate = max(self.min_rate, state.rate * self.decrease)
+            state.backoffs += 1
+            if retry_after:
+                state.paused_until = max(state.paused_until, time.monotonic() + retry_after)
+            reason = f"status {status}" if status in THROTTLE_STATUSES else "error" if error else "latency"
+            self.logger.info(f"Backing off {host} ({reason}): {state.rate:.2f} req/s")
+            return
+
+        state.baseline = latency if state.baseline is None else 0.9 * state.baseline + 0.1 * latency
+        state.rate = min(self.max_rate, state.rate + self.increase)
+
+    @asynccontextmanager
+    async def request(self, url: str) -> AsyncIterator[RequestSlot]:
+        """Acquire a token, time the block and record its outcome.
+
+        Set ``slot.status`` (and ``slot.retry_after``) inside the block;
+        an exception counts as an error.
+        """
+        await self.acquire(url)
+        slot = RequestSlot()
+        started = time.monotonic()
+        try:
+            yield slot
+        except Exception:
+            self.record(url, time.monotonic() - started, error=True)
+            raise
+        self.record(url, time.monotonic() - started, slot.status, retry_after=slot.retry_after)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Current per-host rate, latency and counters"""
+        return {
+            host: {
+                "rate": round(state.rate, 3),
+                "latency": round(state.latency, 3) if state.latency is not None else None,
+                "requests": state.requests,
+                "backoffs": state.backoffs
+            }
+            for host, state in self._hosts.items()
+        }
+
+    def log_rates(self) -> None:
+        for host, info in self.snapshot().items():
+            self.logger.info(
+                f"{host}: {info['rate']} req/s, latency {info['latency']}s, "
+                f"{info['requests']} requests, {info['backoffs']} backoffs"
+            )
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header (delta-seconds form only)"""
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
@@ -0,0 +1,231 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+import asyncio
+import logging
+import random
+import time
+
+# Each fetch path only needs its own client library, so none is required here
+TRANSIENT_ERRORS: tuple = (asyncio.TimeoutError, TimeoutError, ConnectionError)
+try:
+    import aiohttp
+    TRANSIENT_ERRORS += (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError)
+except ImportError:
+    pass
+try:
+    from playwright.async_api import Error as PlaywrightError, TimeoutError as PlaywrightTimeoutError
+    TRANSIENT_ERRORS += (PlaywrightTimeoutError,)
+except ImportError:
+    PlaywrightError = None
+try:
+    import requests
+    TRANSIENT_ERRORS += (requests.ConnectionError, requests.Timeout)
+except ImportError:
+    pass
+
+# HTTP statuses worth retrying
+TRANSIENT_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+class TransientStatusError(Exception):
+    """Raised by fetch functions for a retryable HTTP status"""
+
+    def __init__(self, url: str, status: int):
+        super().__init__(f"{url} returned {status}")
+        self.status = status
+
+class CircuitOpenError(Exception):
+    """The host's circuit is open; the call was not attempted"""
+
+def is_transient(error: BaseException) -> bool:
+    if isinstance(error, (TransientStatusError, *TRANSIENT_ERRORS)):
+        return True
+    # Playwright reports network failures as generic errors with a net:: code
+    return PlaywrightError is not None and isinstance(error, PlaywrightError) and "net::" in str(error)
+
+@dataclass
+class RetryPolicy:
+    max_attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (1-based) attempt"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+class CircuitBreaker:
+    """Per-host breaker: opens after `failure_threshold` consecutive failures,
+    lets one probe through after `reset_timeout` seconds (half-open) and
+    closes again on success."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def release(self) -> None:
+        """End a probe without a verdict (e.g. a cancelled call), so the next
+        caller may probe instead of the host staying locked out"""
+        self.probing = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+            self.probing = False
+
+class Resilience:
+    """Retries with jittered exponential backoff plus a circuit breaker per host.
+
+    Used by both the Playwright and the HTTP fetch paths. Only transient
+    errors (timeouts, connection failures, retryable statuses) are retried;
+    anything else is raised immediately. Counters are kept process-wide in
+    ``stats`` and, when a ``stats`` Counter is passed, per run as well.
+    """
+
+    _shared: Optional["Resilience"] = None
+
+    def __init__(
+        self,
+        retry: Optional[RetryPolicy] = None,
+        failure_threshold: int = 5,
+        reset_timeout: float = 60.0
+    ):
+        self.retry = retry or RetryPolicy()
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.stats: Counter = Counter()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def shared(cls) -> "Resilience":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def breaker(self, url: str) -> CircuitBreaker:
+        host = urlparse(url).netloc or url
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+        return self._breakers[host]
+
+    def _count(self, key: str, stats: Optional[Counter]) -> None:
+        self.stats[key] += 1
+        if stats is not None:
+            stats[key] += 1
+
+    def _before_attempt(self, url: str, stats: Optional[Counter]) -> CircuitBreaker:
+        breaker = self.breaker(url)
+        if not breaker.allow():
+            self._count("breaker_rejections", stats)
+            raise CircuitOpenError(f"Circuit open for {urlparse(url).netloc or url}")
+        return breaker
+
+    def _after_failure(
+        self,
+        url: str,
+        breaker: CircuitBreaker,
+        error: Exception,
+        attempt: int,
+        stats: Optional[Counter]
+    ) -> Optional[float]:
+        """Record a failed attempt; returns the backoff delay, or None to give up"""
+        if not is_transient(error):
+            # The host answered; the failure is not its availability
+            breaker.record_success()
+            return None
+        was_closed = breaker.state == "closed"
+        breaker.record_failure()
+        if was_closed and breaker.state == "open":
+            self._count("breaker_opens", stats)
+            self.logger.warning(f"Circuit opened for {urlparse(url).netloc} after {breaker.failures} failures")
+        if attempt >= self.retry.max_attempts or breaker.state == "open":
+            self._count("give_ups", stats)
+            self.logger.warning(f"Giving up on {url} after {attempt} attempts: {error}")
+            return None
+        self._count("retries", stats)
+        delay = self.retry.delay(attempt)
+        self.logger.info(f"Retrying {url} in {delay:.1f}s (attempt {attempt}): {error}")
+        return delay
+
+    async def call(
+        self,
+        url: str,
+        fn: Callable[..., Awaitable[T]],
+        *args,
+        stats: Optional[Counter] = None,
+        **kwargs
+    ) -> T:
+        attempt = 0
+        while True:
+            attempt += 1
+            breaker = self._before_attempt(url, stats)
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._after_failure(url, breaker, e, attempt, stats)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                # Cancelled mid-attempt: says nothing about the host
+                breaker.release()
+                raise
+            breaker.record_success()
+            return result
+
+    def call_sync(
+        self,
+        url: str,
+        fn: Callable[..., T],
+        *args,
+        stats: Optional[Counter] = None,
+        **kwargs
+    ) -> T:
+        """Blocking counterpart of `call` for synchronous clients such as requests"""
+        attempt = 0
+        while True:
+            attempt += 1
+            breaker = self._before_attempt(url, stats)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._after_failure(url, breaker, e, attempt, stats)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            return result
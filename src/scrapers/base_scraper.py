@@ -1,25 +1,181 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
-from playwright.async_api import Page
+from collections import Counter
+from contextlib import aclosing, asynccontextmanager
+from typing import AsyncIterator, ContextManager, List, Optional, Sequence, Tuple
+from playwright.async_api import ElementHandle, Page
+from src.browser.pool import BrowserPool
+from src.browser.resource_policy import ResourcePolicy
+from src.browser.selectors import SelectorResolver
+from src.metrics.registry import MetricsRegistry
+from src.metrics.tracing import Tracer, timed
+from src.net.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+from src.net.resilience import TRANSIENT_STATUSES, Resilience, TransientStatusError
 from src.models.business import Business
+from src.storage.artifacts import ArtifactWriter
 import logging
 
 class BaseScraper(ABC):
-    def __init__(self):
+    # Key for per-site state such as learned selectors
+    SITE: str = "default"
+    
+    # Default request-blocking profile (ResourcePolicy keyword arguments);
+    # None loads every resource
+    RESOURCE_POLICY: Optional[dict] = None
+    
+    def __init__(
+        self,
+        pool: Optional[BrowserPool] = None,
+        resource_policy: Optional[dict] = None,
+        selector_resolver: Optional[SelectorResolver] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        resilience: Optional[Resilience] = None,
+        artifacts: Optional[ArtifactWriter] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Tracer] = None
+    ):
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.pool = pool
+        self.selector_resolver = selector_resolver or SelectorResolver.shared()
+        # Shared with StaticFetcher so both tiers pace each host together
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter.shared()
+        # Retries and per-host circuit breakers, also shared with StaticFetcher
+        self.resilience = resilience or Resilience.shared()
+        # Debug screenshots/HTML, captured per the run's artifact policy
+        self.artifacts = artifacts or ArtifactWriter.shared()
+        # Per-run counters, reset at the start of every scrape
+        self.stats: Counter = Counter()
+        # Process-wide latency histograms per stage, site and scraper
+        self.metrics = metrics or MetricsRegistry.shared()
+        # Chrome-trace spans; a no-op unless tracing was enabled for the run
+        self.tracer = tracer or Tracer.shared()
+        
+        profile = resource_policy if resource_policy is not None else self.RESOURCE_POLICY
+        self.resource_policy = ResourcePolicy(stats=self.stats, **profile) if profile is not None else None
     
     @abstractmethod
-    async def scrape(self, page: Page, search_params: dict) -> List[Business]:
-        """Main scraping method to be implemented by each scraper"""
+    def scrape_iter(self, page: Page, search_params: dict) -> AsyncIterator[Business]:
+        """Yield businesses as they are extracted; implemented by each scraper.
+        
+        Consumers may stop early (e.g. once they have enough records); wrap the
+        iterator in ``contextlib.aclosing`` so in-flight work is cancelled.
+        Errors that end the scrape are logged, captured and re-raised so
+        callers such as the job scheduler can retry.
+        """
         pass
     
+    async def scrape(self, page: Page, search_params: dict) -> List[Business]:
+        """Main scraping method: collect scrape_iter into a list"""
+        async with aclosing(self.scrape_iter(page, search_params)) as businesses:
+            return [business async for business in businesses]
+    
+    @asynccontextmanager
+    async def lease_page(self, page: Page) -> AsyncIterator[Page]:
+        """Lease an additional page from the shared pool, or open one next to `page`"""
+        if self.pool:
+            async with self.pool.page() as leased_page:
+                await self.prepare_page(leased_page)
+                yield leased_page
+            return
+        
+        extra_page = await page.context.new_page()
+        try:
+            await self.prepare_page(extra_page)
+            yield extra_page
+        finally:
+            await extra_page.close()
+    
+    def timed(self, stage: str, **args) -> ContextManager[None]:
+        """Record the duration of a stage in the metrics and, when tracing, as a span"""
+        return timed(self.tracer, self.metrics, stage, self.SITE, self.__class__.__name__, **args)
+    
+    def span(self, name: str, **kwargs):
+        """Trace span without a metric, e.g. per query or per URL"""
+        return self.tracer.span(name, category=self.SITE, **kwargs)
+    
+    def query_label(self, search_params: dict) -> str:
+        params = ", ".join(f"{key}={value}" for key, value in search_params.items())
+        return f"{self.SITE}({params})"
+    
+    def count(self, name: str, value: float = 1) -> None:
+        self.metrics.inc(name, value, site=self.SITE, scraper=self.__class__.__name__)
+    
+    async def prepare_page(self, page: Page) -> None:
+        """Apply the scraper's resource policy to a page"""
+        if self.resource_policy:
+            await self.resource_policy.apply(page)
+    
+    async def goto(
+        self,
+        page: Page,
+        url: str,
+        ready_selector: Optional[str] = None,
+        timeout: int = 60000
+    ) -> None:
+        """Navigate and wait for a readiness selector instead of network idle.
+        
+        Transient failures (timeouts, network errors, 429/5xx) are retried
+        with backoff; a host with an open circuit fails fast.
+        """
+        await self.prepare_page(page)
+        with self.timed("navigation", url=url):
+            await self.resilience.call(url, self._navigate, page, url, timeout, stats=self.stats)
+        if ready_selector:
+            try:
+                with self.timed("selector_wait", selector=ready_selector):
+                    await page.wait_for_selector(ready_selector, state="attached", timeout=timeout)
+            except Exception:
+                self.logger.warning(f"Ready selector {ready_selector} not found on {url}")
+    
+    async def _navigate(self, page: Page, url: str, timeout: int) -> None:
+        async with self.rate_limiter.request(url) as slot:
+            response = await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+            if response:
+                slot.status = response.status
+                slot.retry_after = parse_retry_after(response.headers.get("retry-after"))
+        self.stats["navigations"] += 1
+        if response and response.status in TRANSIENT_STATUSES:
+            raise TransientStatusError(url, response.status)
+    
+    async def wait_for_any(
+        self,
+        page: Page,
+        step: str,
+        selectors: Sequence[str],
+        timeout: int = 10000
+    ) -> Tuple[Optional[str], Optional[ElementHandle]]:
+        """Race candidate selectors for a step; returns (selector, element) or (None, None)"""
+        with self.timed("selector_wait", step=step):
+            return await self.selector_resolver.resolve(
+                page, self.SITE, step, selectors, timeout=timeout, stats=self.stats
+            )
+    
+    async def capture(self, page: Page, name: str, error: bool = False, include_html: bool = False) -> None:
+        """Hand a debug artifact of `page` to the artifact writer"""
+        with self.timed("artifact", name=name):
+            captured = await self.artifacts.capture(page, f"{self.SITE}_{name}", error=error, include_html=include_html)
+        if captured:
+            self.stats["artifacts"] += 1
+    
+    def reset_stats(self) -> None:
+        self.stats.clear()
+    
+    def log_stats(self) -> None:
+        """Log the counters collected during the last run"""
+        if self.stats:
+            summary = ", ".join(f"{key}={value:g}" for key, value in sorted(self.stats.items()))
+            self.logger.info(f"Run stats: {summary}")
+        self.rate_limiter.log_rates()
+    
     async def safe_get_text(self, page: Page, selector: str) -> Optional[str]:
         """Safely extract text from an element"""
         try:
-            element = await page.query_selector(selector)
-            if element:
-                return await element.text_content()
-            return None
+            with self.timed("dom_query", selector=selector):
+                element = await page.query_selector(selector)
+                self.stats["round_trips"] += 1
+                if element:
+                    self.stats["round_trips"] += 1
+                    return await element.text_content()
+                return None
         except Exception as e:
             self.logger.error(f"Error extracting text from {selector}: {e}")
             return None
@@ -27,10 +183,13 @@ class BaseScraper(ABC):
     async def safe_get_attribute(self, page: Page, selector: str, attribute: str) -> Optional[str]:
         """Safely get attribute from an element"""
         try:
-            element = await page.query_selector(selector)
-            if element:
-                return await element.get_attribute(attribute)
-            return None
+            with self.timed("dom_query", selector=selector):
+                element = await page.query_selector(selector)
+                self.stats["round_trips"] += 1
+                if element:
+                    self.stats["round_trips"] += 1
+                    return await element.get_attribute(attribute)
+                return None
         except Exception as e:
             self.logger.error(f"Error getting attribute {attribute} from {selector}: {e}")
-            return None 
\ No newline at end of file
+            return None
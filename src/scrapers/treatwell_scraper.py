@@ -1,158 +1,213 @@
 from src.scrapers.base_scraper import BaseScraper
+from src.browser.resource_policy import TRACKER_PATTERNS
+from src.extraction.schema import CompiledSchema
 from src.models.business import Business, BusinessHours, SocialMediaLinks
 from playwright.async_api import Page
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Optional
 from datetime import datetime
 import logging
 import json
 
 class TreatwellScraper(BaseScraper):
+    SITE = "treatwell"
     BASE_URL = "https://www.treatwell.de"
     
-    async def scrape(self, page: Page, search_params: dict) -> List[Business]:
-        businesses = []
-        try:
-            # Navigate to main page
-            self.logger.info(f"Navigating to {self.BASE_URL}")
-            await page.goto(self.BASE_URL, wait_until="networkidle", timeout=60000)
-            
-            # Wait for page to be fully loaded
-            await page.wait_for_load_state("domcontentloaded")
-            
-            # Debug: Log current URL
-            self.logger.info(f"Current URL: {page.url}")
-            
-            # Accept cookies if present
+    # Treatwell is a client-rendered app: keep scripts and stylesheets (the
+    # search input must be visible to be filled), drop media and trackers
+    RESOURCE_POLICY = {
+        "blocked_resource_types": ["image", "media", "font"],
+        "blocked_url_patterns": TRACKER_PATTERNS
+    }
+    
+    # Salon card fields, relative to each result card
+    CARD_FIELDS = [
+        {"name": "name", "selectors": [".salon-name"], "type": "text"},
+        {"name": "address", "selectors": [".salon-address"], "type": "text"},
+        {"name": "rating", "selectors": [".rating-score"], "type": "text"},
+        {"name": "reviews", "selectors": [".review-count"], "type": "text"},
+        {"name": "category", "selectors": [".salon-category"], "type": "text"},
+        {"name": "website", "selectors": ["a.salon-link"], "type": "attribute", "attribute": "href"}
+    ]
+    
+    def __init__(self, batch_extraction: bool = True, **kwargs):
+        super().__init__(**kwargs)
+        # Read all cards in one evaluate instead of per-field element handles
+        self.batch_extraction = batch_extraction
+        self._card_extractors: Dict[str, CompiledSchema] = {}
+    
+    async def scrape_iter(self, page: Page, search_params: dict) -> AsyncIterator[Business]:
+        self.reset_stats()
+        with self.span("query", group=self.query_label(search_params), params=search_params):
             try:
-                accept_button = await page.wait_for_selector(
-                    "button[data-testid='cookie-banner-accept-button']",
-                    timeout=5000
-                )
-                if accept_button:
-                    await accept_button.click()
-                    self.logger.info("Accepted cookies")
-            except Exception:
-                self.logger.info("No cookie banner found")
-            
-            # Try different search input selectors
-            search_selectors = [
-                "#search-input",
-                "input[placeholder*='Suche']",
-                "input[placeholder*='search']",
-                "input[placeholder*='Search']",
-                "[data-testid='search-input']",
-                "[data-testid='searchbox-input']",
-                "#searchbox-input"
-            ]
-            
-            search_input = None
-            for selector in search_selectors:
-                try:
-                    self.logger.info(f"Trying search selector: {selector}")
-                    search_input = await page.wait_for_selector(selector, timeout=5000)
-                    if search_input:
-                        self.logger.info(f"Found search input with selector: {selector}")
-                        break
-                except Exception:
-                    continue
+                # Navigate to main page; the search input waits below act as the
+                # readiness check
+                self.logger.info(f"Navigating to {self.BASE_URL}")
+                await self.goto(page, self.BASE_URL, ready_selector="body")
+            
+                # Debug: Log current URL
+                self.logger.info(f"Current URL: {page.url}")
             
-            if not search_input:
-                # Try clicking a search button first
+                # Accept cookies if present
                 try:
-                    search_button = await page.wait_for_selector(
-                        "[data-testid='search-button'], .search-button, button:has-text('Suche')",
+                    accept_button = await page.wait_for_selector(
+                        "button[data-testid='cookie-banner-accept-button']",
                         timeout=5000
                     )
-                    if search_button:
-                        await search_button.click()
-                        self.logger.info("Clicked search button")
-                        # Wait for search input to appear
-                        await page.wait_for_timeout(1000)
-                        for selector in search_selectors:
-                            search_input = await page.wait_for_selector(selector, timeout=5000)
-                            if search_input:
-                                break
-                except Exception as e:
-                    self.logger.error(f"Error clicking search button: {e}")
-            
-            if not search_input:
-                # Save screenshot and HTML for debugging
-                await page.screenshot(path="search_input_not_found.png")
-                content = await page.content()
-                with open("page_content.html", "w", encoding="utf-8") as f:
-                    f.write(content)
-                raise Exception("Could not find search input")
-            
-            # Enter search term
-            await search_input.fill(search_params.get("keyword", "Friseur"))
-            await page.wait_for_timeout(1000)
-            
-            # Try different ways to trigger search
-            try:
-                # First try pressing Enter
-                await search_input.press("Enter")
-                await page.wait_for_timeout(2000)
-                
-                # If that doesn't work, try clicking a search submit button
-                if not await page.query_selector(".salon-search-result"):
-                    submit_button = await page.query_selector(
-                        "button[type='submit'], [data-testid='search-submit']"
-                    )
-                    if submit_button:
-                        await submit_button.click()
-            except Exception as e:
-                self.logger.error(f"Error triggering search: {e}")
-            
-            # Wait for results with multiple possible selectors
-            result_selectors = [
-                ".salon-search-result",
-                "[data-testid='salon-card']",
-                ".venue-card",
-                ".search-result-item"
-            ]
-            
-            found_selector = None
-            for selector in result_selectors:
-                try:
-                    await page.wait_for_selector(selector, timeout=10000)
-                    found_selector = selector
-                    break
+                    if accept_button:
+                        await accept_button.click()
+                        self.logger.info("Accepted cookies")
                 except Exception:
-                    continue
-            
-            if not found_selector:
-                raise Exception("No search results found")
-            
-            # Extract all salon cards
-            salon_cards = await page.query_selector_all(found_selector)
-            self.logger.info(f"Found {len(salon_cards)} salons")
-            
-            # Process each salon
-            limit = search_params.get("limit", 10)
-            for card in salon_cards[:limit]:
+                    self.logger.info("No cookie banner found")
+            
+                # Try different search input selectors
+                search_selectors = [
+                    "#search-input",
+                    "input[placeholder*='Suche']",
+                    "input[placeholder*='search']",
+                    "input[placeholder*='Search']",
+                    "[data-testid='search-input']",
+                    "[data-testid='searchbox-input']",
+                    "#searchbox-input"
+                ]
+            
+                selector, search_input = await self.wait_for_any(
+                    page, "search_input", search_selectors, timeout=5000
+                )
+                if search_input:
+                    self.logger.info(f"Found search input with selector: {selector}")
+            
+                if not search_input:
+                    # Try clicking a search button first
+                    try:
+                        search_button = await page.wait_for_selector(
+                            "[data-testid='search-button'], .search-button, button:has-text('Suche')",
+                            timeout=5000
+                        )
+                        if search_button:
+                            await search_button.click()
+                            self.logger.info("Clicked search button")
+                            # Wait for search input to appear
+                            _, search_input = await self.wait_for_any(
+                                page, "search_input", search_selectors, timeout=6000
+                            )
+                    except Exception as e:
+                        self.logger.error(f"Error clicking search button: {e}")
+            
+                if not search_input:
+                    # Save screenshot and HTML for debugging
+                    await self.capture(page, "search_input_not_found", error=True, include_html=True)
+                    raise Exception("Could not find search input")
+            
+                # Enter search term
+                await search_input.fill(search_params.get("keyword", "Friseur"))
+            
+                # Possible result selectors
+                result_selectors = [
+                    ".salon-search-result",
+                    "[data-testid='salon-card']",
+                    ".venue-card",
+                    ".search-result-item"
+                ]
+            
+                # Try different ways to trigger search
+                found_selector = None
                 try:
-                    business = await self._extract_business_from_card(card)
+                    # First try pressing Enter
+                    await self.rate_limiter.acquire(self.BASE_URL)
+                    await search_input.press("Enter")
+                    found_selector, _ = await self.wait_for_any(page, "results", result_selectors, timeout=3000)
+                
+                    # If that doesn't work, try clicking a search submit button
+                    if not found_selector:
+                        submit_button = await page.query_selector(
+                            "button[type='submit'], [data-testid='search-submit']"
+                        )
+                        if submit_button:
+                            await self.rate_limiter.acquire(self.BASE_URL)
+                            await submit_button.click()
+                except Exception as e:
+                    self.logger.error(f"Error triggering search: {e}")
+            
+                # Wait for results with multiple possible selectors
+                if not found_selector:
+                    found_selector, _ = await self.wait_for_any(page, "results", result_selectors, timeout=10000)
+            
+                if not found_selector:
+                    raise Exception("No search results found")
+            
+                limit = search_params.get("limit", 10)
+                self.stats["result_pages"] += 1
+                if self.batch_extraction:
+                    # Every field of every card in a single evaluate
+                    with self.timed("evaluate"):
+                        records = await self._card_extractor(found_selector).extract_page(page)
+                    self.stats["round_trips"] += 1
+                    self.logger.info(f"Found {len(records)} salons")
+                    candidates = [self._business_from_record(record) for record in records[:limit]]
+                else:
+                    # Extract all salon cards
+                    salon_cards = await page.query_selector_all(found_selector)
+                    self.stats["round_trips"] += 1
+                    self.logger.info(f"Found {len(salon_cards)} salons")
+                    candidates = []
+                    for card in salon_cards[:limit]:
+                        try:
+                            candidates.append(await self._extract_business_from_card(card))
+                        except Exception as e:
+                            self.logger.error(f"Error processing salon card: {str(e)}")
+            
+                self.logger.info(
+                    f"{self.stats['round_trips']:g} browser round trips for "
+                    f"{self.stats['result_pages']:g} result page(s)"
+                )
+            
+                # Keep the valid salons
+                for business in candidates:
                     if business and business.validate():
-                        businesses.append(business)
                         self.logger.info(f"Successfully scraped business: {business.name}")
-                except Exception as e:
-                    self.logger.error(f"Error processing salon card: {str(e)}")
-                    continue
+                        yield business
                     
-        except Exception as e:
-            self.logger.error(f"Error scraping Treatwell: {str(e)}")
-            # Take error screenshot
-            try:
-                await page.screenshot(path="error_screenshot.png")
-                self.logger.info("Error screenshot saved")
-                content = await page.content()
-                with open("error_page.html", "w", encoding="utf-8") as f:
-                    f.write(content)
-                self.logger.info("Error page HTML saved")
-            except Exception as screenshot_error:
-                self.logger.error(f"Error saving debug info: {screenshot_error}")
-            
-        return businesses
+            except Exception as e:
+                self.logger.error(f"Error scraping Treatwell: {str(e)}")
+                # Take error screenshot and HTML
+                await self.capture(page, "error", error=True, include_html=True)
+                raise
+            finally:
+                self.log_stats()
+    
+    def _card_extractor(self, card_selector: str) -> CompiledSchema:
+        """Compiled card schema for the result selector that matched"""
+        if card_selector not in self._card_extractors:
+            self._card_extractors[card_selector] = CompiledSchema({
+                "name": "Treatwell Salon Card",
+                "baseSelector": card_selector,
+                "fields": self.CARD_FIELDS
+            })
+        return self._card_extractors[card_selector]
+    
+    def _business_from_record(self, record: dict) -> Optional[Business]:
+        """Build a Business from a batched card record"""
+        name = record.get("name")
+        if not name:
+            return None
+        
+        rating = record.get("rating")
+        reviews = record.get("reviews")
+        description = f"Rating: {rating}, Reviews: {reviews}" if rating and reviews else ""
+        address = record.get("address")
+        
+        return Business(
+            name=name.strip(),
+            category=(record.get("category") or "Beauty Salon").strip(),
+            description=description,
+            address=address.strip() if address else None,
+            phone=None,  # Phone is usually on detail page
+            email=None,  # Email is usually not public
+            website=record.get("website"),
+            social_media=SocialMediaLinks(),
+            source="treatwell.de",
+            last_updated=datetime.now()
+        )
     
     async def _extract_business_from_card(self, card) -> Optional[Business]:
         try:
@@ -1,16 +1,99 @@
 from src.scrapers.base_scraper import BaseScraper
-from src.models.business import Business, BusinessHours, SocialMediaLinks
+from src.browser.resource_policy import TRACKER_PATTERNS
+from src.net.http_client import FetchResult, StaticFetcher
+from src.extraction.schema import HTML_PARSER, CompiledSchema, record_to_business
+from src.storage.checkpoint import Checkpoint
+from src.storage.fingerprints import ChangeFeed, FingerprintStore
+from src.storage.journal import CrawlJournal
+from src.models.business import Business
 from playwright.async_api import Page
-from typing import List, Optional
-import logging
+from typing import AsyncContextManager, AsyncIterator, Callable, Deque, List, Optional, Tuple
 from datetime import datetime
 from bs4 import BeautifulSoup
-import json
-import os
+import asyncio
+import re
+import time
+from urllib.parse import urljoin
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass, field
+
+class ResultPageError(Exception):
+    """A result page could not be loaded"""
+
+@dataclass
+class ResultWalk:
+    """How a query's result pages were walked"""
+    pages: int = 0
+    failed_pages: List[int] = field(default_factory=list)
+    # Stopped at MAX_RESULT_PAGES
+    truncated: bool = False
+    
+    @property
+    def complete(self) -> bool:
+        """Every result page was loaded"""
+        return not self.failed_pages and not self.truncated
 
 class WKOScraper(BaseScraper):
+    SITE = "wko"
     BASE_URL = "https://firmen.wko.at/SearchSimple.aspx"
     
+    # Number of detail pages processed at the same time; override per run
+    # with search_params["concurrency"]
+    DEFAULT_CONCURRENCY = 1
+    
+    # Firmen A-Z pages are server-rendered; nothing but the HTML is needed
+    RESOURCE_POLICY = {
+        "blocked_resource_types": ["image", "media", "font", "stylesheet"],
+        "blocked_url_patterns": TRACKER_PATTERNS
+    }
+    
+    # Elements whose presence means a page is ready for extraction
+    SEARCH_READY_SELECTOR = "#aspnetForm"
+    DETAIL_READY_SELECTOR = "h1.company-name, .firmenlisting-title, h3"
+    
+    # Result list links and pagination
+    RESULT_LINK_SELECTOR = "h3.firmenlisting-title a, a.firmenlisting-link"
+    PAGER_SELECTOR = ".pagination a, .pager a, a[href*='page='], a[href*='seite=']"
+    NEXT_PAGE_SELECTOR = "a[rel='next'], .pagination .next a, .pager .next a"
+    # The pager's page-number parameter, as a whole query parameter
+    PAGE_PARAM_PATTERN = re.compile(r"([?&](?:page|seite)=)(\d+)(?=$|[&#])", re.IGNORECASE)
+    
+    # Upper bound on result pages walked per query
+    MAX_RESULT_PAGES = 500
+    
+    RESULTS_PAGE_JS = """
+        ([linkSelector, pagerSelector]) => ({
+            links: Array.from(document.querySelectorAll(linkSelector)).map(link => ({
+                url: link.href,
+                name: link.textContent.trim()
+            })),
+            pager: Array.from(document.querySelectorAll(pagerSelector)).map(link => link.href)
+        })
+    """
+    
+    # Detail pages hold a single business, so the schema has no baseSelector;
+    # selectors are tried in order until one matches
+    DETAIL_SCHEMA = {
+        "name": "WKO Detail Page",
+        "fields": [
+            {"name": "name", "selectors": ["h1.company-name", ".firmenlisting-title", "h3"], "type": "text"},
+            {"name": "address", "selectors": [".address", ".firmenlisting-address"], "type": "text"},
+            {"name": "postal", "selectors": [".postal-code"], "type": "text"},
+            {"name": "city", "selectors": [".city"], "type": "text"},
+            {"name": "phone", "selectors": [".phone", "a[href^='tel:']"], "type": "text"},
+            {"name": "email", "selectors": ["a[href^='mailto:']"], "type": "attribute", "attribute": "href"},
+            {
+                "name": "website",
+                "selectors": [".website a", "a[href^='http']:not([href*='wko.at'])"],
+                "type": "attribute",
+                "attribute": "href"
+            },
+            {"name": "description", "selectors": [".description", ".company-description"], "type": "text"},
+            {"name": "category", "selectors": [".category", ".business-type"], "type": "text"}
+        ]
+    }
+    
     # Update the extraction schema with actual selectors from the search results
     EXTRACTION_SCHEMA = {
         "name": "WKO Business Directory",
@@ -87,103 +170,533 @@ class WKOScraper(BaseScraper):
         ]
     }
     
-    async def scrape(self, page: Page, search_params: dict) -> List[Business]:
-        businesses = []
-        try:
-            # Navigate to search page and submit form
-            self.logger.info(f"Navigating to {self.BASE_URL}")
-            await page.goto(self.BASE_URL, wait_until="networkidle", timeout=240000)
-            await self._submit_search_form(page, search_params)
+    # Compiled once per process and shared by the browser and static paths
+    DETAIL_EXTRACTOR = CompiledSchema(DETAIL_SCHEMA)
+    LISTING_EXTRACTOR = CompiledSchema(EXTRACTION_SCHEMA)
+    
+    def __init__(
+        self,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        fetcher: Optional[StaticFetcher] = None,
+        journal: Optional[CrawlJournal] = None,
+        checkpoint: Optional[Checkpoint] = None,
+        fingerprints: Optional[FingerprintStore] = None,
+        changes: Optional[ChangeFeed] = None,
+        refresh_ttl: float = 0,
+        **kwargs
+    ):
+        super().__init__(**kwargs)
+        # When set, the link frontier and per-URL progress are journaled so
+        # an interrupted query resumes where it stopped
+        self.journal = journal
+        # When set, a URL only counts as done once the consumer has
+        # persisted its business; otherwise as soon as it is yielded
+        self.checkpoint = checkpoint
+        # When set, detail pages are fetched over plain HTTP first and the
+        # browser is only used if the static parse finds no name
+        self.fetcher = fetcher
+        self.concurrency = max(1, concurrency)
+        # Incremental mode: URLs refreshed less than refresh_ttl seconds ago
+        # are skipped, unchanged records are dropped and new, changed and
+        # removed records go to the change feed
+        self.fingerprints = fingerprints
+        self.changes = changes
+        self.refresh_ttl = refresh_ttl
+    
+    async def scrape_iter(self, page: Page, search_params: dict) -> AsyncIterator[Business]:
+        self.reset_stats()
+        limit = search_params.get("limit", 10)
+        concurrency = max(1, search_params.get("concurrency", self.concurrency))
+        if self.pool:
+            # This job's own page already holds one of the pool's contexts;
+            # leasing more than the pool has would wait until the acquire
+            # timeout
+            concurrency = min(concurrency, self.pool.size)
+        # Identifies the query in the journal and the fingerprint store
+        query_key = None if search_params.get("listing_only") else CrawlJournal.query_key(search_params)
+        with self.span("query", group=self.query_label(search_params), params=search_params):
+            try:
+                targets = self.journal.resume_targets(query_key, limit) if self.journal and query_key else None
+                if targets is not None:
+                    # Resume from the journal without repeating the search
+                    retries = sum(1 for target in targets if target["attempts"])
+                    self.logger.info(
+                        f"Resuming query {query_key}: {len(targets)} links left, {retries} retries"
+                    )
+                    async for business in self._iter_details(page, targets, concurrency, query_key):
+                        yield business
+                    return
             
-            # Wait for search results
-            await page.wait_for_load_state("networkidle")
+                # Navigate to search page and submit form
+                self.logger.info(f"Navigating to {self.BASE_URL}")
+                await self.goto(page, self.BASE_URL, ready_selector=self.SEARCH_READY_SELECTOR, timeout=240000)
+                with self.timed("search_submit"):
+                    await self._submit_search_form(page, search_params)
             
-            # Get all Gasthaus links
-            gasthaus_links = await page.evaluate("""
-                () => {
-                    const links = Array.from(document.querySelectorAll('h3.firmenlisting-title a, a.firmenlisting-link'));
-                    return links.map(link => ({
-                        url: link.href,
-                        name: link.textContent.trim()
-                    }));
-                }
-            """)
+                if search_params.get("listing_only"):
+                    # Read every business straight off the result list in one
+                    # evaluate, without visiting detail pages
+                    with self.timed("evaluate"):
+                        records = await self.LISTING_EXTRACTOR.extract_page(page)
+                    self.stats["evaluate_calls"] += 1
+                    category = search_params.get("keyword") or "Unknown"
+                    for record in records[:limit]:
+                        business = record_to_business(record, page.url, category=category)
+                        if business:
+                            yield business
+                    return
             
-            self.logger.info(f"Found {len(gasthaus_links)} Gasthaus links")
+                # Get all Gasthaus links across every result page
+                walk = ResultWalk()
+                gasthaus_links = [
+                    link async for link in self._iter_result_links(page, concurrency, walk)
+                ]
             
-            # Process each Gasthaus
-            limit = search_params.get("limit", 10)
-            for gasthaus in gasthaus_links[:limit]:
-                try:
-                    self.logger.info(f"Processing Gasthaus: {gasthaus['name']}")
-                    
-                    # Navigate to Gasthaus detail page
-                    await page.goto(gasthaus['url'], wait_until="networkidle", timeout=60000)
-                    await page.wait_for_load_state("domcontentloaded")
-                    
-                    # Extract detailed information
-                    business_data = await page.evaluate("""
-                        () => {
-                            const getData = (selector) => {
-                                const element = document.querySelector(selector);
-                                return element ? element.textContent.trim() : null;
-                            };
-                            
-                            const getLink = (selector) => {
-                                const element = document.querySelector(selector);
-                                return element ? element.href : null;
-                            };
-                            
-                            return {
-                                name: getData('h1.company-name, .firmenlisting-title, h3'),
-                                address: getData('.address, .firmenlisting-address'),
-                                postal: getData('.postal-code'),
-                                city: getData('.city'),
-                                phone: getData('.phone, a[href^="tel:"]'),
-                                email: getLink('a[href^="mailto:"]'),
-                                website: getLink('.website a, a[href^="http"]:not([href*="wko.at"])'),
-                                description: getData('.description, .company-description'),
-                                category: getData('.category, .business-type')
-                            };
-                        }
-                    """)
-                    
-                    # Create business object
-                    if business_data.get('name'):
-                        address = ", ".join(filter(None, [
-                            business_data.get('address'),
-                            business_data.get('postal'),
-                            business_data.get('city')
-                        ]))
-                        
-                        business = Business(
-                            name=business_data['name'],
-                            category="Gasthaus",
-                            description=business_data.get('description', ''),
-                            address=address,
-                            phone=business_data.get('phone'),
-                            email=business_data.get('email'),
-                            website=business_data.get('website'),
-                            source=gasthaus['url'],
-                            last_updated=datetime.now()
-                        )
-                        
-                        businesses.append(business)
-                        self.logger.info(f"Added business: {business.name}")
-                        
-                        # Take screenshot of detail page
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        await page.screenshot(path=f"screenshots/detail_{timestamp}.png")
+                self.logger.info(
+                    f"Found {len(gasthaus_links)} Gasthaus links"
+                    + ("" if walk.complete else f" (incomplete: result pages {walk.failed_pages} failed)")
+                )
+            
+                targets = gasthaus_links[:limit]
+                if self.journal and gasthaus_links:
+                    self.journal.record_frontier(
+                        query_key, search_params, gasthaus_links, limit=limit, complete=walk.complete
+                    )
+                    targets = self.journal.pending(query_key, limit)
+            
+                # Process each Gasthaus
+                async for business in self._iter_details(page, targets, concurrency, query_key):
+                    yield business
+            
+                # Only a complete walk of every result page shows that stored
+                # URLs which did not come back are gone; a failed or capped
+                # page would otherwise report its businesses as removed
+                if self.fingerprints and walk.complete:
+                    await self._report_removed(gasthaus_links, query_key)
                     
-                except Exception as e:
-                    self.logger.error(f"Error processing Gasthaus {gasthaus['name']}: {e}")
+            except Exception as e:
+                self.logger.error(f"Error during scraping: {e}")
+                await self.capture(page, "error", error=True)
+                raise
+            finally:
+                self._log_tier_report()
+                self.log_stats()
+
+    async def _iter_result_links(self, page: Page, concurrency: int, walk: ResultWalk) -> AsyncIterator[dict]:
+        """Yield unique result links of every result page, in page order.
+
+        When the pager exposes page numbers in its URLs, the remaining pages
+        are fetched directly, up to `concurrency` at a time; each page's pager
+        can reveal further pages, so windowed pagers ("1 2 3 ... next") are
+        followed to the real last page. Otherwise "next" is clicked one page
+        at a time. Pages that fail are recorded in `walk` and skipped.
+        """
+        seen = set()
+        
+        def unseen(links: List[dict]) -> List[dict]:
+            fresh = [link for link in links if link["url"] not in seen]
+            seen.update(link["url"] for link in fresh)
+            return fresh
+        
+        with self.timed("evaluate"):
+            first = await page.evaluate(self.RESULTS_PAGE_JS, [self.RESULT_LINK_SELECTOR, self.PAGER_SELECTOR])
+        self.stats["result_pages"] += 1
+        walk.pages += 1
+        for link in unseen(first["links"]):
+            yield link
+        
+        if not first["links"]:
+            return
+        template, last_page = self._detect_pagination(first["pager"])
+        
+        if not template:
+            async for link in self._click_through_pages(page, unseen, walk):
+                yield link
+            return
+        
+        semaphore = asyncio.Semaphore(concurrency)
+        # Pages that fall back to the browser use this job's page, which is
+        # idle during the walk, plus up to concurrency - 1 pages leased on
+        # first need, so the walk never holds more pages than the details do
+        browser_pages: asyncio.Queue = asyncio.Queue()
+        browser_pages.put_nowait(page)
+        leases = AsyncExitStack()
+        leased = 0
+        
+        @asynccontextmanager
+        async def browser_page() -> AsyncIterator[Page]:
+            nonlocal leased
+            if browser_pages.empty() and leased < concurrency - 1:
+                leased += 1
+                try:
+                    browser_pages.put_nowait(await leases.enter_async_context(self.lease_page(page)))
+                except BaseException:
+                    leased -= 1
+                    raise
+            result_page = await browser_pages.get()
+            try:
+                yield result_page
+            finally:
+                browser_pages.put_nowait(result_page)
+        
+        async def fetch(page_number: int) -> dict:
+            url = template.format(page=page_number)
+            with self.span("result_page", track=url):
+                async with semaphore:
+                    return await self._fetch_result_page(browser_page, url)
+        
+        next_page = 2
+        in_flight: Deque[Tuple[int, asyncio.Task]] = deque()
+        
+        def fill() -> None:
+            nonlocal next_page
+            while len(in_flight) < concurrency and next_page <= min(last_page, self.MAX_RESULT_PAGES):
+                in_flight.append((next_page, asyncio.create_task(fetch(next_page))))
+                next_page += 1
+        
+        try:
+            fill()
+            while in_flight:
+                page_number, task = in_flight.popleft()
+                try:
+                    result = await task
+                except ResultPageError as e:
+                    self.logger.error(str(e))
+                    walk.failed_pages.append(page_number)
+                    fill()
                     continue
-                    
+                walk.pages += 1
+                last_page = max(last_page, self._detect_pagination(result["pager"])[1])
+                fill()
+                for link in unseen(result["links"]):
+                    yield link
+        finally:
+            for _, task in in_flight:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in in_flight), return_exceptions=True)
+            await leases.aclose()
+        
+        if last_page > self.MAX_RESULT_PAGES:
+            self.logger.warning(f"Stopped after {self.MAX_RESULT_PAGES} of {last_page} result pages")
+            walk.truncated = True
+        self.logger.info(f"Result pages: {walk.pages} loaded, {len(walk.failed_pages)} failed")
+
+    def _detect_pagination(self, pager_hrefs: List[str]) -> Tuple[Optional[str], int]:
+        """Return a result URL template with a {page} placeholder and the highest page number"""
+        template = None
+        total_pages = 1
+        for href in pager_hrefs:
+            match = self.PAGE_PARAM_PATTERN.search(href)
+            if not match or "{" in href or "}" in href:
+                continue
+            total_pages = max(total_pages, int(match.group(2)))
+            if template is None:
+                start, end = match.span(2)
+                template = href[:start] + "{page}" + href[end:]
+        return template, total_pages
+
+    async def _fetch_result_page(
+        self,
+        browser_page: Callable[[], AsyncContextManager[Page]],
+        url: str
+    ) -> dict:
+        """Links and pager hrefs of one result page, statically when possible.
+
+        `browser_page` provides the page used when the static fetch fails.
+
+        Raises ResultPageError when the page cannot be loaded, so a failed
+        page is not mistaken for one without results.
+        """
+        try:
+            self.stats["result_pages"] += 1
+            if self.fetcher:
+                with self.timed("static_fetch"):
+                    html = await self.fetcher.fetch(url, stats=self.stats)
+                if html:
+                    soup = BeautifulSoup(html, HTML_PARSER)
+                    links = [
+                        {"url": urljoin(url, a["href"]), "name": a.get_text().strip()}
+                        for a in soup.select(self.RESULT_LINK_SELECTOR)
+                        if a.get("href")
+                    ]
+                    if links:
+                        pager = [urljoin(url, a["href"]) for a in soup.select(self.PAGER_SELECTOR) if a.get("href")]
+                        return {"links": links, "pager": pager}
+            async with browser_page() as result_page:
+                await self.goto(result_page, url, ready_selector=self.RESULT_LINK_SELECTOR)
+                with self.timed("evaluate"):
+                    return await result_page.evaluate(self.RESULTS_PAGE_JS, [self.RESULT_LINK_SELECTOR, self.PAGER_SELECTOR])
         except Exception as e:
-            self.logger.error(f"Error during scraping: {e}")
-            await page.screenshot(path="error.png")
+            self.stats["failed_result_pages"] += 1
+            raise ResultPageError(f"Error loading result page {url}: {e}") from e
+
+    async def _click_through_pages(self, page: Page, unseen, walk: ResultWalk) -> AsyncIterator[dict]:
+        """Fallback pagination for pagers without page URLs (e.g. postbacks)"""
+        while True:
+            next_link = await page.query_selector(self.NEXT_PAGE_SELECTOR)
+            if not next_link:
+                return
+            if walk.pages >= self.MAX_RESULT_PAGES:
+                self.logger.warning(f"Stopped after {self.MAX_RESULT_PAGES} result pages")
+                walk.truncated = True
+                return
+            try:
+                async with page.expect_navigation(wait_until="domcontentloaded"):
+                    await next_link.click()
+                with self.timed("evaluate"):
+                    result = await page.evaluate(self.RESULTS_PAGE_JS, [self.RESULT_LINK_SELECTOR, self.PAGER_SELECTOR])
+            except Exception as e:
+                # Later pages are only reachable through this one
+                self.logger.error(f"Error following next result page: {e}")
+                walk.failed_pages.append(walk.pages + 1)
+                return
+            self.stats["result_pages"] += 1
+            walk.pages += 1
+            fresh = unseen(result["links"])
+            if not fresh:
+                return
+            for link in fresh:
+                yield link
+
+    async def _iter_details(
+        self,
+        page: Page,
+        targets: List[dict],
+        concurrency: int,
+        query_key: Optional[str]
+    ) -> AsyncIterator[Business]:
+        """Spread detail pages over a bounded pool of pages, yielding in input order.
+
+        At most ``2 * concurrency`` detail pages are in flight, so a slow
+        consumer holds back extraction instead of buffering results.
+        """
+        async with AsyncExitStack() as stack:
+            extra_pages = [
+                await stack.enter_async_context(self.lease_page(page))
+                for _ in range(concurrency - 1)
+            ]
+            pages: asyncio.Queue = asyncio.Queue()
+            for pooled_page in [page, *extra_pages]:
+                pages.put_nowait(pooled_page)
+
+            self.logger.info(f"Processing {len(targets)} detail pages with {concurrency} pages")
+
+            async def run(index: int, gasthaus: dict) -> Optional[Business]:
+                # One trace track per URL, nested under the query
+                with self.span("detail", track=gasthaus['url'], business=gasthaus['name']):
+                    detail_page = await pages.get()
+                    try:
+                        return await self._scrape_detail(detail_page, gasthaus, index, query_key)
+                    finally:
+                        pages.put_nowait(detail_page)
+
+            remaining = iter(enumerate(targets))
+            in_flight: Deque[asyncio.Task] = deque()
+
+            def fill() -> None:
+                while len(in_flight) < 2 * concurrency:
+                    item = next(remaining, None)
+                    if item is None:
+                        return
+                    in_flight.append(asyncio.create_task(run(*item)))
+
+            try:
+                fill()
+                while in_flight:
+                    business = await in_flight.popleft()
+                    fill()
+                    if business:
+                        yield business
+            finally:
+                # Stop outstanding pages when the consumer stops early
+                for task in in_flight:
+                    task.cancel()
+                await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def _scrape_detail(
+        self,
+        page: Page,
+        gasthaus: dict,
+        index: int,
+        query_key: Optional[str]
+    ) -> Optional[Business]:
+        """Extract a single Gasthaus detail page, trying a plain HTTP fetch first"""
+        try:
+            if self.fingerprints and self.fingerprints.is_fresh(gasthaus['url'], self.refresh_ttl):
+                self.stats["skipped_fresh"] += 1
+                self._journal_done(gasthaus, query_key)
+                return None
+            
+            self.logger.info(f"Processing Gasthaus: {gasthaus['name']}")
+            started = time.perf_counter()
             
-        return businesses
+            result = None
+            if self.fetcher:
+                headers = self.fingerprints.conditional_headers(gasthaus['url']) if self.fingerprints else None
+                with self.timed("static_fetch"):
+                    result = await self.fetcher.fetch_conditional(gasthaus['url'], headers=headers, stats=self.stats)
+                if result and result.status == 304 and self.fingerprints:
+                    # The server confirmed the stored copy is current
+                    self.fingerprints.touch(gasthaus['url'])
+                    self.stats["not_modified"] += 1
+                    self._journal_done(gasthaus, query_key)
+                    return None
+                business_data = self._parse_detail_html(result.text, gasthaus['url']) if result and result.text else {}
+                if business_data.get('name'):
+                    elapsed = time.perf_counter() - started
+                    self.stats["static_pages"] += 1
+                    self.stats["static_seconds"] += elapsed
+                    self.stats["detail_pages"] += 1
+                    self.stats["detail_seconds"] += elapsed
+                    business = self._build_business(business_data, gasthaus['url'])
+                    return await self._emit(gasthaus, business, business_data, query_key, result)
+                self.logger.info(f"Static parse found no name, falling back to browser: {gasthaus['url']}")
+            
+            browser_started = time.perf_counter()
+            
+            # Navigate to Gasthaus detail page
+            await self.goto(page, gasthaus['url'], ready_selector=self.DETAIL_READY_SELECTOR)
+
+            # Extract detailed information
+            with self.timed("evaluate"):
+                records = await self.DETAIL_EXTRACTOR.extract_page(page)
+            self.stats["evaluate_calls"] += 1
+            business_data = records[0] if records else {}
+            self.stats["browser_pages"] += 1
+            self.stats["browser_seconds"] += time.perf_counter() - browser_started
+            self.stats["detail_pages"] += 1
+            self.stats["detail_seconds"] += time.perf_counter() - started
+
+            # Create business object
+            if not business_data.get('name'):
+                self._journal_done(gasthaus, query_key)
+                return None
+
+            business = self._build_business(business_data, gasthaus['url'])
+
+            # Screenshot of the detail page, if the artifact policy asks for one
+            await self.capture(page, f"detail_{index}")
+
+            return await self._emit(gasthaus, business, business_data, query_key, result)
+
+        except Exception as e:
+            self.logger.error(f"Error processing Gasthaus {gasthaus['name']}: {e}")
+            if self.journal and query_key:
+                self.journal.mark_failed(query_key, gasthaus['url'], str(e))
+                self.stats["failed_pages"] += 1
+            return None
+
+    def _journal_done(self, gasthaus: dict, query_key: Optional[str]) -> None:
+        if self.journal and query_key:
+            self.journal.mark_done(query_key, gasthaus['url'])
+
+    def _after_persist(self, url: str, action: Callable[[], None]) -> None:
+        """Run `action` once the business from `url` is persisted, or now without a checkpoint"""
+        if self.checkpoint:
+            self.checkpoint.defer(url, action)
+        else:
+            action()
+
+    async def _emit(
+        self,
+        gasthaus: dict,
+        business: Business,
+        business_data: dict,
+        query_key: Optional[str],
+        validators: Optional[FetchResult] = None
+    ) -> Optional[Business]:
+        """Business to yield, if any; its URL is done and its fingerprint
+        stored once it is persisted"""
+        tracked = await self._track_change(business, business_data, query_key, validators)
+        if tracked is None:
+            # Nothing to persist
+            self._journal_done(gasthaus, query_key)
+        else:
+            self._after_persist(business.source, lambda: self._journal_done(gasthaus, query_key))
+        return tracked
+
+    async def _track_change(
+        self,
+        business: Business,
+        business_data: dict,
+        query_key: Optional[str],
+        validators: Optional[FetchResult] = None
+    ) -> Optional[Business]:
+        """Compare a business with the fingerprint store; unchanged ones are
+        dropped. New and changed records are stored once the business is
+        persisted, so a crash before that detects the change again."""
+        if not self.fingerprints:
+            return business
+        change, previous = self.fingerprints.diff(business.source, business_data)
+
+        def store() -> None:
+            self.fingerprints.update(
+                business.source,
+                query_key,
+                business_data,
+                etag=validators.etag if validators else None,
+                last_modified=validators.last_modified if validators else None
+            )
+
+        self.stats[f"{change}_records"] += 1
+        if change == FingerprintStore.UNCHANGED:
+            # Refreshes the timestamp and validators
+            store()
+            return None
+        self._after_persist(business.source, store)
+        if self.changes:
+            await self.changes.record(change, business.source, business=business, previous=previous)
+        return business
+
+    async def _report_removed(self, links: List[dict], query_key: str) -> None:
+        removed = self.fingerprints.removed(query_key, (link["url"] for link in links))
+        self.stats["removed_records"] += len(removed)
+        if self.changes:
+            for item in removed:
+                await self.changes.record(FingerprintStore.REMOVED, item["url"], previous=item["record"])
+
+    def _parse_detail_html(self, html: str, url: str) -> dict:
+        """Static counterpart of the browser detail extraction"""
+        with self.timed("parse"):
+            records = self.DETAIL_EXTRACTOR.extract_html(html, url)
+        return records[0] if records else {}
+
+    def _build_business(self, business_data: dict, url: str) -> Business:
+        address = ", ".join(filter(None, [
+            business_data.get('address'),
+            business_data.get('postal'),
+            business_data.get('city')
+        ]))
+
+        business = Business(
+            name=business_data['name'],
+            category="Gasthaus",
+            description=business_data.get('description', ''),
+            address=address,
+            phone=business_data.get('phone'),
+            email=business_data.get('email'),
+            website=business_data.get('website'),
+            source=url,
+            last_updated=datetime.now()
+        )
+        self.logger.info(f"Added business: {business.name}")
+        return business
+
+    def _log_tier_report(self) -> None:
+        """Log the static/browser split and the estimated time saved"""
+        static_pages = self.stats["static_pages"]
+        browser_pages = self.stats["browser_pages"]
+        if not static_pages and not browser_pages:
+            return
+        
+        report = f"Detail pages: {static_pages:g} static, {browser_pages:g} browser"
+        if static_pages and browser_pages:
+            browser_avg = self.stats["browser_seconds"] / browser_pages
+            static_avg = self.stats["static_seconds"] / static_pages
+            saved = static_pages * (browser_avg - static_avg)
+            self.stats["static_seconds_saved"] = saved
+            report += f", ~{saved:.1f}s saved ({static_avg:.2f}s vs {browser_avg:.2f}s per page)"
+        self.logger.info(report)
 
     async def _submit_search_form(self, page: Page, search_params: dict) -> None:
         """Submit the search form using JavaScript"""
@@ -193,13 +706,10 @@ class WKOScraper(BaseScraper):
         try:
             self.logger.info(f"Submitting search form with keyword: {keyword}, location: {location}")
             
-            # Create screenshots directory if it doesn't exist
-            os.makedirs("screenshots", exist_ok=True)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            
             # Wait for initial page load
-            await page.wait_for_load_state("domcontentloaded", timeout=60000)
-            await page.wait_for_selector("#aspnetForm", timeout=60000)
+            with self.span("wait_for_load_state"):
+                await page.wait_for_load_state("domcontentloaded", timeout=60000)
+                await page.wait_for_selector("#aspnetForm", timeout=60000)
             
             # Use the exact IDs from the form elements we found
             js_code = """
@@ -237,7 +747,8 @@ class WKOScraper(BaseScraper):
             }
             """
             
-            # Execute JavaScript
+            # Execute JavaScript; a successful submit posts back to the site
+            await self.rate_limiter.acquire(self.BASE_URL)
             result = await page.evaluate(js_code, {
                 "keyword": keyword,
                 "location": location
@@ -253,30 +764,24 @@ class WKOScraper(BaseScraper):
                 try:
                     self.logger.info("Trying direct Playwright approach...")
                     
-                    # Fill keyword
+                    # Fill keyword and location (fill waits for the inputs itself)
                     await page.fill("#ctl00_ContentPlaceHolder1_searchBoxLoaderControl_ctl00_txtSuchbegriff", keyword)
-                    await page.wait_for_timeout(2000)
-                    
-                    # Fill location
                     await page.fill("#ctl00_ContentPlaceHolder1_searchBoxLoaderControl_ctl00_txtStandort", location)
-                    await page.wait_for_timeout(2000)
                     
-                    # Click search
+                    # Click search; the postback is a request to the site, so pace it
+                    await self.rate_limiter.acquire(self.BASE_URL)
                     await page.click("#ctl00_ContentPlaceHolder1_searchBoxLoaderControl_ctl00_btnSearch")
                     
                 except Exception as e:
                     self.logger.error(f"Direct Playwright approach failed: {e}")
-                    await page.screenshot(path=f"screenshots/form_error_{timestamp}.png")
-                    content = await page.content()
-                    with open(f"screenshots/form_debug_{timestamp}.html", "w", encoding="utf-8") as f:
-                        f.write(content)
                     raise Exception(f"Could not submit form: {debug_info}")
             
             self.logger.info("Search form submitted")
             
             # Wait for navigation and results
-            await page.wait_for_load_state("networkidle", timeout=60000)
-            await page.screenshot(path=f"screenshots/after_submit_{timestamp}.png")
+            with self.span("wait_for_load_state"):
+                await page.wait_for_load_state("domcontentloaded", timeout=60000)
+            await self.capture(page, "after_submit")
             
             # Wait for results with multiple possible selectors
             result_selectors = [
@@ -287,29 +792,16 @@ class WKOScraper(BaseScraper):
                 ".Suchergebnis"
             ]
             
-            for selector in result_selectors:
-                try:
-                    await page.wait_for_selector(selector, timeout=30000)
-                    self.logger.info(f"Found results with selector: {selector}")
-                    return
-                except Exception:
-                    continue
+            selector, _ = await self.wait_for_any(page, "results", result_selectors, timeout=30000)
+            if selector:
+                self.logger.info(f"Found results with selector: {selector}")
+                return
             
             # If we get here, no results were found
             self.logger.error("No results found after search")
-            await page.screenshot(path=f"screenshots/no_results_{timestamp}.png")
-            content = await page.content()
-            with open(f"screenshots/no_results_{timestamp}.html", "w", encoding="utf-8") as f:
-                f.write(content)
             raise Exception("No results found after search")
             
         except Exception as e:
             self.logger.error(f"Error submitting search form: {e}")
-            await page.screenshot(path=f"screenshots/error_{timestamp}.png")
-            try:
-                content = await page.content()
-                with open(f"screenshots/error_content_{timestamp}.html", "w", encoding="utf-8") as f:
-                    f.write(content)
-            except Exception as content_error:
-                self.logger.error(f"Failed to save error page content: {content_error}")
+            await self.capture(page, "search_error", error=True, include_html=True)
             raise
\ No newline at end of file
@@ -0,0 +1,379 @@
+from crawl4ai import AsyncWebCrawler, CacheMode, CrawlerRunConfig, CrawlResult
+from crawl4ai.chunking_strategy import IdentityChunking, RegexChunking
+from src.extraction.batcher import ListingBatcher
+from src.extraction.compact import compact_html, estimate_tokens
+from src.extraction.schema import CompiledSchema
+from src.metrics.registry import MetricsRegistry
+from src.metrics.tracing import Tracer, timed
+from src.models.business import Business
+from src.net.rate_limiter import AdaptiveRateLimiter
+from src.storage.dedup import normalize_name
+from collections import Counter, deque
+from typing import Any, ContextManager, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlparse
+import asyncio
+import logging
+import re
+import time
+
+class YellowPagesCrawler:
+    """Pipelined crawl of the numbered YellowPages result pages.
+
+    Fetching and LLM extraction are separate stages with their own limits:
+    up to ``fetch_concurrency`` pages load in the browser while up to
+    ``llm_concurrency`` pages are extracted in worker threads, so page N+1
+    is fetched while page N is with the LLM. At most ``window`` pages are in
+    flight. Pages are consumed in order; the first page showing "No Results
+    Found" (or yielding no new records) ends the crawl and cancels the pages
+    after it.
+    """
+
+    SITE = "yellowpages"
+    NO_RESULTS_MARKER = "No Results Found"
+
+    # Listing markup under the configured CSS selector; the selector itself
+    # is the base selector, so each match is one listing
+    LISTING_FIELDS = [
+        {"name": "name", "selectors": [".listing__name--link", ".listing__name a", "h3 a"], "type": "text"},
+        {"name": "address", "selectors": [".listing__address--full", ".listing__address"], "type": "text"},
+        {
+            "name": "phone_number",
+            "selectors": [".mlr__item--phone .mlr__sub-text", "[data-phone]", "a[href^='tel:']"],
+            "type": "text"
+        },
+        {
+            "name": "website",
+            "selectors": [".mlr__item--website a", "a[href*='redirect=']"],
+            "type": "attribute",
+            "attribute": "href"
+        },
+        {
+            "name": "description",
+            "selectors": [".listing__details__teaser", ".listing__descriptor", ".listing__details"],
+            "type": "text"
+        }
+    ]
+
+    PHONE_PATTERN = re.compile(r"\(?\d{3}\)?[\s.-]?\d{3}[\s.-]\d{4}")
+    SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+    WHITESPACE = re.compile(r"\s+")
+    NON_DIGIT = re.compile(r"\D+")
+    APOSTROPHES = re.compile(r"['’`]")
+
+    def __init__(
+        self,
+        crawler: AsyncWebCrawler,
+        llm_strategy: Any,
+        base_url: str,
+        css_selector: str,
+        max_pages: int,
+        fetch_concurrency: int = 2,
+        llm_concurrency: int = 2,
+        window: Optional[int] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        hybrid: bool = False,
+        generate_descriptions: bool = True,
+        compact: bool = False,
+        batch_tokens: Optional[int] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        tracer: Optional[Tracer] = None
+    ):
+        self.crawler = crawler
+        self.llm_strategy = llm_strategy
+        self.base_url = base_url
+        self.css_selector = css_selector
+        self.max_pages = max_pages
+        self.window = max(1, window or fetch_concurrency + llm_concurrency)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter.shared()
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.seen_names: Set[str] = set()
+        # Hybrid mode reads listings from the markup and only sends the ones
+        # that fail validation (or lack a description, when descriptions are
+        # generated) to the LLM
+        self.hybrid = hybrid
+        self.generate_descriptions = generate_descriptions
+        # Compact mode sends a stripped-down text rendering of the selected
+        # HTML instead of crawl4ai's markdown or HTML
+        self.compact = compact
+        self.listing_schema = CompiledSchema({
+            "name": "YellowPages Listing",
+            "baseSelector": css_selector,
+            "fields": self.LISTING_FIELDS
+        })
+        self.stats = Counter()
+        self.metrics = metrics or MetricsRegistry.shared()
+        self.tracer = tracer or Tracer.shared()
+        # With a token budget, each page's listings are sent to the LLM in
+        # packed multi-listing prompts
+        self.batcher = ListingBatcher(self.run_llm, token_budget=batch_tokens, stats=self.stats) if batch_tokens else None
+        self._fetch_slots = asyncio.Semaphore(max(1, fetch_concurrency))
+        self._llm_slots = asyncio.Semaphore(max(1, llm_concurrency))
+
+    def timed(self, stage: str, **args) -> ContextManager[None]:
+        return timed(self.tracer, self.metrics, stage, self.SITE, self.__class__.__name__, **args)
+
+    async def crawl(self) -> List[dict]:
+        """Crawl pages 1..max_pages and return the accepted records in page order"""
+        records: List[dict] = []
+        page_numbers = iter(range(1, self.max_pages + 1))
+        in_flight: Deque[Tuple[int, asyncio.Task]] = deque()
+
+        def fill() -> None:
+            while len(in_flight) < self.window:
+                page_number = next(page_numbers, None)
+                if page_number is None:
+                    return
+                in_flight.append((page_number, asyncio.create_task(self.process_page(page_number))))
+
+        try:
+            fill()
+            while in_flight:
+                page_number, task = in_flight.popleft()
+                blocks, no_results_found = await task
+                if no_results_found:
+                    self.logger.info("No more records found. Ending crawl.")
+                    break
+
+                page_records = self.accept(blocks)
+                if not page_records:
+                    self.logger.info(f"No records extracted from page {page_number}.")
+                    break
+
+                self.logger.info(f"Extracted {len(page_records)} records from page {page_number}")
+                self.metrics.inc("businesses", len(page_records), site=self.SITE, scraper=self.__class__.__name__)
+                records.extend(page_records)
+                fill()
+        finally:
+            # Pages past the end are still loading or extracting
+            for _, task in in_flight:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in in_flight), return_exceptions=True)
+        return records
+
+    async def process_page(self, page_number: int) -> Tuple[List[dict], bool]:
+        """Fetch and extract one page; returns its blocks and whether it was past the end"""
+        url = self.base_url.format(page_number=page_number)
+        # One trace track per page, so fetches and LLM calls show their overlap
+        with self.tracer.span("page", category=self.SITE, track=url, page=page_number):
+            result = await self.fetch_page(url)
+            if result is None:
+                return [], False
+            if self.NO_RESULTS_MARKER in (result.html or ""):
+                return [], True
+            if self.hybrid:
+                return await self.extract_hybrid(url, result), False
+            return await self.extract(url, result), False
+
+    async def fetch_page(self, url: str) -> Optional[CrawlResult]:
+        # No session id: concurrent pages each get their own browser tab
+        config = CrawlerRunConfig(cache_mode=CacheMode.BYPASS, css_selector=self.css_selector)
+        async with self._fetch_slots, self.rate_limiter.request(url) as slot:
+            with self.timed("navigation", url=url):
+                result = await self.crawler.arun(url=url, config=config)
+            slot.status = result.status_code
+        if not result.success:
+            self.logger.error(f"Error fetching {url}: {result.error_message}")
+            return None
+        return result
+
+    async def extract(self, url: str, result: CrawlResult) -> List[dict]:
+        """Run the LLM strategy on the selected content in a worker thread.
+
+        crawl4ai calls ``run`` synchronously inside ``arun``, which would
+        block every other page, so extraction is done here instead.
+        """
+        if self.batcher:
+            listings = self.listing_schema.extract_with_markup(result.html or "", url)
+            if listings:
+                return await self.extract_listings(url, [markup for _, markup in listings])
+        input_format = getattr(self.llm_strategy, "input_format", "markdown")
+        if input_format == "html":
+            content = result.cleaned_html or ""
+            sections = IdentityChunking().chunk(content)
+        else:
+            content = str(result.markdown or "")
+            sections = RegexChunking().chunk(content)
+        if self.compact:
+            sections = self.compact_content(url, [result.cleaned_html or ""])
+        return await self.run_llm(url, sections)
+
+    async def extract_listings(self, url: str, markups: List[str]) -> List[dict]:
+        """Send individual listings to the LLM, packed into batches when a budget is set"""
+        if self.batcher:
+            chunks = self.compact_content(url, markups) if self.compact else markups
+            return [item for items in await self.batcher.extract(url, chunks) for item in items]
+        sections = self.compact_content(url, ["\n".join(markups)]) if self.compact else markups
+        return await self.run_llm(url, sections)
+
+    def compact_content(self, url: str, parts: List[str]) -> List[str]:
+        """Compact HTML parts for the LLM and record their tokens before and after"""
+        with self.timed("compact"):
+            texts = [compact_html(part, url) for part in parts]
+        # Both counts cover the same input, the HTML that was compacted
+        tokens_before = sum(estimate_tokens(part) for part in parts)
+        tokens_after = sum(estimate_tokens(text) for text in texts)
+        self.stats["tokens_before"] += tokens_before
+        self.stats["tokens_after"] += tokens_after
+        # Two monotonic counters; the saving is their difference and could
+        # be negative, which a Prometheus counter must never be
+        self.metrics.inc("llm_input_tokens_before", tokens_before, site=self.SITE)
+        self.metrics.inc("llm_input_tokens_after", tokens_after, site=self.SITE)
+        self.logger.info(f"{url}: ~{tokens_before:,} -> ~{tokens_after:,} input tokens")
+        return texts
+
+    async def run_llm(self, url: str, sections: List[str]) -> List[dict]:
+        async with self._llm_slots:
+            started = time.perf_counter()
+            with self.timed("llm", sections=len(sections)):
+                blocks = await asyncio.to_thread(self.llm_strategy.run, url, sections)
+        self.stats["llm_calls"] += 1
+        self.stats["llm_seconds"] += time.perf_counter() - started
+        return blocks
+
+    async def extract_hybrid(self, url: str, result: CrawlResult) -> List[dict]:
+        """Deterministic extraction first; failing listings are escalated to the LLM"""
+        with self.timed("parse"):
+            listings = self.listing_schema.extract_with_markup(result.html or "", url)
+        if not listings:
+            # The markup changed; the LLM still copes with the whole page
+            self.stats["llm_pages"] += 1
+            return await self.extract(url, result)
+
+        records: List[dict] = []
+        escalated: List[str] = []
+        partial: List[dict] = []
+        for fields, markup in listings:
+            self.stats["listings"] += 1
+            record = self.clean_listing(fields, markup)
+            if not self.is_valid(record):
+                self.stats["escalated_invalid"] += 1
+                escalated.append(markup)
+            elif not record["description"] and self.generate_descriptions:
+                self.stats["escalated_description"] += 1
+                partial.append(record)
+                escalated.append(markup)
+            else:
+                self.stats["deterministic"] += 1
+                records.append(record)
+
+        if not escalated:
+            return records
+        blocks = await self.extract_listings(url, escalated)
+
+        for block in blocks:
+            known = self.match_partial(partial, block)
+            if known:
+                # Keep the parsed fields instead of the block; only the
+                # description is generated
+                partial.remove(known)
+                known["description"] = block.get("description") or ""
+                records.append(known)
+            else:
+                records.append(block)
+        # Listings the LLM did not describe are still complete otherwise
+        records.extend(partial)
+        return records
+
+    @classmethod
+    def match_partial(cls, partial: List[dict], block: dict) -> Optional[dict]:
+        """The parsed record an LLM block describes.
+
+        Names are compared normalized (case, apostrophes, punctuation and
+        legal forms ignored) and phone numbers by their digits; a record
+        matching both wins over one matching the name only, then the phone
+        only.
+        """
+        if not isinstance(block, dict):
+            return None
+
+        def comparable(name: Any) -> str:
+            # "Joe's" and "Joes" are the same listing
+            return normalize_name(cls.APOSTROPHES.sub("", str(name or "")))
+
+        name = comparable(block.get("name"))
+        phone = cls.NON_DIGIT.sub("", str(block.get("phone_number") or ""))
+
+        def same_phone(record: dict) -> bool:
+            digits = cls.NON_DIGIT.sub("", record["phone_number"])
+            # One side may carry the country code
+            return len(phone) >= 7 and len(digits) >= 7 and (digits.endswith(phone) or phone.endswith(digits))
+
+        named = [record for record in partial if name and comparable(record["name"]) == name]
+        return (
+            next((record for record in named if same_phone(record)), None)
+            or next(iter(named), None)
+            or next((record for record in partial if same_phone(record)), None)
+        )
+
+    def clean_listing(self, fields: Dict[str, Optional[str]], markup: str) -> dict:
+        """Normalize whitespace, decode redirect links and fall back to regexes"""
+        record = {
+            key: self.WHITESPACE.sub(" ", value).strip() if value else ""
+            for key, value in fields.items()
+        }
+        if not record["phone_number"]:
+            match = self.PHONE_PATTERN.search(markup)
+            record["phone_number"] = match.group(0) if match else ""
+        website = record["website"]
+        if "redirect=" in website:
+            target = parse_qs(urlparse(website).query).get("redirect")
+            record["website"] = target[0] if target else ""
+        if record["description"]:
+            # Stored descriptions are a single sentence
+            record["description"] = self.SENTENCE_END.split(record["description"], 1)[0]
+        return record
+
+    @staticmethod
+    def is_valid(record: dict) -> bool:
+        """Business.validate checks plus the phone number the CSV needs"""
+        business = Business(
+            name=record["name"],
+            category="Unknown",
+            address=record["address"],
+            phone=record["phone_number"] or None,
+            website=record["website"] or None
+        )
+        return bool(record["phone_number"]) and business.validate()
+
+    def log_summary(self) -> None:
+        llm_calls = self.stats["llm_calls"]
+        if llm_calls:
+            self.logger.info(
+                f"LLM: {llm_calls} calls, {self.stats['llm_seconds'] / llm_calls:.2f}s per call"
+            )
+        if self.batcher and self.stats["llm_batches"]:
+            self.logger.info(
+                f"Batching: {self.stats['batched_listings']} listings in {self.stats['llm_batches']} prompts, "
+                f"{self.stats['split_batches']} split after incomplete responses, "
+                f"{self.stats['unmapped_items']} items not matched to a listing"
+            )
+        if self.compact and self.stats["tokens_before"]:
+            before = self.stats["tokens_before"]
+            after = self.stats["tokens_after"]
+            self.logger.info(
+                f"Compact input: ~{before:,} -> ~{after:,} tokens ({1 - after / before:.1%} fewer)"
+            )
+        if self.hybrid:
+            listings = self.stats["listings"]
+            deterministic = self.stats["deterministic"]
+            share = deterministic / listings if listings else 0.0
+            self.logger.info(
+                f"Hybrid extraction: {deterministic}/{listings} listings ({share:.1%}) needed no LLM call; "
+                f"escalated {self.stats['escalated_invalid']} invalid and "
+                f"{self.stats['escalated_description']} for descriptions"
+                + (f"; {self.stats['llm_pages']} pages fully sent to the LLM" if self.stats["llm_pages"] else "")
+            )
+
+    def accept(self, blocks: List[dict]) -> List[dict]:
+        """Drop error blocks, records without a name and names already seen"""
+        records = []
+        for block in blocks:
+            if block.get("error"):
+                continue
+            block.pop("error", None)
+            name = block.get("name")
+            if not name or name in self.seen_names:
+                continue
+            self.seen_names.add(name)
+            records.append(block)
+        return records
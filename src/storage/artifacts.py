@@ -0,0 +1,146 @@
+from datetime import datetime
+from typing import Deque, List, Optional, Tuple
+from playwright.async_api import Page
+from collections import deque
+import asyncio
+import gzip
+import itertools
+import logging
+import os
+
+class ArtifactWriter:
+    """Debug screenshots and HTML dumps, captured according to a run policy.
+
+    Modes: ``off``; ``errors`` (only captures flagged as errors);
+    ``sample`` (errors plus every ``sample_every``-th regular capture);
+    ``always``. Screenshots are viewport JPEGs and HTML is gzip-compressed.
+    Only grabbing the bytes touches the page; compression and disk writes
+    happen on a background task in a worker thread. When the directory
+    exceeds ``quota_bytes`` the oldest artifacts are deleted. If the writer
+    falls behind, new artifacts are dropped rather than stalling scraping.
+    """
+
+    MODES = ("off", "errors", "sample", "always")
+
+    _shared: Optional["ArtifactWriter"] = None
+
+    def __init__(
+        self,
+        directory: str = "screenshots",
+        mode: str = "errors",
+        sample_every: int = 50,
+        quota_bytes: int = 200 * 1024 * 1024,
+        jpeg_quality: int = 60,
+        queue_size: int = 32
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown artifact mode {mode!r}; expected one of {self.MODES}")
+        self.directory = directory
+        self.mode = mode
+        self.sample_every = max(1, sample_every)
+        self.quota_bytes = quota_bytes
+        self.jpeg_quality = jpeg_quality
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.written = 0
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._writer: Optional[asyncio.Task] = None
+        self._captures = itertools.count(1)
+        self._files: Deque[Tuple[str, int]] = deque()
+        self._total_bytes = 0
+
+    @classmethod
+    def shared(cls) -> "ArtifactWriter":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def should_capture(self, error: bool = False) -> bool:
+        if self.mode == "off":
+            return False
+        if self.mode == "always" or error:
+            return True
+        if self.mode == "sample":
+            return next(self._captures) % self.sample_every == 1 % self.sample_every
+        return False
+
+    async def capture(
+        self,
+        page: Page,
+        name: str,
+        error: bool = False,
+        include_html: bool = False
+    ) -> bool:
+        """Queue a screenshot (and optionally the HTML) of `page`; returns True if queued"""
+        if not self.should_capture(error):
+            return False
+        try:
+            files: List[Tuple[str, bytes]] = []
+            stem = f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
+            screenshot = await page.screenshot(type="jpeg", quality=self.jpeg_quality)
+            files.append((f"{stem}.jpg", screenshot))
+            if include_html:
+                files.append((f"{stem}.html.gz", (await page.content()).encode("utf-8")))
+        except Exception as e:
+            self.logger.error(f"Error capturing artifact {name}: {e}")
+            return False
+
+        if not self._writer:
+            self._writer = asyncio.create_task(self._run_writer())
+        try:
+            self._queue.put_nowait(files)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        return True
+
+    async def close(self) -> None:
+        """Wait for queued artifacts to be written"""
+        if self._writer:
+            await self._queue.put(None)
+            await self._writer
+            self._writer = None
+            self.logger.info(f"Wrote {self.written} artifacts ({self.dropped} dropped)")
+
+    async def _run_writer(self) -> None:
+        await asyncio.to_thread(self._scan_existing)
+        while True:
+            files = await self._queue.get()
+            if files is None:
+                return
+            try:
+                await asyncio.to_thread(self._write, files)
+            except Exception as e:
+                self.logger.error(f"Error writing artifacts: {e}")
+
+    def _scan_existing(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.is_file()),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        for entry in entries:
+            size = entry.stat().st_size
+            self._files.append((entry.path, size))
+            self._total_bytes += size
+
+    def _write(self, files: List[Tuple[str, bytes]]) -> None:
+        for filename, data in files:
+            if filename.endswith(".gz"):
+                data = gzip.compress(data)
+            path = os.path.join(self.directory, filename)
+            with open(path, "wb") as f:
+                f.write(data)
+            self._files.append((path, len(data)))
+            self._total_bytes += len(data)
+            self.written += 1
+        self._evict()
+
+    def _evict(self) -> None:
+        while self._total_bytes > self.quota_bytes and len(self._files) > 1:
+            path, size = self._files.popleft()
+            self._total_bytes -= size
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
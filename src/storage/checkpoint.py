@@ -0,0 +1,32 @@
+from src.models.business import Business
+from typing import Callable, Dict, List
+import logging
+
+class Checkpoint:
+    """Bookkeeping that may only happen once a business is persisted.
+
+    Scrapers ``defer`` actions for a source URL (such as marking it done in
+    the crawl journal) instead of running them when the business is
+    yielded. The result sink's flush callback passes the written
+    businesses to ``persisted``, which runs their actions; a consumer that
+    drops a business (e.g. as a duplicate) passes it right away. After a
+    crash in between, the URL is still pending and is scraped again.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._deferred: Dict[str, List[Callable[[], None]]] = {}
+
+    def defer(self, url: str, action: Callable[[], None]) -> None:
+        self._deferred.setdefault(url, []).append(action)
+
+    def persisted(self, businesses: List[Business]) -> None:
+        """Run the deferred actions of the given businesses' source URLs"""
+        for business in businesses:
+            for action in self._deferred.pop(business.source, []):
+                action()
+
+    @property
+    def outstanding(self) -> int:
+        """Source URLs whose businesses were not persisted yet"""
+        return len(self._deferred)
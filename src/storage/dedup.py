@@ -0,0 +1,294 @@
+from datetime import datetime
+from difflib import SequenceMatcher
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+from src.models.business import Business
+import logging
+import os
+import re
+import sqlite3
+import unicodedata
+
+# Public suffixes with two labels that occur in our directories; the
+# registrable domain is one label more than the suffix
+MULTI_LABEL_SUFFIXES = {
+    "co.at", "or.at", "gv.at", "ac.at",
+    "co.uk", "org.uk", "ac.uk", "gov.uk",
+    "com.au", "net.au", "org.au",
+    "co.nz", "com.br", "co.jp", "com.tr", "co.za",
+    "on.ca", "qc.ca", "bc.ca",
+}
+
+# Hosts shared by many businesses (social profiles, directory pages); their
+# domain says nothing about identity
+SHARED_DOMAINS = {
+    "facebook.com", "instagram.com", "twitter.com", "x.com", "linkedin.com",
+    "youtube.com", "google.com", "goo.gl", "wko.at", "treatwell.de",
+    "yellowpages.ca", "wix.com", "wixsite.com", "business.site",
+}
+
+# Legal-form tokens dropped from names before comparing
+LEGAL_FORMS = {
+    "gmbh", "gesmbh", "kg", "og", "eu", "ag", "co", "cokg", "inc", "ltd", "llc",
+    "corp", "limited", "e", "u",
+}
+
+ADDRESS_ABBREVIATIONS = [
+    # Also attached, as in "Hauptstr."
+    (re.compile(r"str\b\.?"), "strasse"),
+    (re.compile(r"stra(ss|ß)e\b"), "strasse"),
+    (re.compile(r"\bst\b\.?"), "street"),
+    (re.compile(r"\bave?\b\.?"), "avenue"),
+    (re.compile(r"\brd\b\.?"), "road"),
+]
+
+def _fold(text: str) -> str:
+    text = text.replace("ß", "ss")
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return text.lower()
+
+def normalize_phone(phone: Optional[str], country_code: str = "43") -> Optional[str]:
+    """E.164 form of a phone number, assuming `country_code` for national numbers"""
+    if not phone:
+        return None
+    phone = phone.strip().replace("(0)", "")
+    if phone.lower().startswith("tel:"):
+        phone = phone[4:]
+    digits = re.sub(r"\D", "", phone)
+    if phone.lstrip().startswith("+"):
+        e164 = digits
+    elif digits.startswith("00"):
+        e164 = digits[2:]
+    elif digits.startswith("0"):
+        e164 = country_code + digits[1:]
+    elif country_code == "1" and len(digits) == 10:
+        # North American numbers have no trunk prefix
+        e164 = country_code + digits
+    else:
+        e164 = digits
+    return f"+{e164}" if len(e164) >= 8 else None
+
+def registrable_domain(url: Optional[str]) -> Optional[str]:
+    """Registrable domain of a website (``shop.example.co.at`` -> ``example.co.at``)"""
+    if not url:
+        return None
+    url = url.strip()
+    if "//" not in url:
+        url = f"http://{url}"
+    host = (urlparse(url).hostname or "").lower().rstrip(".")
+    labels = [label for label in host.split(".") if label]
+    if len(labels) < 2:
+        return None
+    size = 3 if ".".join(labels[-2:]) in MULTI_LABEL_SUFFIXES else 2
+    domain = ".".join(labels[-size:])
+    return None if domain in SHARED_DOMAINS else domain
+
+def normalize_email(email: Optional[str]) -> Optional[str]:
+    if not email:
+        return None
+    email = email.strip().lower()
+    if email.startswith("mailto:"):
+        email = email[len("mailto:"):].split("?")[0]
+    return email if "@" in email else None
+
+def normalize_name(name: Optional[str]) -> str:
+    tokens = re.findall(r"[a-z0-9]+", _fold(name or ""))
+    return " ".join(token for token in tokens if token not in LEGAL_FORMS)
+
+def normalize_address(address: Optional[str]) -> str:
+    text = _fold(address or "")
+    for pattern, replacement in ADDRESS_ABBREVIATIONS:
+        text = pattern.sub(replacement, text)
+    return " ".join(re.findall(r"[a-z0-9]+", text))
+
+def postcode(address: str) -> Optional[str]:
+    """Postcode in a normalized address (``8010``, ``a1234``, ``m5c2l7``)"""
+    match = re.search(r"\b[a-z]?\d{4,5}\b|\b[a-z]\d[a-z] ?\d[a-z]\d\b", address)
+    return match.group(0).replace(" ", "") if match else None
+
+def blocking_key(name: str, address: str) -> Optional[str]:
+    """Coarse bucket for fuzzy matching: postcode (or first address token) + name prefix"""
+    if not name or not address:
+        return None
+    anchor = postcode(address) or address.split()[0]
+    return f"{anchor}|{name[:3]}"
+
+class DedupIndex:
+    """On-disk index of businesses keyed by normalized identity signals.
+
+    Exact keys: E.164 phone, email, registrable website domain per postcode
+    (or address) and the normalized name+address. Businesses without an exact match are compared
+    by name/address similarity within a small block (same postcode and name
+    prefix). Lookups are indexed SQLite queries, so the index grows to
+    millions of entries without being held in memory.
+
+    Businesses added with ``pending=True`` are matched against like any
+    other but only count across runs once ``confirm`` is called for them,
+    e.g. after the sink has written them; pending records left by a crash
+    are dropped when the index is opened.
+    """
+
+    DEFAULT_PATH = "data/dedup_index.sqlite3"
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        country_code: str = "43",
+        fuzzy_threshold: float = 0.9,
+        commit_every: Optional[int] = 100
+    ):
+        self.path = path
+        self.country_code = country_code
+        self.fuzzy_threshold = fuzzy_threshold
+        self.commit_every = commit_every
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.duplicates = 0
+        self._pending = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS records (
+                id INTEGER PRIMARY KEY,
+                name TEXT,
+                source TEXT,
+                first_seen TEXT NOT NULL,
+                confirmed INTEGER NOT NULL DEFAULT 1
+            );
+            CREATE TABLE IF NOT EXISTS identity_keys (
+                key TEXT PRIMARY KEY,
+                record_id INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS blocks (
+                block TEXT NOT NULL,
+                name TEXT NOT NULL,
+                address TEXT NOT NULL,
+                record_id INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS blocks_block ON blocks (block);
+        """)
+        # Indexes written before records could be pending
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(records)")}
+        if "confirmed" not in columns:
+            self._db.execute("ALTER TABLE records ADD COLUMN confirmed INTEGER NOT NULL DEFAULT 1")
+        self._drop_unconfirmed()
+        self._db.commit()
+
+    def _drop_unconfirmed(self) -> None:
+        """Forget businesses a crashed run indexed but never wrote"""
+        unconfirmed = "SELECT id FROM records WHERE confirmed = 0"
+        self._db.execute(f"DELETE FROM identity_keys WHERE record_id IN ({unconfirmed})")
+        self._db.execute(f"DELETE FROM blocks WHERE record_id IN ({unconfirmed})")
+        dropped = self._db.execute("DELETE FROM records WHERE confirmed = 0").rowcount
+        if dropped:
+            self.logger.info(f"Dropped {dropped} businesses that were indexed but never written")
+
+    def commit(self) -> None:
+        """Make the indexed businesses durable, e.g. once a sink batch is on disk"""
+        self._db.commit()
+        self._pending = 0
+
+    def confirm(self, businesses: List[Business]) -> None:
+        """Mark pending businesses as written and commit the index"""
+        record_ids = set()
+        for business in businesses:
+            keys = self.keys_for(business)
+            if keys:
+                placeholders = ",".join("?" * len(keys))
+                record_ids.update(row[0] for row in self._db.execute(
+                    f"SELECT record_id FROM identity_keys WHERE key IN ({placeholders})", keys
+                ))
+        self._db.executemany(
+            "UPDATE records SET confirmed = 1 WHERE id = ? AND confirmed = 0",
+            [(record_id,) for record_id in record_ids]
+        )
+        self.commit()
+
+    def close(self) -> None:
+        self.commit()
+        self._db.close()
+
+    def keys_for(self, business: Business) -> List[str]:
+        """Exact identity keys of a business, strongest first"""
+        keys = []
+        phone = normalize_phone(business.phone, self.country_code)
+        if phone:
+            keys.append(f"phone:{phone}")
+        email = normalize_email(business.email)
+        if email:
+            keys.append(f"email:{email}")
+        name = normalize_name(business.name)
+        address = normalize_address(business.address)
+        domain = registrable_domain(business.website)
+        if domain:
+            # Branches of a chain share the website; only the same domain at
+            # the same location is the same business
+            location = postcode(address) or address
+            keys.append(f"domain:{domain}|{location}" if location else f"domain:{domain}")
+        if name and address:
+            keys.append(f"name_address:{name}|{address}")
+        return keys
+
+    def lookup(self, business: Business) -> Optional[int]:
+        """Record id of a known duplicate, or None"""
+        keys = self.keys_for(business)
+        if keys:
+            placeholders = ",".join("?" * len(keys))
+            row = self._db.execute(
+                f"SELECT record_id FROM identity_keys WHERE key IN ({placeholders}) LIMIT 1", keys
+            ).fetchone()
+            if row:
+                return row[0]
+        return self._fuzzy_lookup(normalize_name(business.name), normalize_address(business.address))
+
+    def _fuzzy_lookup(self, name: str, address: str) -> Optional[int]:
+        block = blocking_key(name, address)
+        if not block:
+            return None
+        for candidate_name, candidate_address, record_id in self._db.execute(
+            "SELECT name, address, record_id FROM blocks WHERE block = ?", (block,)
+        ):
+            if (SequenceMatcher(None, name, candidate_name).ratio() >= self.fuzzy_threshold
+                    and SequenceMatcher(None, address, candidate_address).ratio() >= self.fuzzy_threshold):
+                return record_id
+        return None
+
+    def check_and_add(self, business: Business, pending: bool = False) -> Optional[int]:
+        """Return the existing record id for a duplicate, otherwise index the
+        business and return None. Keys of duplicates are merged into the
+        existing record so later variants match too. A new business added
+        as ``pending`` is kept only once it is confirmed."""
+        record_id = self.lookup(business)
+        if record_id is None:
+            cursor = self._db.execute(
+                "INSERT INTO records (name, source, first_seen, confirmed) VALUES (?, ?, ?, ?)",
+                (business.name, business.source, datetime.now().isoformat(), int(not pending))
+            )
+            new_id = cursor.lastrowid
+            name = normalize_name(business.name)
+            address = normalize_address(business.address)
+            block = blocking_key(name, address)
+            if block:
+                self._db.execute(
+                    "INSERT INTO blocks (block, name, address, record_id) VALUES (?, ?, ?, ?)",
+                    (block, name, address, new_id)
+                )
+        else:
+            self.duplicates += 1
+            new_id = record_id
+
+        self._db.executemany(
+            "INSERT OR IGNORE INTO identity_keys (key, record_id) VALUES (?, ?)",
+            [(key, new_id) for key in self.keys_for(business)]
+        )
+        self._pending += 1
+        if self.commit_every and self._pending >= self.commit_every:
+            self.commit()
+        return record_id
+
+    def stats(self) -> Dict[str, int]:
+        records = self._db.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        return {"records": records, "duplicates": self.duplicates}
@@ -0,0 +1,197 @@
+from src.models.business import Business
+from src.storage.sinks import NDJSONSink, business_to_dict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+
+LINK_PREFIXES = ("mailto:", "tel:")
+
+def normalize_value(key: str, value):
+    """Comparable form of an extracted field.
+
+    Whitespace (including non-breaking spaces) is collapsed, ``mailto:`` and
+    ``tel:`` prefixes and trailing slashes are dropped and email addresses are
+    lowercased, so formatting differences between extraction paths do not
+    count as a change.
+    """
+    if isinstance(value, str):
+        text = " ".join(value.replace("\xa0", " ").split())
+        lowered = text.lower()
+        for prefix in LINK_PREFIXES:
+            if lowered.startswith(prefix):
+                text = text[len(prefix):].split("?", 1)[0].strip()
+                lowered = text.lower()
+        if "email" in key.lower() or ("@" in text and " " not in text and "/" not in text):
+            text = lowered
+        if lowered.startswith(("http://", "https://")):
+            text = text.rstrip("/")
+        return text
+    if isinstance(value, dict):
+        return {k: normalize_value(k, v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize_value(key, item) for item in value]
+    return value
+
+class FingerprintStore:
+    """SQLite store of what each source URL looked like on its last crawl.
+
+    For every detail URL it keeps a fingerprint of the extracted record, the
+    ``ETag``/``Last-Modified`` validators of the response and when the URL
+    was last refreshed. Incremental runs use it to skip recently refreshed
+    URLs, send conditional requests and tell new, changed and unchanged
+    records apart.
+    """
+
+    DEFAULT_PATH = "data/fingerprints.sqlite3"
+
+    NEW = "new"
+    CHANGED = "changed"
+    UNCHANGED = "unchanged"
+    REMOVED = "removed"
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self.logger = logging.getLogger(self.__class__.__name__)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                query_key TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                record TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                changed_at TEXT NOT NULL,
+                refreshed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_query ON pages (query_key);
+        """)
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    @staticmethod
+    def fingerprint(record: dict) -> str:
+        """Hash of the normalized extracted fields; bookkeeping keys starting
+        with _ are ignored, so static and browser extraction of the same page
+        give the same hash"""
+        content = {
+            k: normalized for k, v in record.items()
+            if not k.startswith("_") and (normalized := normalize_value(k, v)) not in (None, "", [], {})
+        }
+        encoded = json.dumps(content, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, url: str) -> Optional[dict]:
+        row = self._db.execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def is_fresh(self, url: str, ttl: float) -> bool:
+        """True if `url` was refreshed less than `ttl` seconds ago"""
+        if ttl <= 0:
+            return False
+        row = self._db.execute("SELECT refreshed_at FROM pages WHERE url = ?", (url,)).fetchone()
+        return row is not None and time.time() - row["refreshed_at"] < ttl
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since headers from the stored validators"""
+        row = self._db.execute("SELECT etag, last_modified FROM pages WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row and row["etag"]:
+            headers["If-None-Match"] = row["etag"]
+        if row and row["last_modified"]:
+            headers["If-Modified-Since"] = row["last_modified"]
+        return headers
+
+    def touch(self, url: str) -> None:
+        """Mark `url` as refreshed without changing its content"""
+        with self._db:
+            self._db.execute("UPDATE pages SET refreshed_at = ? WHERE url = ?", (time.time(), url))
+
+    def diff(self, url: str, record: dict) -> Tuple[str, Optional[dict]]:
+        """Compare `record` with the stored one of `url` without storing it;
+        returns the change and the previous record"""
+        previous = self.get(url)
+        if previous is None:
+            change = self.NEW
+        elif previous["fingerprint"] != self.fingerprint(record):
+            change = self.CHANGED
+        else:
+            change = self.UNCHANGED
+        return change, json.loads(previous["record"]) if previous else None
+
+    def update(
+        self,
+        url: str,
+        query_key: str,
+        record: dict,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Tuple[str, Optional[dict]]:
+        """Store the latest record of `url`; returns the change and the previous record"""
+        change, previous = self.diff(url, record)
+        fingerprint = self.fingerprint(record)
+        now = datetime.now().isoformat()
+        with self._db:
+            self._db.execute(
+                "INSERT INTO pages (url, query_key, fingerprint, etag, last_modified, record, "
+                "first_seen, changed_at, refreshed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET query_key = excluded.query_key, "
+                "fingerprint = excluded.fingerprint, etag = excluded.etag, "
+                "last_modified = excluded.last_modified, record = excluded.record, "
+                "refreshed_at = excluded.refreshed_at, "
+                "changed_at = CASE WHEN pages.fingerprint = excluded.fingerprint "
+                "THEN pages.changed_at ELSE excluded.changed_at END",
+                (url, query_key, fingerprint, etag, last_modified,
+                 json.dumps(record, ensure_ascii=False), now, now, time.time())
+            )
+        return change, previous
+
+    def removed(self, query_key: str, seen_urls: Iterable[str]) -> List[dict]:
+        """Forget and return the stored URLs of a query that were not seen again"""
+        seen = set(seen_urls)
+        rows = self._db.execute(
+            "SELECT url, record FROM pages WHERE query_key = ?", (query_key,)
+        ).fetchall()
+        gone = [
+            {"url": row["url"], "record": json.loads(row["record"])}
+            for row in rows if row["url"] not in seen
+        ]
+        if gone:
+            with self._db:
+                self._db.executemany("DELETE FROM pages WHERE url = ?", [(item["url"],) for item in gone])
+        return gone
+
+class ChangeFeed(NDJSONSink):
+    """NDJSON feed of new, changed and removed records relative to the previous run"""
+
+    def __init__(self, filename: str, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.counts: Dict[str, int] = {}
+
+    async def record(
+        self,
+        change: str,
+        url: str,
+        business: Optional[Business] = None,
+        previous: Optional[dict] = None
+    ) -> None:
+        entry = {"change": change, "url": url, "detected_at": datetime.now().isoformat()}
+        if business:
+            entry["business"] = business_to_dict(business)
+        if previous:
+            entry["previous"] = previous
+        self.counts[change] = self.counts.get(change, 0) + 1
+        await self.write_line(json.dumps(entry, ensure_ascii=False) + "\n")
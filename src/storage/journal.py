@@ -0,0 +1,180 @@
+from datetime import datetime
+from typing import List, Optional
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+
+class CrawlJournal:
+    """SQLite journal of the link frontier and per-URL progress of each query.
+
+    A query is identified by its search parameters (runtime knobs such as
+    ``limit`` or ``concurrency`` are ignored). Each query also stores the
+    limit it ran with and whether its result walk was complete. A restart
+    with the same parameters skips the search and only processes URLs that
+    are still pending or have failed fewer than ``max_attempts`` times; see
+    ``resume_targets`` for when the query is searched again instead.
+    """
+
+    DEFAULT_PATH = "data/crawl_journal.sqlite3"
+
+    # search_params keys that change how a query runs, not what it finds
+    RUNTIME_PARAMS = {"limit", "concurrency", "listing_only"}
+
+    PENDING = "pending"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, path: str = DEFAULT_PATH, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.logger = logging.getLogger(self.__class__.__name__)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS queries (
+                query_key TEXT PRIMARY KEY,
+                params TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                search_limit INTEGER,
+                complete INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS frontier (
+                query_key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                name TEXT,
+                position INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (query_key, url)
+            );
+            CREATE INDEX IF NOT EXISTS frontier_status ON frontier (query_key, status, position);
+        """)
+        # Journals written before the limit and completeness were tracked;
+        # their queries count as incomplete and are searched again
+        columns = {row["name"] for row in self._db.execute("PRAGMA table_info(queries)")}
+        if "search_limit" not in columns:
+            self._db.execute("ALTER TABLE queries ADD COLUMN search_limit INTEGER")
+        if "complete" not in columns:
+            self._db.execute("ALTER TABLE queries ADD COLUMN complete INTEGER NOT NULL DEFAULT 0")
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    @classmethod
+    def query_key(cls, search_params: dict) -> str:
+        identity = {k: v for k, v in search_params.items() if k not in cls.RUNTIME_PARAMS}
+        encoded = json.dumps(identity, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:16]
+
+    def has_frontier(self, query_key: str) -> bool:
+        row = self._db.execute(
+            "SELECT 1 FROM queries WHERE query_key = ?", (query_key,)
+        ).fetchone()
+        return row is not None
+
+    def resume_targets(self, query_key: str, limit: int) -> Optional[List[dict]]:
+        """Pending links to resume `query_key` with, or None to search again.
+
+        The query is searched again when it has no frontier, its last result
+        walk was incomplete, `limit` is larger than the limit it ran with,
+        or every link within `limit` is finished; a finished query starts a
+        new pass with a fresh frontier.
+        """
+        row = self._db.execute(
+            "SELECT search_limit, complete FROM queries WHERE query_key = ?", (query_key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if not row["complete"]:
+            self.logger.info(f"Query {query_key}: last result walk was incomplete, searching again")
+            return None
+        if row["search_limit"] is None or limit > row["search_limit"]:
+            self.logger.info(f"Query {query_key}: limit grew to {limit}, searching again")
+            return None
+        targets = self.pending(query_key, limit)
+        if not targets:
+            self.logger.info(f"Query {query_key}: previous pass finished, starting a new one")
+            self.forget(query_key)
+            return None
+        return targets
+
+    def forget(self, query_key: str) -> None:
+        """Drop a query's frontier so the next run searches again"""
+        with self._db:
+            self._db.execute("DELETE FROM frontier WHERE query_key = ?", (query_key,))
+            self._db.execute("DELETE FROM queries WHERE query_key = ?", (query_key,))
+
+    def record_frontier(
+        self,
+        query_key: str,
+        search_params: dict,
+        links: List[dict],
+        limit: Optional[int] = None,
+        complete: bool = True
+    ) -> None:
+        """Store the discovered links of a query in result order; known URLs
+        keep their state. An empty frontier is not stored, so a search that
+        found nothing runs again next time."""
+        if not links:
+            return
+        now = datetime.now().isoformat()
+        with self._db:
+            self._db.execute(
+                "INSERT INTO queries (query_key, params, created_at, search_limit, complete) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT (query_key) DO UPDATE SET "
+                "params = excluded.params, search_limit = excluded.search_limit, complete = excluded.complete",
+                (query_key, json.dumps(search_params, ensure_ascii=False), now, limit, int(complete))
+            )
+            self._db.executemany(
+                "INSERT INTO frontier (query_key, url, name, position, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (query_key, url) DO UPDATE SET "
+                "name = excluded.name, position = excluded.position",
+                [
+                    (query_key, link["url"], link.get("name"), position, self.PENDING, now)
+                    for position, link in enumerate(links)
+                ]
+            )
+
+    def pending(self, query_key: str, limit: Optional[int] = None) -> List[dict]:
+        """Links within the first `limit` positions that still need work"""
+        rows = self._db.execute(
+            "SELECT url, name, position, status, attempts FROM frontier "
+            "WHERE query_key = ? AND position < ? "
+            "AND (status = ? OR (status = ? AND attempts < ?)) ORDER BY position",
+            (query_key, limit if limit is not None else sys.maxsize,
+             self.PENDING, self.FAILED, self.max_attempts)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def retry_queue(self, query_key: str) -> List[dict]:
+        """Failed links with their attempt counts and last error"""
+        rows = self._db.execute(
+            "SELECT url, name, attempts, last_error FROM frontier "
+            "WHERE query_key = ? AND status = ? ORDER BY position",
+            (query_key, self.FAILED)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def mark_done(self, query_key: str, url: str) -> None:
+        self._update(query_key, url, self.DONE, None)
+
+    def mark_failed(self, query_key: str, url: str, error: str) -> None:
+        self._update(query_key, url, self.FAILED, error)
+
+    def _update(self, query_key: str, url: str, status: str, error: Optional[str]) -> None:
+        with self._db:
+            self._db.execute(
+                "UPDATE frontier SET status = ?, attempts = attempts + 1, last_error = ?, updated_at = ? "
+                "WHERE query_key = ? AND url = ?",
+                (status, error, datetime.now().isoformat(), query_key, url)
+            )
@@ -0,0 +1,217 @@
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from typing import IO, Callable, List, Optional, Sequence, Tuple
+from src.metrics.registry import MetricsRegistry
+from src.models.business import Business
+import asyncio
+import csv
+import io
+import json
+import logging
+import os
+import time
+
+CSV_FIELDNAMES = [
+    'name', 'category', 'description', 'address', 'phone', 'email',
+    'website', 'source', 'last_updated', 'hours', 'social_media'
+]
+
+def business_to_dict(business: Business) -> dict:
+    """JSON-ready copy of a business; the business itself is left untouched"""
+    data = asdict(business)
+    data['last_updated'] = business.last_updated.isoformat()
+    return data
+
+def business_to_row(business: Business) -> dict:
+    """Flat CSV row for a business"""
+    hours_str = "; ".join(
+        f"{h.day}: closed" if h.is_closed else f"{h.day}: {h.open_time}-{h.close_time}"
+        for h in business.hours
+    ) if business.hours else ""
+
+    social_media_str = ", ".join(
+        f"{platform}: {url}"
+        for platform, url in asdict(business.social_media).items()
+        if url
+    ) if business.social_media else ""
+
+    return {
+        'name': business.name,
+        'category': business.category,
+        'description': business.description,
+        'address': business.address,
+        'phone': business.phone,
+        'email': business.email,
+        'website': business.website,
+        'source': business.source,
+        'last_updated': business.last_updated.isoformat(),
+        'hours': hours_str,
+        'social_media': social_media_str
+    }
+
+class ResultSink(ABC):
+    """Destination for businesses as they are produced"""
+
+    async def __aenter__(self) -> "ResultSink":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def open(self) -> None:
+        pass
+
+    @abstractmethod
+    async def write(self, business: Business) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+class StreamingFileSink(ResultSink):
+    """Append-only file sink with a background writer.
+
+    ``write`` only encodes the record and puts it on a bounded queue, so a
+    slow disk applies back-pressure instead of growing memory. A writer task
+    drains the queue in batches of up to ``batch_size`` records (or whatever
+    arrived within ``flush_interval`` seconds) and writes, flushes and fsyncs
+    each batch in a worker thread, then calls ``on_flush`` with the batch's
+    businesses, so state that must match the file (such as a dedup index or
+    crawl checkpoint) only records what is on disk.
+    The file is created on the first record, so runs without results leave
+    no empty files behind.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        queue_size: int = 1000,
+        metrics: Optional[MetricsRegistry] = None,
+        on_flush: Optional[Callable[[List[Business]], None]] = None
+    ):
+        self.filename = filename
+        self.on_flush = on_flush
+        self.metrics = metrics or MetricsRegistry.shared()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.written = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self._writer: Optional[asyncio.Task] = None
+        self._file: Optional[IO[str]] = None
+
+    async def open(self) -> None:
+        if not self._writer:
+            self._writer = asyncio.create_task(self._run_writer())
+
+    async def write(self, business: Business) -> None:
+        await self._put((self.encode(business), business))
+
+    async def write_line(self, text: str) -> None:
+        """Append already encoded text, such as a line that is not a business"""
+        await self._put((text, None))
+
+    async def _put(self, item: Tuple[str, Optional[Business]]) -> None:
+        await self.open()
+        if self._writer.done():
+            # Surface a failed writer instead of blocking on a full queue
+            self._writer.result()
+        await self._queue.put(item)
+
+    async def close(self) -> None:
+        if self._writer:
+            await self._queue.put(None)
+            await self._writer
+            self._writer = None
+        if self._file:
+            await asyncio.to_thread(self._file.close)
+            self._file = None
+            self.logger.info(f"Wrote {self.written} records to {self.filename}")
+
+    @abstractmethod
+    def encode(self, business: Business) -> str:
+        """Serialize one business to the text appended to the file"""
+
+    def header(self) -> str:
+        return ""
+
+    async def _run_writer(self) -> None:
+        done = False
+        while not done:
+            batch: List[Tuple[str, Optional[Business]]] = []
+            item = await self._queue.get()
+            deadline = time.monotonic() + self.flush_interval
+            while item is not None:
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            done = item is None
+            if batch:
+                with self.metrics.timer("sink_write_seconds", sink=self.__class__.__name__):
+                    await asyncio.to_thread(self._write_batch, [text for text, _ in batch])
+                self.written += len(batch)
+                self.metrics.inc("sink_records", len(batch), sink=self.__class__.__name__)
+                if self.on_flush:
+                    self.on_flush([business for _, business in batch if business is not None])
+
+    def _write_batch(self, batch: Sequence[str]) -> None:
+        if self._file is None:
+            directory = os.path.dirname(self.filename)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            is_new = not os.path.exists(self.filename) or os.path.getsize(self.filename) == 0
+            self._file = open(self.filename, "a", newline="", encoding="utf-8")
+            if is_new:
+                self._file.write(self.header())
+        self._file.write("".join(batch))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+class NDJSONSink(StreamingFileSink):
+    """One JSON object per line"""
+
+    def encode(self, business: Business) -> str:
+        return json.dumps(business_to_dict(business), ensure_ascii=False) + "\n"
+
+class CSVSink(StreamingFileSink):
+    """CSV rows with the same columns as the previous end-of-run export"""
+
+    def header(self) -> str:
+        return self._format({field: field for field in CSV_FIELDNAMES})
+
+    def encode(self, business: Business) -> str:
+        return self._format(business_to_row(business))
+
+    @staticmethod
+    def _format(row: dict) -> str:
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=CSV_FIELDNAMES).writerow(row)
+        return buffer.getvalue()
+
+class MultiSink(ResultSink):
+    """Fan each business out to several sinks"""
+
+    def __init__(self, *sinks: ResultSink):
+        self.sinks = sinks
+
+    async def open(self) -> None:
+        for sink in self.sinks:
+            await sink.open()
+
+    async def write(self, business: Business) -> None:
+        for sink in self.sinks:
+            await sink.write(business)
+
+    async def close(self) -> None:
+        for sink in self.sinks:
+            await sink.close()
@@ -0,0 +1,48 @@
+from src.storage.artifacts import ArtifactWriter
+import asyncio
+import gzip
+import os
+import pytest
+
+class FakePage:
+    async def screenshot(self, type, quality):
+        return b"j" * 100
+
+    async def content(self):
+        return "<html>" + "x" * 1000 + "</html>"
+
+def capture_all(writer, names, **kwargs):
+    async def run():
+        for name in names:
+            await writer.capture(FakePage(), name, **kwargs)
+            # One capture per writer pass, so files keep their order
+            await asyncio.sleep(0.01)
+        await writer.close()
+
+    asyncio.run(run())
+
+def test_oldest_artifacts_are_evicted_over_quota(tmp_path):
+    old = tmp_path / "old_run.jpg"
+    old.write_bytes(b"o" * 100)
+    os.utime(old, (1, 1))
+    writer = ArtifactWriter(directory=str(tmp_path), mode="always", quota_bytes=250)
+    capture_all(writer, ["first", "second", "third"])
+    remaining = sorted(path.name.split("_")[0] for path in tmp_path.iterdir())
+    assert remaining == ["second", "third"]
+    assert writer.written == 3
+
+def test_html_is_gzipped(tmp_path):
+    writer = ArtifactWriter(directory=str(tmp_path), mode="errors")
+    capture_all(writer, ["detail"], error=True, include_html=True)
+    [html] = tmp_path.glob("*.html.gz")
+    assert gzip.decompress(html.read_bytes()).decode("utf-8").startswith("<html>")
+    assert len(list(tmp_path.glob("*.jpg"))) == 1
+
+def test_capture_policy():
+    assert not ArtifactWriter(mode="off").should_capture(error=True)
+    errors = ArtifactWriter(mode="errors")
+    assert errors.should_capture(error=True) and not errors.should_capture()
+    sample = ArtifactWriter(mode="sample", sample_every=3)
+    assert [sample.should_capture() for _ in range(6)] == [True, False, False, True, False, False]
+    with pytest.raises(ValueError):
+        ArtifactWriter(mode="sometimes")
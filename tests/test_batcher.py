@@ -0,0 +1,56 @@
+from src.extraction.batcher import ListingBatcher, ListingChunk
+import asyncio
+
+def chunk(index: int, text: str, tokens: int = 10) -> ListingChunk:
+    return ListingChunk(f"page#{index}", "page", text, tokens, None)
+
+def test_assign_prefers_exact_then_longest_name_match():
+    batcher = ListingBatcher(None)
+    roma = chunk(0, "[Pizza Roma](https://roma.example)\nGraz 0316 111111")
+    pizza = chunk(1, "Pizza\nWien 01 2222222")
+    assigned = batcher._assign([roma, pizza], [
+        {"name": "Pizza", "phone_number": ""},
+        {"name": "Pizza Roma GmbH"},
+        {"name": "Unknown", "phone_number": "01 2222222"},
+        {"name": "Nobody"}
+    ])
+    assert [item["name"] for item in assigned["page#0"]] == ["Pizza Roma GmbH"]
+    assert [item["name"] for item in assigned["page#1"]] == ["Pizza", "Unknown"]
+    assert batcher.stats["unmapped_items"] == 1
+
+def test_pack_keeps_order_within_budget():
+    batcher = ListingBatcher(None, token_budget=25)
+    chunks = [chunk(i, str(i), tokens) for i, tokens in enumerate([10, 10, 10, 40, 5])]
+    assert [[c.text for c in batch] for batch in batcher.pack(chunks)] == [["0", "1"], ["2"], ["3"], ["4"]]
+
+def test_listings_without_items_are_split_and_resent():
+    prompts = []
+
+    async def send(url, sections):
+        prompts.append(sections[0])
+        # A cut-off response: only the first listing of each prompt comes back
+        first = sections[0].split("--- Listing 1 ---\n", 1)[1].split("\n", 1)[0]
+        return [{"name": first}]
+
+    async def run():
+        batcher = ListingBatcher(send, token_budget=1000)
+        return batcher, await batcher.extract("page", ["Alpha", "Bravo", "Charlie"])
+
+    batcher, results = asyncio.run(run())
+    assert [[item["name"] for item in items] for items in results] == [["Alpha"], ["Bravo"], ["Charlie"]]
+    assert batcher.stats["split_batches"] == 2
+    assert len(prompts) == 3
+
+def test_same_page_packs_into_the_same_prompts():
+    async def prompts_for(chunks):
+        sent = []
+
+        async def send(url, sections):
+            sent.append(sections[0])
+            return [{"name": text} for text in chunks]
+
+        await ListingBatcher(send, token_budget=6).extract("page", chunks)
+        return sorted(sent)
+
+    chunks = ["Alpha one", "Bravo two", "Charlie three", "Delta four"]
+    assert asyncio.run(prompts_for(chunks)) == asyncio.run(prompts_for(chunks))
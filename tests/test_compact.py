@@ -0,0 +1,37 @@
+from src.extraction.compact import clean_url, compact_html, estimate_tokens, selected_html
+
+LISTING = """
+<div class="listing_right_section">
+  <script>track()</script>
+  <h3 class="listing__name"><a href="/bus/1?utm_source=x">VerveSmith</a></h3>
+  <span class="listing__address--full">176 Yonge St, Toronto</span>
+  <a href="tel:647-829-7127"><span>647-829-7127</span></a>
+  <a href="/gourl/1?redirect=http%3A%2F%2Fwww.vervesmith.com%2F&amp;ypid=1">Website</a>
+  <button>Get directions</button>
+  <p>Get directions</p>
+</div>
+"""
+
+def test_clean_url_drops_tracking_and_follows_redirects():
+    assert clean_url("/bus/1?utm_source=x&id=2", "https://yp.example/search") == "https://yp.example/bus/1?id=2"
+    assert clean_url("/gourl/1?redirect=http%3A%2F%2Fsite.example%2F&ypid=1", "https://yp.example/") == "http://site.example/"
+    assert clean_url("javascript:void(0)") is None
+    assert clean_url("tel:123") == "tel:123"
+
+def test_compact_keeps_listing_data_and_drops_markup():
+    text = compact_html(LISTING, "https://yp.example/search")
+    assert "# [VerveSmith](https://yp.example/bus/1)" in text
+    assert "176 Yonge St, Toronto" in text
+    assert "647-829-7127" in text
+    assert "track()" not in text
+    assert "<" not in text
+
+def test_repeated_boilerplate_lines_are_kept_once():
+    text = compact_html(LISTING * 2, "https://yp.example/search")
+    assert text.count("Get directions") == 1
+    assert text.count("176 Yonge St, Toronto") == 2
+
+def test_compaction_reduces_tokens_of_the_same_input():
+    content = selected_html(f"<html><body><nav>menu</nav>{LISTING * 5}</body></html>", "[class^='listing_right_section']")
+    assert "menu" not in content
+    assert estimate_tokens(compact_html(content)) < estimate_tokens(content) / 2
@@ -0,0 +1,66 @@
+from src.models.business import Business
+from src.storage.dedup import (
+    DedupIndex, blocking_key, normalize_address, normalize_email, normalize_name,
+    normalize_phone, postcode, registrable_domain
+)
+import pytest
+
+@pytest.mark.parametrize("raw, expected", [
+    ("0316 123 456", "+43316123456"),
+    ("+43 (0) 316 123456", "+43316123456"),
+    ("0043 316/123456", "+43316123456"),
+    ("tel:+43316123456", "+43316123456"),
+    (None, None),
+])
+def test_normalize_phone(raw, expected):
+    assert normalize_phone(raw) == expected
+
+def test_registrable_domain_handles_multi_label_suffixes():
+    assert registrable_domain("https://shop.example.co.at/path") == "example.co.at"
+    assert registrable_domain("www.Example.com") == "example.com"
+    assert registrable_domain("localhost") is None
+
+def test_normalize_email_strips_mailto():
+    assert normalize_email("mailto:Office@Example.AT?subject=Hi") == "office@example.at"
+    assert normalize_email("no address") is None
+
+def test_names_and_addresses_ignore_case_accents_and_legal_forms():
+    assert normalize_name("Müller & Söhne GmbH") == normalize_name("MULLER SOHNE gmbh")
+    assert normalize_address("Hauptstr. 5, 8010 Graz") == normalize_address("Hauptstraße 5 8010 Graz")
+
+def test_postcode_and_blocking_key():
+    assert postcode("hauptstrasse 5 8010 graz") == "8010"
+    assert postcode("176 yonge st toronto on m5c 2l7") == "m5c2l7"
+    assert blocking_key("gasthaus post", "hauptstrasse 5 8010 graz") == "8010|gas"
+
+def test_branches_sharing_a_website_stay_apart(tmp_path):
+    index = DedupIndex(str(tmp_path / "dedup.sqlite3"))
+    graz = Business(name="Pizza Roma", category="Pizza", address="Hauptplatz 1, 8010 Graz",
+                    website="https://pizzaroma.at")
+    wien = Business(name="Pizza Roma Wien", category="Pizza", address="Ring 2, 1010 Wien",
+                    website="https://www.pizzaroma.at/wien")
+    graz_again = Business(name="Pizza Roma", category="Pizza", address="Hauptplatz 1 8010 Graz",
+                          website="http://pizzaroma.at/")
+    assert index.check_and_add(graz) is None
+    assert index.check_and_add(wien) is None
+    assert index.check_and_add(graz_again) is not None
+    index.close()
+
+def test_unconfirmed_businesses_are_dropped_on_reopen(tmp_path):
+    path = str(tmp_path / "dedup.sqlite3")
+    written = Business(name="Gasthaus Post", category="Gasthaus", address="Hauptplatz 1, 8010 Graz",
+                       phone="0316 111111")
+    queued = Business(name="Cafe Sacher", category="Cafe", address="Ring 2, 1010 Wien",
+                      phone="01 2222222")
+    index = DedupIndex(path, commit_every=None)
+    assert index.check_and_add(written, pending=True) is None
+    assert index.check_and_add(queued, pending=True) is None
+    # Only the first business reached the sink before the crash
+    index.confirm([written])
+    index.close()
+
+    index = DedupIndex(path)
+    assert index.check_and_add(written) is not None
+    assert index.check_and_add(queued) is None
+    assert index.stats()["records"] == 2
+    index.close()
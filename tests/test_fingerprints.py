@@ -0,0 +1,76 @@
+from src.models.business import Business
+from src.scrapers.wko_scraper import WKOScraper
+from src.storage.checkpoint import Checkpoint
+from src.storage.fingerprints import ChangeFeed, FingerprintStore, normalize_value
+import asyncio
+import json
+
+URL = "https://firmen.example/gasthaus-post"
+RECORD = {"name": "Gasthaus Post", "email": "Office@Post.at", "website": "https://post.at/"}
+
+def test_formatting_differences_are_not_changes():
+    assert normalize_value("phone", "tel:+43\xa0316  1234") == "+43 316 1234"
+    assert normalize_value("email", "mailto:Office@Post.AT?subject=Hi") == "office@post.at"
+    assert FingerprintStore.fingerprint(RECORD) == FingerprintStore.fingerprint({
+        "name": " Gasthaus  Post", "email": "mailto:office@post.at", "website": "https://post.at",
+        "description": "", "_tier": "static"
+    })
+
+def test_update_reports_new_changed_and_unchanged(tmp_path):
+    store = FingerprintStore(str(tmp_path / "fingerprints.sqlite3"))
+    assert store.diff(URL, RECORD) == (FingerprintStore.NEW, None)
+    # diff alone stores nothing
+    assert store.get(URL) is None
+    assert store.update(URL, "q", RECORD, etag='"v1"') == (FingerprintStore.NEW, None)
+    assert store.update(URL, "q", dict(RECORD))[0] == FingerprintStore.UNCHANGED
+    change, previous = store.update(URL, "q", {**RECORD, "name": "Gasthof Post"})
+    assert change == FingerprintStore.CHANGED
+    assert previous == RECORD
+    store.close()
+
+def test_freshness_validators_and_removal(tmp_path):
+    store = FingerprintStore(str(tmp_path / "fingerprints.sqlite3"))
+    store.update(URL, "q", RECORD, etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+    assert store.is_fresh(URL, 3600)
+    assert not store.is_fresh(URL, 0)
+    assert store.conditional_headers(URL) == {
+        "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"
+    }
+    store.update("https://firmen.example/other", "q", {"name": "Other"})
+    removed = store.removed("q", [URL])
+    assert [item["url"] for item in removed] == ["https://firmen.example/other"]
+    assert store.get("https://firmen.example/other") is None
+    assert store.get(URL) is not None
+    store.close()
+
+def test_change_feed_writes_entries_and_counts(tmp_path):
+    path = tmp_path / "changes.ndjson"
+    business = Business(name="Gasthaus Post", category="Gasthaus", address="Graz", source=URL)
+
+    async def run():
+        async with ChangeFeed(str(path)) as feed:
+            await feed.record(FingerprintStore.NEW, URL, business=business)
+            await feed.record(FingerprintStore.REMOVED, "https://firmen.example/gone", previous={"name": "Gone"})
+        return feed
+
+    feed = asyncio.run(run())
+    entries = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert [entry["change"] for entry in entries] == ["new", "removed"]
+    assert entries[0]["business"]["name"] == "Gasthaus Post"
+    assert entries[1]["previous"] == {"name": "Gone"}
+    assert feed.counts == {"new": 1, "removed": 1}
+
+def test_fingerprint_is_stored_once_the_business_is_persisted(tmp_path):
+    store = FingerprintStore(str(tmp_path / "fingerprints.sqlite3"))
+    checkpoint = Checkpoint()
+    scraper = WKOScraper(fingerprints=store, checkpoint=checkpoint)
+    business = Business(name="Gasthaus Post", category="Gasthaus", address="Graz", source=URL)
+    gasthaus = {"url": URL, "name": "Gasthaus Post"}
+    assert asyncio.run(scraper._emit(gasthaus, business, RECORD, "q")) is business
+    assert store.get(URL) is None
+    # Still new on a rerun after a crash
+    assert asyncio.run(scraper._emit(gasthaus, business, RECORD, "q")) is business
+    checkpoint.persisted([business])
+    assert store.get(URL) is not None
+    assert asyncio.run(scraper._emit(gasthaus, business, RECORD, "q")) is None
+    store.close()
@@ -0,0 +1,79 @@
+from src.models.business import Business
+from src.scrapers.wko_scraper import WKOScraper
+from src.storage.checkpoint import Checkpoint
+from src.storage.journal import CrawlJournal
+import asyncio
+
+PARAMS = {"keyword": "Gasthaus", "location": "Graz"}
+LINKS = [{"url": f"https://firmen.example/{i}", "name": f"Gasthaus {i}"} for i in range(4)]
+
+def journal_at(tmp_path, **kwargs) -> CrawlJournal:
+    return CrawlJournal(str(tmp_path / "journal.sqlite3"), **kwargs)
+
+def test_query_key_ignores_runtime_params():
+    assert CrawlJournal.query_key({**PARAMS, "limit": 5, "concurrency": 2}) == CrawlJournal.query_key(PARAMS)
+    assert CrawlJournal.query_key({**PARAMS, "location": "Wien"}) != CrawlJournal.query_key(PARAMS)
+
+def test_resume_skips_done_and_exhausted_links(tmp_path):
+    journal = journal_at(tmp_path, max_attempts=2)
+    key = CrawlJournal.query_key(PARAMS)
+    assert journal.resume_targets(key, 4) is None
+    journal.record_frontier(key, PARAMS, LINKS, limit=4)
+    journal.mark_done(key, LINKS[0]["url"])
+    journal.mark_failed(key, LINKS[1]["url"], "timeout")
+    journal.mark_failed(key, LINKS[2]["url"], "timeout")
+    journal.mark_failed(key, LINKS[2]["url"], "timeout")
+    targets = journal.resume_targets(key, 4)
+    assert [target["url"] for target in targets] == [LINKS[1]["url"], LINKS[3]["url"]]
+    assert targets[0]["attempts"] == 1
+    assert [item["url"] for item in journal.retry_queue(key)] == [LINKS[1]["url"], LINKS[2]["url"]]
+    journal.close()
+
+def test_incomplete_walk_or_larger_limit_searches_again(tmp_path):
+    journal = journal_at(tmp_path)
+    key = CrawlJournal.query_key(PARAMS)
+    journal.record_frontier(key, PARAMS, LINKS, limit=2, complete=False)
+    assert journal.resume_targets(key, 2) is None
+    journal.record_frontier(key, PARAMS, LINKS, limit=2)
+    assert len(journal.resume_targets(key, 2)) == 2
+    assert journal.resume_targets(key, 3) is None
+    journal.close()
+
+def test_finished_query_starts_a_new_pass(tmp_path):
+    journal = journal_at(tmp_path)
+    key = CrawlJournal.query_key(PARAMS)
+    journal.record_frontier(key, PARAMS, LINKS[:2], limit=2)
+    for link in LINKS[:2]:
+        journal.mark_done(key, link["url"])
+    assert journal.resume_targets(key, 2) is None
+    assert not journal.has_frontier(key)
+    journal.close()
+
+def test_rerecorded_frontier_keeps_link_state(tmp_path):
+    journal = journal_at(tmp_path)
+    key = CrawlJournal.query_key(PARAMS)
+    journal.record_frontier(key, PARAMS, LINKS[:2])
+    journal.mark_done(key, LINKS[0]["url"])
+    journal.record_frontier(key, PARAMS, LINKS)
+    assert [link["url"] for link in journal.pending(key)] == [link["url"] for link in LINKS[1:]]
+    journal.record_frontier(key, PARAMS, [])
+    assert journal.has_frontier(key)
+    journal.close()
+
+def test_url_is_done_only_once_its_business_is_persisted(tmp_path):
+    journal = journal_at(tmp_path)
+    key = CrawlJournal.query_key(PARAMS)
+    journal.record_frontier(key, PARAMS, LINKS[:2], limit=2)
+    checkpoint = Checkpoint()
+    scraper = WKOScraper(journal=journal, checkpoint=checkpoint)
+    businesses = [
+        Business(name=link["name"], category="Gasthaus", address="Graz", source=link["url"]) for link in LINKS[:2]
+    ]
+    for link, business in zip(LINKS, businesses):
+        assert asyncio.run(scraper._emit(link, business, {"name": link["name"]}, key)) is business
+    assert len(journal.pending(key)) == 2
+    # Only the first business reached the disk before the crash
+    checkpoint.persisted(businesses[:1])
+    assert [link["url"] for link in journal.pending(key)] == [LINKS[1]["url"]]
+    assert checkpoint.outstanding == 1
+    journal.close()
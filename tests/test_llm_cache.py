@@ -0,0 +1,59 @@
+from src.extraction.llm_cache import CachedExtractionStrategy, ExtractionCache
+from types import SimpleNamespace
+import time
+
+def cache_at(tmp_path, **kwargs) -> ExtractionCache:
+    return ExtractionCache("model-a", "extract businesses", path=str(tmp_path / "cache.sqlite3"), **kwargs)
+
+def test_key_ignores_markup_noise_but_not_model_or_instructions(tmp_path):
+    cache = cache_at(tmp_path)
+    assert cache.key(["<b>Pizza</b>\n  Roma"]) == cache.key(["<b>Pizza</b> <!-- ad --> Roma"])
+    assert cache.key(["Pizza Roma"]) != cache.key(["Pizza", "Roma"])
+    other = ExtractionCache("model-b", "extract businesses", path=str(tmp_path / "other.sqlite3"))
+    assert other.key(["Pizza Roma"]) != cache.key(["Pizza Roma"])
+
+def test_hits_count_saved_tokens_and_expired_entries_miss(tmp_path):
+    cache = cache_at(tmp_path, max_age=60)
+    key = cache.key(["Pizza Roma"])
+    assert cache.get(key) is None
+    cache.put(key, [{"name": "Pizza Roma"}], tokens=120)
+    assert cache.get(key) == [{"name": "Pizza Roma"}]
+    assert (cache.hits, cache.misses, cache.tokens_saved) == (1, 1, 120)
+    cache.max_age = 0
+    time.sleep(0.01)
+    assert cache.get(key) is None
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = cache_at(tmp_path, max_bytes=60)
+    keys = [cache.key([str(i)]) for i in range(3)]
+    cache.put(keys[0], ["x" * 20])
+    time.sleep(0.01)
+    cache.put(keys[1], ["y" * 20])
+    time.sleep(0.01)
+    cache.get(keys[0])
+    cache.put(keys[2], ["z" * 20])
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+
+class FakeStrategy:
+    def __init__(self, results):
+        self.results = results
+        self.calls = 0
+        self.total_usage = SimpleNamespace(total_tokens=0)
+        self.input_format = "html"
+
+    def run(self, url, sections):
+        self.calls += 1
+        self.total_usage.total_tokens += 50
+        return self.results.pop(0)
+
+def test_cached_strategy_skips_repeated_content_but_not_errors(tmp_path):
+    strategy = FakeStrategy([[{"error": True, "content": "timeout"}], [{"name": "Pizza Roma"}]])
+    cached = CachedExtractionStrategy(strategy, cache_at(tmp_path))
+    assert cached.input_format == "html"
+    assert cached.run("https://yp.example/1", ["Pizza Roma"])[0]["error"]
+    assert cached.run("https://yp.example/1", ["Pizza Roma"]) == [{"name": "Pizza Roma"}]
+    assert cached.run("https://yp.example/2", ["Pizza  Roma"]) == [{"name": "Pizza Roma"}]
+    assert strategy.calls == 2
+    assert cached.cache.tokens_saved == 50
@@ -0,0 +1,36 @@
+from src.net.rate_limiter import AdaptiveRateLimiter, parse_retry_after
+import pytest
+import time
+
+URL = "https://host.example/page"
+
+def test_healthy_responses_increase_the_rate_additively():
+    limiter = AdaptiveRateLimiter(initial_rate=1.0, increase=0.5, max_rate=2.0)
+    for _ in range(3):
+        limiter.record(URL, 0.1, status=200)
+    assert limiter.snapshot()["host.example"]["rate"] == 2.0
+
+def test_throttling_and_errors_decrease_the_rate_multiplicatively():
+    limiter = AdaptiveRateLimiter(initial_rate=4.0, decrease=0.5, min_rate=0.75)
+    limiter.record(URL, 0.1, status=429)
+    assert limiter.snapshot()["host.example"]["rate"] == 2.0
+    limiter.record(URL, 0.1, error=True)
+    limiter.record(URL, 0.1, status=503)
+    info = limiter.snapshot()["host.example"]
+    assert info["rate"] == 0.75
+    assert info["backoffs"] == 3
+
+def test_latency_spike_counts_as_congestion():
+    limiter = AdaptiveRateLimiter(initial_rate=2.0, increase=0.0, decrease=0.5, latency_factor=2.0)
+    limiter.record(URL, 0.2, status=200)
+    limiter.record(URL, 2.0, status=200)
+    assert limiter.snapshot()["host.example"]["rate"] == 1.0
+
+def test_retry_after_pauses_the_host():
+    limiter = AdaptiveRateLimiter()
+    limiter.record(URL, 0.1, status=429, retry_after=30)
+    assert limiter._state("host.example").paused_until > time.monotonic() + 25
+
+@pytest.mark.parametrize("value, expected", [("5", 5.0), (None, None), ("Wed, 21 Oct 2015 07:28:00 GMT", None)])
+def test_parse_retry_after(value, expected):
+    assert parse_retry_after(value) == expected
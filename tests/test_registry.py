@@ -0,0 +1,43 @@
+from src.metrics.registry import Histogram, MetricsRegistry
+import asyncio
+import pytest
+
+def test_quantiles_interpolate_within_buckets():
+    histogram = Histogram(buckets=(1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    assert histogram.quantile(0.25) == pytest.approx(1.0)
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert histogram.quantile(1.0) == pytest.approx(3.0)
+    assert Histogram().quantile(0.5) == 0.0
+
+def test_quantile_never_exceeds_the_largest_observation():
+    histogram = Histogram(buckets=(1.0,))
+    histogram.observe(5.0)
+    assert 1.0 < histogram.quantile(0.99) <= 5.0
+    assert histogram.quantile(1.0) == 5.0
+
+def test_prometheus_text_format():
+    metrics = MetricsRegistry(namespace="test")
+    metrics.inc("pages", 2, site="wko")
+    metrics.observe("stage_seconds", 0.3, stage='say "hi"')
+    text = metrics.to_prometheus()
+    assert "# TYPE test_pages_total counter\ntest_pages_total{site=\"wko\"} 2\n" in text
+    assert "# TYPE test_stage_seconds histogram" in text
+    assert 'test_stage_seconds_bucket{stage="say \\"hi\\"",le="0.25"} 0' in text
+    assert 'test_stage_seconds_bucket{stage="say \\"hi\\"",le="0.5"} 1' in text
+    assert 'test_stage_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 1' in text
+    assert 'test_stage_seconds_count{stage="say \\"hi\\""} 1' in text
+    assert text.endswith("\n")
+
+def test_timer_counts_errors_but_not_cancellation():
+    metrics = MetricsRegistry()
+    with pytest.raises(ValueError):
+        with metrics.timer("parse_seconds"):
+            raise ValueError
+    with pytest.raises(asyncio.CancelledError):
+        with metrics.timer("parse_seconds"):
+            raise asyncio.CancelledError
+    snapshot = metrics.snapshot()
+    assert snapshot["counters"] == [{"name": "parse_errors", "labels": {}, "value": 1}]
+    assert snapshot["histograms"][0]["count"] == 1
@@ -0,0 +1,82 @@
+from src.net.resilience import CircuitBreaker, CircuitOpenError, Resilience, RetryPolicy, TransientStatusError
+import asyncio
+import pytest
+
+URL = "https://host.example/page"
+
+def no_wait_resilience(**kwargs) -> Resilience:
+    return Resilience(retry=RetryPolicy(max_attempts=3, base_delay=0.0), **kwargs)
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    for attempt in range(1, 8):
+        assert 0 <= policy.delay(attempt) <= min(4.0, 2 ** (attempt - 1))
+
+def test_transient_failures_are_retried():
+    resilience = no_wait_resilience()
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise TransientStatusError(URL, 503)
+        return "ok"
+
+    assert resilience.call_sync(URL, flaky) == "ok"
+    assert len(calls) == 3
+    assert resilience.stats["retries"] == 2
+
+def test_permanent_failures_are_raised_at_once():
+    resilience = no_wait_resilience()
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ValueError("parse error")
+
+    with pytest.raises(ValueError):
+        resilience.call_sync(URL, broken)
+    assert len(calls) == 1
+
+def test_gives_up_after_max_attempts():
+    resilience = no_wait_resilience()
+    with pytest.raises(TransientStatusError):
+        resilience.call_sync(URL, lambda: (_ for _ in ()).throw(TransientStatusError(URL, 502)))
+    assert resilience.stats["give_ups"] == 1
+
+def test_open_circuit_rejects_calls():
+    resilience = no_wait_resilience(failure_threshold=2, reset_timeout=60)
+
+    def down():
+        raise ConnectionError("refused")
+
+    with pytest.raises(ConnectionError):
+        resilience.call_sync(URL, down)
+    with pytest.raises(CircuitOpenError):
+        resilience.call_sync(URL, lambda: "never called")
+    assert resilience.stats["breaker_opens"] == 1
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+def test_cancelled_probe_releases_the_breaker():
+    resilience = no_wait_resilience(failure_threshold=1, reset_timeout=0)
+    resilience.breaker(URL).record_failure()
+
+    async def probe():
+        task = asyncio.create_task(resilience.call(URL, asyncio.sleep, 60))
+        await asyncio.sleep(0)
+        assert resilience.breaker(URL).probing
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await resilience.call(URL, asyncio.sleep, 0, "recovered")
+
+    assert asyncio.run(probe()) == "recovered"
+    assert resilience.breaker(URL).state == "closed"
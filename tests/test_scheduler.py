@@ -0,0 +1,74 @@
+from contextlib import asynccontextmanager
+from src.jobs.scheduler import Job, JobScheduler
+from src.metrics.registry import MetricsRegistry
+import asyncio
+
+class FakePool:
+    @asynccontextmanager
+    async def page(self):
+        yield object()
+
+class FakeScraper:
+    SITE = "fake"
+
+    def __init__(self, results):
+        self.results = results
+
+    async def scrape_iter(self, page, search_params):
+        outcome = self.results.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        for business in outcome:
+            yield business
+
+def run_jobs(scrapers, jobs, **kwargs):
+    scheduler = JobScheduler(FakePool(), scrapers, workers=1, metrics=MetricsRegistry(), **kwargs)
+    for job in jobs:
+        scheduler.submit(job)
+    return asyncio.run(scheduler.run())
+
+def test_failed_job_is_requeued_behind_fresh_work():
+    order = []
+    results = [RuntimeError("boom"), ["b"], ["c"]]
+
+    class Recording(FakeScraper):
+        async def scrape_iter(self, page, search_params):
+            order.append(search_params["q"])
+            async for business in super().scrape_iter(page, search_params):
+                yield business
+
+    report = run_jobs(
+        {"wko": lambda: Recording(results)},
+        [Job(0, 0, {"q": "a"}), Job(0, 1, {"q": "b"})]
+    )
+    assert order == ["a", "b", "a"]
+    assert (report.completed, report.requeued, report.failed, report.businesses) == (2, 1, 0, 2)
+
+def test_job_fails_after_max_attempts():
+    report = run_jobs(
+        {"wko": lambda: FakeScraper([RuntimeError("boom")] * 2)},
+        [Job(0, 0, {"q": "a"})],
+        max_attempts=2
+    )
+    assert (report.completed, report.requeued, report.failed) == (0, 1, 1)
+
+def test_empty_result_is_retried_when_requested():
+    report = run_jobs(
+        {"wko": lambda: FakeScraper([[], ["b"]])},
+        [Job(0, 0, {"q": "a"})],
+        retry_empty=True
+    )
+    assert (report.completed, report.requeued, report.businesses) == (1, 1, 1)
+
+def test_raising_factory_counts_as_a_failed_attempt():
+    calls = []
+
+    def factory():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("no browser")
+        return FakeScraper([["b"]])
+
+    report = run_jobs({"wko": factory}, [Job(0, 0, {"q": "a"})])
+    assert len(calls) == 2
+    assert (report.completed, report.requeued, report.failed, report.businesses) == (1, 1, 0, 1)
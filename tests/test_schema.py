@@ -0,0 +1,55 @@
+from src.extraction.schema import CompiledSchema, record_to_business
+
+HTML = """
+<ul>
+  <li class="card">
+    <h3> Gasthaus Post </h3>
+    <a class="web" href="/firma/post">Details</a>
+    <span class="phone">+43 316 123456</span>
+  </li>
+  <li class="card">
+    <h2>Cafe Central</h2>
+    <a class="web" href="https://cafe.example/">Website</a>
+  </li>
+</ul>
+"""
+
+SCHEMA = CompiledSchema({
+    "name": "Cards",
+    "baseSelector": [".missing", ".card"],
+    "fields": [
+        {"name": "name", "selectors": ["h3", "h2"], "type": "text"},
+        {"name": "website", "selector": "a.web", "type": "attribute", "attribute": "href"},
+        {"name": "phone", "selector": ".phone", "type": "text"}
+    ]
+})
+
+def test_fallback_selectors_and_url_resolution():
+    records = SCHEMA.extract_html(HTML, "https://firmen.example/suche")
+    assert records == [
+        {"name": "Gasthaus Post", "website": "https://firmen.example/firma/post", "phone": "+43 316 123456"},
+        {"name": "Cafe Central", "website": "https://cafe.example/", "phone": None}
+    ]
+
+def test_no_container_match_yields_no_records():
+    assert SCHEMA.extract_html("<p>nothing here</p>") == []
+
+def test_markup_is_paired_with_each_record():
+    pairs = SCHEMA.extract_with_markup(HTML)
+    assert len(pairs) == 2
+    assert "Gasthaus Post" in pairs[0][1] and "Cafe Central" not in pairs[0][1]
+
+def test_record_to_business_requires_a_name():
+    assert record_to_business({"name": None}, "https://x") is None
+    business = record_to_business({"name": "Cafe Central", "phone": "+43 1 234"}, "https://x", category="Cafe")
+    assert business.name == "Cafe Central"
+    assert business.source == "https://x"
+
+def test_malformed_url_attribute_keeps_the_raw_value():
+    schema = CompiledSchema({
+        "name": "Links",
+        "fields": [{"name": "website", "selector": "a", "type": "attribute", "attribute": "href"}]
+    })
+    assert schema.extract_html('<a href="http://[broken">x</a>', "https://firmen.example/") == [
+        {"website": "http://[broken"}
+    ]
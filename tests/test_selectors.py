@@ -0,0 +1,61 @@
+from collections import Counter
+from src.browser.selectors import SelectorResolver
+import asyncio
+import json
+
+class FakePage:
+    """Matches the given selectors after a delay; others time out"""
+
+    def __init__(self, matches: dict):
+        self.matches = matches
+        self.waited = []
+
+    async def wait_for_selector(self, selector, timeout, state):
+        self.waited.append(selector)
+        if selector not in self.matches:
+            await asyncio.sleep(timeout / 1000)
+            raise TimeoutError(selector)
+        await asyncio.sleep(self.matches[selector])
+        return f"element for {selector}"
+
+def resolve(resolver, page, candidates, stats=None):
+    return asyncio.run(resolver.resolve(page, "wko", "detail", candidates, timeout=500, stats=stats))
+
+def remembering(tmp_path, winner: str, **kwargs) -> SelectorResolver:
+    path = tmp_path / "memory.json"
+    path.write_text(json.dumps({"wko": {"detail": winner}}), encoding="utf-8")
+    return SelectorResolver(memory_path=str(path), **kwargs)
+
+def test_first_match_wins_and_is_remembered(tmp_path):
+    path = str(tmp_path / "memory.json")
+    resolver = SelectorResolver(memory_path=path)
+    page = FakePage({"#slow": 0.2, "#fast": 0.01})
+    assert resolve(resolver, page, ["#slow", "#fast", "#missing"]) == ("#fast", "element for #fast")
+    with open(path, encoding="utf-8") as f:
+        assert json.load(f) == {"wko": {"detail": "#fast"}}
+    assert SelectorResolver(memory_path=path).order("wko", "detail", ["#slow", "#fast"]) == ["#fast", "#slow"]
+
+def test_remembered_winner_gets_a_head_start(tmp_path):
+    resolver = remembering(tmp_path, "#fast", head_start=0.2)
+    page = FakePage({"#slow": 0.0, "#fast": 0.01})
+    assert resolve(resolver, page, ["#slow", "#fast"])[0] == "#fast"
+    # The other candidate never had to be waited on
+    assert page.waited == ["#fast"]
+
+def test_stale_winner_is_replaced(tmp_path):
+    resolver = remembering(tmp_path, "#gone", head_start=0.05)
+    stats = Counter()
+    assert resolve(resolver, FakePage({"#new": 0.0}), ["#gone", "#new"], stats)[0] == "#new"
+    assert resolver.learned("wko", "detail") == "#new"
+    assert stats["selector_wasted_seconds"] >= 0.05
+
+def test_no_match_returns_nothing_and_keeps_memory(tmp_path):
+    path = str(tmp_path / "memory.json")
+    resolver = SelectorResolver(memory_path=path)
+    assert resolve(resolver, FakePage({}), ["#a", "#b"]) == (None, None)
+    assert resolver.learned("wko", "detail") is None
+
+def test_unreadable_memory_is_ignored(tmp_path):
+    path = tmp_path / "memory.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert SelectorResolver(memory_path=str(path)).learned("wko", "detail") is None
@@ -0,0 +1,65 @@
+from src.metrics.registry import MetricsRegistry
+from src.models.business import Business
+from src.storage.sinks import CSVSink, NDJSONSink
+import asyncio
+import json
+
+def business(number: int) -> Business:
+    return Business(name=f"Gasthaus {number}", category="Gasthaus", address="Graz",
+                    source=f"https://firmen.example/{number}")
+
+def test_batches_reach_disk_before_on_flush(tmp_path):
+    path = tmp_path / "results.ndjson"
+    flushed = []
+
+    def on_flush(businesses):
+        # Every business handed over is already in the file
+        written = {json.loads(line).get("name") for line in path.read_text(encoding="utf-8").splitlines()}
+        assert {item.name for item in businesses} <= written
+        flushed.append([item.name for item in businesses])
+
+    async def run():
+        sink = NDJSONSink(str(path), batch_size=2, flush_interval=60,
+                          metrics=MetricsRegistry(), on_flush=on_flush)
+        async with sink:
+            for number in range(5):
+                await sink.write(business(number))
+            await sink.write_line(json.dumps({"note": "not a business"}) + "\n")
+        return sink
+
+    sink = asyncio.run(run())
+    assert flushed == [["Gasthaus 0", "Gasthaus 1"], ["Gasthaus 2", "Gasthaus 3"], ["Gasthaus 4"]]
+    assert sink.written == 6
+    assert [json.loads(line).get("name") for line in path.read_text(encoding="utf-8").splitlines()] == [
+        "Gasthaus 0", "Gasthaus 1", "Gasthaus 2", "Gasthaus 3", "Gasthaus 4", None
+    ]
+
+def test_partial_batch_is_flushed_after_the_interval(tmp_path):
+    flushed = []
+
+    async def run():
+        sink = NDJSONSink(str(tmp_path / "results.ndjson"), batch_size=100, flush_interval=0.05,
+                          metrics=MetricsRegistry(), on_flush=flushed.append)
+        async with sink:
+            await sink.write(business(1))
+            await asyncio.sleep(0.3)
+            # Written while the sink is still open
+            assert [[item.name for item in batch] for batch in flushed] == [["Gasthaus 1"]]
+
+    asyncio.run(run())
+
+def test_csv_header_is_written_once_and_empty_runs_leave_no_file(tmp_path):
+    path = tmp_path / "results.csv"
+
+    async def run(count):
+        async with CSVSink(str(path), metrics=MetricsRegistry()) as sink:
+            for number in range(count):
+                await sink.write(business(number))
+
+    asyncio.run(run(0))
+    assert not path.exists()
+    asyncio.run(run(1))
+    asyncio.run(run(1))
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert lines[0].startswith("name,category")
+    assert len(lines) == 3
@@ -0,0 +1,27 @@
+from src.scrapers.wko_scraper import ResultWalk, WKOScraper
+
+BASE = "https://firmen.wko.at/suche?branche=gasthaus&standort=graz"
+
+def test_pagination_template_and_last_page():
+    scraper = WKOScraper()
+    template, last_page = scraper._detect_pagination([
+        f"{BASE}&page=2#results",
+        f"{BASE}&page=3",
+        f"{BASE}&page=12",
+        "javascript:void(0)"
+    ])
+    assert template == f"{BASE}&page={{page}}#results"
+    assert template.format(page=5) == f"{BASE}&page=5#results"
+    assert last_page == 12
+
+def test_seite_parameter_and_no_pager():
+    scraper = WKOScraper()
+    assert scraper._detect_pagination(["/suche?Seite=4&q=x"]) == ("/suche?Seite={page}&q=x", 4)
+    assert scraper._detect_pagination([]) == (None, 1)
+    # Not a page number, and hrefs with braces would break the template
+    assert scraper._detect_pagination(["/suche?pages=4", "/suche?q={x}&page=2"]) == (None, 1)
+
+def test_walk_is_complete_only_without_failures_or_truncation():
+    assert ResultWalk(pages=3).complete
+    assert not ResultWalk(pages=3, failed_pages=[2]).complete
+    assert not ResultWalk(pages=500, truncated=True).complete
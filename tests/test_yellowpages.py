@@ -0,0 +1,41 @@
+import pytest
+
+pytest.importorskip("crawl4ai")
+
+from src.scrapers.yellowpages_crawler import YellowPagesCrawler
+
+PARTIAL = [
+    {"name": "Joe's Tutoring Inc.", "phone_number": "416-555-0100"},
+    {"name": "Joes Tutoring", "phone_number": "647-555-0199"},
+    {"name": "Bright Minds", "phone_number": "(905) 555-0123"},
+]
+
+def crawler() -> YellowPagesCrawler:
+    return YellowPagesCrawler(None, None, "https://yp.example/search/si/{page}", ".listing", max_pages=1)
+
+def test_name_and_phone_match_wins_over_name_only():
+    block = {"name": "JOES TUTORING", "phone_number": "+1 647 555 0199"}
+    assert YellowPagesCrawler.match_partial(PARTIAL, block) is PARTIAL[1]
+    assert YellowPagesCrawler.match_partial(PARTIAL, {"name": "Joe’s Tutoring"}) is PARTIAL[0]
+
+def test_phone_only_match_and_no_match():
+    block = {"name": "Bright Minds Learning", "phone_number": "905.555.0123"}
+    assert YellowPagesCrawler.match_partial(PARTIAL, block) is PARTIAL[2]
+    assert YellowPagesCrawler.match_partial(PARTIAL, {"name": "Nobody", "phone_number": "0123"}) is None
+    assert YellowPagesCrawler.match_partial(PARTIAL, "not a block") is None
+
+def test_clean_listing_normalizes_fields_and_falls_back_to_regexes():
+    record = crawler().clean_listing({
+        "name": "  Bright\n Minds ",
+        "address": "1 Main St,\n Toronto ON",
+        "phone_number": None,
+        "website": "/gourl/1?redirect=http%3A%2F%2Fbrightminds.example%2F&ypid=1",
+        "description": "Tutoring for all ages. Call today!"
+    }, '<span class="phone">(905) 555-0123</span>')
+    assert record == {
+        "name": "Bright Minds",
+        "address": "1 Main St, Toronto ON",
+        "phone_number": "(905) 555-0123",
+        "website": "http://brightminds.example/",
+        "description": "Tutoring for all ages."
+    }